@@ -0,0 +1,72 @@
+"""
+Measure TransactionCategorizer cold-start time and RSS.
+
+Loads a saved categorizer artifact with `TransactionCategorizer.load` in a
+fresh process, and optionally compares it with constructing the model from
+the hub checkpoint (`--compare-pretrained`, needs network or a warm cache).
+
+    python -m benchmarks.bench_categorizer_cold_start models/transaction_categorizer
+"""
+import json
+import time
+import argparse
+import multiprocessing as mp
+from .utils import current_rss_bytes
+
+
+def _cold_start(mode, artifact_path, queue):
+    rss_start = current_rss_bytes()
+    start = time.perf_counter()
+    import torch  # noqa: F401 -- framework import is part of cold start
+    from src.models.transaction_categorizer import TransactionCategorizer
+    imported = time.perf_counter()
+
+    if mode == 'artifact':
+        model = TransactionCategorizer.load(artifact_path)
+    else:
+        with open(f"{artifact_path}/config.json") as f:
+            num_categories = json.load(f)['num_categories']
+        model = TransactionCategorizer(num_categories)
+    loaded = time.perf_counter()
+    rss_loaded = current_rss_bytes()
+
+    model.predict_proba(['SHELL OIL 57442'])
+    first_prediction = time.perf_counter()
+
+    queue.put({
+        'mode': mode,
+        'import_seconds': imported - start,
+        'load_seconds': loaded - imported,
+        'first_prediction_seconds': first_prediction - loaded,
+        'total_seconds': first_prediction - start,
+        'rss_after_load_mb': rss_loaded / 2**20,
+        'rss_after_prediction_mb': current_rss_bytes() / 2**20,
+        'rss_growth_mb': (current_rss_bytes() - rss_start) / 2**20
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('artifact_path')
+    parser.add_argument('--compare-pretrained', action='store_true')
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    modes = ['artifact'] + (['pretrained'] if args.compare_pretrained else [])
+    ctx = mp.get_context('spawn')
+    results = []
+    for mode in modes:
+        queue = ctx.Queue()
+        process = ctx.Process(target=_cold_start, args=(mode, args.artifact_path, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
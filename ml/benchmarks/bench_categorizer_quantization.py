@@ -0,0 +1,77 @@
+"""
+Compare fp32 and dynamic int8 TransactionCategorizer inference on CPU.
+
+Each variant runs in a fresh process so its RSS is measured in isolation.
+
+    python -m benchmarks.bench_categorizer_quantization --iterations 200
+"""
+import json
+import argparse
+import multiprocessing as mp
+from .utils import current_rss_bytes, latency_summary, time_calls
+
+SAMPLE_DESCRIPTIONS = [
+    'SHELL OIL 57442', 'NETFLIX.COM', 'WHOLEFDS MKT 10234', 'UBER *TRIP',
+    'AMAZON MKTPLACE PMTS', 'STARBUCKS STORE 1123', 'CITY WATER UTILITY',
+    'DELTA AIR LINES'
+]
+
+
+def _run_variant(variant, num_categories, iterations, batch_size, num_threads, queue):
+    import torch
+    from src.models import TransactionCategorizer
+
+    torch.set_num_threads(num_threads)
+    rss_before = current_rss_bytes()
+    model = TransactionCategorizer(num_categories)
+    if variant == 'int8':
+        model.quantize()
+    rss_loaded = current_rss_bytes()
+
+    batch = (SAMPLE_DESCRIPTIONS * (batch_size // len(SAMPLE_DESCRIPTIONS) + 1))[:batch_size]
+    latencies = time_calls(lambda: model.predict_proba(batch), iterations)
+
+    queue.put({
+        'variant': variant,
+        'model_rss_mb': (rss_loaded - rss_before) / 2**20,
+        'total_rss_mb': current_rss_bytes() / 2**20,
+        **latency_summary(latencies)
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--num-categories', type=int, default=20)
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=1)
+    parser.add_argument('--num-threads', type=int, default=1)
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = []
+    for variant in ('fp32', 'int8'):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_variant, args=(
+            variant, args.num_categories, args.iterations,
+            args.batch_size, args.num_threads, queue
+        ))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    fp32, int8 = results
+    summary = {
+        'results': results,
+        'p50_speedup': fp32['p50_ms'] / int8['p50_ms'],
+        'p99_speedup': fp32['p99_ms'] / int8['p99_ms'],
+        'model_rss_reduction': 1 - int8['model_rss_mb'] / fp32['model_rss_mb']
+    }
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Measure mixed-load throughput with and without CPU partitioning.
+
+Every model family's executor pool is kept busy at the same time with a
+stand-in workload of the same runtime (a torch encoder, a TensorFlow LSTM
+when TensorFlow is installed, IsolationForest scoring and DBSCAN, both with
+`n_jobs=-1`). Each mode runs in a fresh process because thread pool sizes
+are process-wide and can't be reset.
+
+    python -m benchmarks.bench_cpu_partitioning --seconds 20
+"""
+import json
+import time
+import asyncio
+import argparse
+import multiprocessing as mp
+import numpy as np
+
+
+def _workloads():
+    import torch
+    from sklearn.cluster import DBSCAN
+    from sklearn.ensemble import IsolationForest
+
+    rng = np.random.default_rng(42)
+    encoder = torch.nn.TransformerEncoder(
+        torch.nn.TransformerEncoderLayer(d_model=256, nhead=4, batch_first=True),
+        num_layers=2
+    ).eval()
+    tokens = torch.randn(16, 32, 256)
+
+    def categorizer():
+        with torch.no_grad():
+            encoder(tokens)
+
+    forest = IsolationForest(n_estimators=200, n_jobs=-1, random_state=42)
+    forest.fit(rng.normal(size=(20000, 8)))
+    anomaly_rows = rng.normal(size=(5000, 8))
+    clustering = DBSCAN(eps=0.5, min_samples=5, n_jobs=-1)
+    pattern_rows = rng.normal(size=(3000, 4))
+
+    workloads = {
+        'categorizer': categorizer,
+        'anomaly': lambda: forest.score_samples(anomaly_rows),
+        'patterns': lambda: clustering.fit_predict(pattern_rows)
+    }
+    estimators = {'anomaly': forest, 'patterns': clustering}
+
+    try:
+        import tensorflow as tf
+        lstm = tf.keras.Sequential([tf.keras.layers.LSTM(64), tf.keras.layers.Dense(1)])
+        sequences = rng.normal(size=(64, 30, 8)).astype(np.float32)
+        workloads['forecaster'] = lambda: lstm(sequences)
+    except ImportError:
+        pass
+    return workloads, estimators
+
+
+async def _drive(pools, workloads, seconds):
+    counts = {name: 0 for name in workloads}
+    deadline = time.perf_counter() + seconds
+
+    async def worker(name):
+        while time.perf_counter() < deadline:
+            await pools[name].run(workloads[name])
+            counts[name] += 1
+
+    await asyncio.gather(*(
+        worker(name)
+        for name in workloads
+        for _ in range(pools[name].max_workers)
+    ))
+    return counts
+
+
+def _run_mode(partitioned, seconds, queue):
+    from src.serving.executors import DEFAULT_POOL_CONFIG, ExecutorPools
+    from src.serving.resources import CpuPartition, apply_thread_limits, limit_estimator_jobs
+
+    partition = CpuPartition.from_config(DEFAULT_POOL_CONFIG) if partitioned else None
+    if partition is not None:
+        apply_thread_limits(partition)
+
+    workloads, estimators = _workloads()
+    if partition is not None:
+        for name, estimator in estimators.items():
+            limit_estimator_jobs(estimator, partition.threads(name))
+
+    config = {name: DEFAULT_POOL_CONFIG[name] for name in workloads}
+    pools = ExecutorPools(config, partition=partition)
+    # Untimed round so lazy runtime initialization isn't measured
+    for fn in workloads.values():
+        fn()
+
+    start = time.perf_counter()
+    counts = asyncio.run(_drive(pools, workloads, seconds))
+    elapsed = time.perf_counter() - start
+    pools.shutdown()
+
+    queue.put({
+        'partitioned': partitioned,
+        'partition': partition.to_dict() if partition is not None else None,
+        'seconds': elapsed,
+        'calls_per_second': {name: count / elapsed for name, count in counts.items()}
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--seconds', type=float, default=20.0)
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    ctx = mp.get_context('spawn')
+    results = []
+    for partitioned in (False, True):
+        queue = ctx.Queue()
+        process = ctx.Process(target=_run_mode, args=(partitioned, args.seconds, queue))
+        process.start()
+        results.append(queue.get())
+        process.join()
+
+    baseline, partitioned = results
+    results.append({
+        'speedup': {
+            name: partitioned['calls_per_second'][name] / rate if rate else None
+            for name, rate in baseline['calls_per_second'].items()
+        }
+    })
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
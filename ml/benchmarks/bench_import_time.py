@@ -0,0 +1,164 @@
+"""
+Record the import cost of each package entry point.
+
+Every entry point is imported in a fresh interpreter, which reports the
+wall clock and RSS growth of the import and which heavy frameworks it
+loaded. Loading a framework listed as forbidden for an entry point is a
+failure, as is a regression beyond the thresholds against `--baseline`.
+The process then exits non-zero, so this can run as a check in CI.
+
+    python -m benchmarks.bench_import_time --output imports.json
+    python -m benchmarks.bench_import_time --baseline imports.json
+"""
+import sys
+import json
+import argparse
+import subprocess
+
+HEAVY_MODULES = [
+    'torch', 'transformers', 'tensorflow', 'mlflow', 'matplotlib', 'seaborn',
+    'sklearn', 'nltk', 'requests', 'tqdm', 'fastapi'
+]
+
+# Entry point: (statement, frameworks it must not load)
+ENTRY_POINTS = {
+    'src.models': (
+        'import src.models',
+        ['torch', 'transformers', 'tensorflow', 'requests', 'tqdm']
+    ),
+    'src.models.AnomalyDetector': (
+        'from src.models import AnomalyDetector',
+        ['torch', 'transformers', 'tensorflow']
+    ),
+    'src.models.MerchantMatcher': (
+        'from src.models import MerchantMatcher',
+        ['torch', 'transformers', 'tensorflow', 'sklearn']
+    ),
+    'src.models.TransactionCategorizer': (
+        'from src.models import TransactionCategorizer',
+        ['tensorflow']
+    ),
+    'src.preprocessing': (
+        'from src.preprocessing import PreprocessingPipeline',
+        ['torch', 'transformers', 'tensorflow', 'mlflow']
+    ),
+    'src.training': (
+        'import src.training',
+        ['torch', 'transformers', 'tensorflow', 'mlflow', 'matplotlib', 'seaborn']
+    ),
+    'src.training.train_anomaly': (
+        'from src.training import train_anomaly_model',
+        ['torch', 'transformers', 'tensorflow', 'matplotlib', 'seaborn']
+    ),
+    'src.data': ('import src.data', ['torch', 'transformers', 'tensorflow', 'sklearn']),
+    'src.instrumentation': ('import src.instrumentation', ['torch', 'tensorflow', 'mlflow']),
+    'src.serving': ('import src.serving', ['torch', 'transformers', 'tensorflow']),
+    'src.app': ('import src.app', ['transformers', 'tensorflow', 'mlflow'])
+}
+
+# Maximum allowed relative increase against the baseline
+DEFAULT_THRESHOLDS = {
+    'seconds': 0.25,
+    'rss_mb': 0.20
+}
+
+_PROBE = """
+import os, sys, json, time
+def rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+heavy = {heavy!r}
+start_rss = rss()
+start = time.perf_counter()
+try:
+    exec({statement!r})
+    error = None
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': seconds,
+    'rss_mb': (rss() - start_rss) / 2**20,
+    'loaded': [name for name in heavy if name in sys.modules],
+    'error': error
+}}))
+"""
+
+
+def measure(statement, repeats):
+    """Import in fresh interpreters, keeping the fastest run."""
+    best = None
+    for _ in range(repeats):
+        probe = _PROBE.format(heavy=HEAVY_MODULES, statement=statement)
+        completed = subprocess.run(
+            [sys.executable, '-c', probe], capture_output=True, text=True, check=True
+        )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        if best is None or result['seconds'] < best['seconds']:
+            best = result
+    return best
+
+
+def check(results, baseline=None, thresholds=DEFAULT_THRESHOLDS):
+    """
+    List the failures of a run.
+
+    Args:
+        results: Results by entry point
+        baseline: Earlier results to compare against
+        thresholds: Maximum relative increase per metric
+
+    Returns:
+        List of failure messages
+    """
+    failures = []
+    for name, result in results.items():
+        if result['error']:
+            continue
+        forbidden = sorted(set(result['loaded']) & set(ENTRY_POINTS[name][1]))
+        if forbidden:
+            failures.append(f"{name} loads {', '.join(forbidden)}")
+        previous = (baseline or {}).get(name)
+        if not previous or previous.get('error'):
+            continue
+        for metric, threshold in thresholds.items():
+            # Ignore noise on imports that are cheap either way
+            floor = 0.05 if metric == 'seconds' else 5.0
+            if result[metric] > max(previous[metric], floor) * (1 + threshold):
+                failures.append(
+                    f"{name} {metric} {previous[metric]:.2f} -> {result[metric]:.2f}"
+                )
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entry-points', help='Comma-separated entry points, defaults to all')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    parser.add_argument('--baseline', help='Results JSON to compare against')
+    args = parser.parse_args()
+
+    names = args.entry_points.split(',') if args.entry_points else list(ENTRY_POINTS)
+    results = {}
+    for name in names:
+        results[name] = result = measure(ENTRY_POINTS[name][0], args.repeats)
+        status = result['error'] or ', '.join(result['loaded']) or '-'
+        print(f"{name:<36} {result['seconds'] * 1000:8.0f} ms {result['rss_mb']:8.1f} MB  {status}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    failures = check(results, baseline)
+    for failure in failures:
+        print(f"FAIL {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Measure MerchantMatcher batch throughput in descriptions per second.
+
+    python -m benchmarks.bench_merchant_matcher --descriptions 1000000
+"""
+import json
+import time
+import random
+import argparse
+from src.models import merchant_matcher
+from src.models.merchant_matcher import MerchantMatcher
+
+NOISE = ['', ' 1123', ' #4471', ' SAN FRANCISCO CA', '*TRIP', '.COM', ' 08/14']
+MISSES = ['POS DEBIT 5531', 'CHECK 1043', 'LOCAL BAKERY', 'ATM WITHDRAWAL']
+
+
+def make_descriptions(rules, n, hit_rate, seed=42):
+    rng = random.Random(seed)
+    patterns = [rule['pattern'] for rule in rules]
+    return [
+        rng.choice(patterns) + rng.choice(NOISE)
+        if rng.random() < hit_rate else rng.choice(MISSES) + rng.choice(NOISE)
+        for _ in range(n)
+    ]
+
+
+def run(matcher, descriptions, batch_size):
+    start = time.perf_counter()
+    hits = 0
+    for i in range(0, len(descriptions), batch_size):
+        hits += sum(c is not None for c in matcher.match_batch(descriptions[i:i + batch_size]))
+    seconds = time.perf_counter() - start
+    return {
+        'seconds': seconds,
+        'million_descriptions_per_second': len(descriptions) / seconds / 1e6,
+        'hit_rate': hits / len(descriptions)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rules', default='config/merchant_rules.json')
+    parser.add_argument('--descriptions', type=int, default=1000000)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--hit-rate', type=float, default=0.8)
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    with open(args.rules) as f:
+        rules = json.load(f)['rules']
+    descriptions = make_descriptions(rules, args.descriptions, args.hit_rate)
+
+    results = {}
+    backends = ['python'] + (['pyahocorasick'] if merchant_matcher.ahocorasick else [])
+    for backend in backends:
+        available = merchant_matcher.ahocorasick
+        if backend == 'python':
+            merchant_matcher.ahocorasick = None
+        try:
+            matcher = MerchantMatcher.from_rules(rules)
+            results[backend] = run(matcher, descriptions, args.batch_size)
+        finally:
+            merchant_matcher.ahocorasick = available
+
+    summary = {'rules': len(rules), 'descriptions': args.descriptions, 'results': results}
+    print(json.dumps(summary, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(summary, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Measure how ParallelPreprocessor scales from 1 to N worker processes.
+
+A pipeline is fitted once on synthetic transactions, then the same data is
+transformed serially and with each worker count. The report lists wall
+clock, throughput, speedup over one worker and scaling efficiency
+(speedup / workers). Needs the NLTK corpora used by TextProcessor.
+
+    python -m benchmarks.bench_parallel_preprocessing --rows 1000000 --workers 1,2,4,8,16,32
+"""
+import os
+import json
+import time
+import argparse
+from src.data.synthetic import SyntheticTransactionGenerator
+from src.preprocessing import ParallelPreprocessor, PreprocessingPipeline
+
+
+def default_workers():
+    cpus = len(os.sched_getaffinity(0))
+    counts = [1]
+    while counts[-1] * 2 < cpus:
+        counts.append(counts[-1] * 2)
+    if cpus > 1:
+        counts.append(cpus)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--merchants', type=int, default=100)
+    parser.add_argument('--workers', default=None,
+                        help='Comma-separated worker counts, defaults to powers of two up to the CPU count')
+    parser.add_argument('--shard-by', choices=['user_id', 'rows'], default='user_id')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', help='Optional path to write results as JSON')
+    args = parser.parse_args()
+
+    workers = [int(n) for n in args.workers.split(',')] if args.workers else default_workers()
+    df = SyntheticTransactionGenerator(
+        n_merchants=args.merchants, seed=args.seed, include_labels=False
+    ).generate(args.rows)
+    pipeline = PreprocessingPipeline().fit(df)
+
+    start = time.perf_counter()
+    pipeline.transform(df)
+    serial_seconds = time.perf_counter() - start
+    results = {'rows': len(df), 'serial_seconds': serial_seconds, 'workers': {}}
+
+    for n in workers:
+        with ParallelPreprocessor(pipeline, n_workers=n, shard_by=args.shard_by) as preprocessor:
+            # Start the pool outside the measurement
+            preprocessor.transform(df.head(n * preprocessor.shards_per_worker))
+            start = time.perf_counter()
+            preprocessor.transform(df)
+            seconds = time.perf_counter() - start
+        results['workers'][n] = {'seconds': seconds, 'rows_per_second': len(df) / seconds}
+
+    base = results['workers'][workers[0]]['seconds'] * workers[0]
+    for n, result in results['workers'].items():
+        result['speedup'] = base / result['seconds']
+        result['efficiency'] = result['speedup'] / n
+
+    print(f"serial: {serial_seconds:.2f}s")
+    for n, result in results['workers'].items():
+        print(
+            f"{n:>3} workers: {result['seconds']:7.2f}s  "
+            f"{result['rows_per_second']:>10.0f} rows/s  "
+            f"speedup {result['speedup']:5.2f}  efficiency {result['efficiency']:.0%}"
+        )
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
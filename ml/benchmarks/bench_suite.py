@@ -0,0 +1,344 @@
+"""
+Benchmark every preprocessing stage and model at several data sizes.
+
+Each (case, size) pair runs in a fresh process on synthetic transactions
+and reports throughput of one full pass, its peak RSS, and p50/p99 latency
+of request-sized calls (`call_rows` rows each). Results are written as
+JSON. Cases capped by `max_rows` report the rows they actually measured
+as `rows` and the size they ran at as `rows_requested`. With `--baseline`
+they are compared against an earlier results file.
+The process exits non-zero if throughput, p99 latency or peak memory
+regress beyond the thresholds.
+
+Cases whose dependencies or data are unavailable (e.g. NLTK corpora, a
+categorizer artifact) are reported as skipped. Everything runs offline on
+CPU.
+
+    python -m benchmarks.bench_suite --output results.json
+    python -m benchmarks.bench_suite --sizes 10000 --baseline results.json
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import importlib.util
+import multiprocessing as mp
+from collections import namedtuple
+import numpy as np
+from src.data.synthetic import SyntheticTransactionGenerator
+from .utils import RssSampler, latency_summary
+
+# Never reach for a GPU or the model hub
+os.environ.setdefault('CUDA_VISIBLE_DEVICES', '')
+os.environ.setdefault('HF_HUB_OFFLINE', '1')
+os.environ.setdefault('TRANSFORMERS_OFFLINE', '1')
+
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+
+# Maximum allowed relative change against the baseline
+DEFAULT_THRESHOLDS = {
+    'rows_per_second': 0.10,  # drop
+    'p99_ms': 0.25,           # increase
+    'peak_rss_mb': 0.20       # increase
+}
+
+# `setup(df, options)` prepares a case from raw transactions and returns
+# the callable to time with the input it is timed on, so steps that only
+# prepare inputs stay out of the measurement. `max_rows` caps how many rows
+# the full pass covers for cases too slow to run at every size.
+Case = namedtuple('Case', ['name', 'setup', 'call_rows', 'max_rows'])
+
+
+class CaseUnavailable(Exception):
+    """Raised by a case setup when its dependencies or inputs are missing."""
+
+
+def _setup_data_cleaner(df, options):
+    from src.preprocessing.data_cleaner import DataCleaner
+    cleaner = DataCleaner()
+    return cleaner.clean, df
+
+
+def _text_processor():
+    try:
+        from src.preprocessing.text_processor import TextProcessor
+        return TextProcessor()
+    except ImportError as e:
+        raise CaseUnavailable(f"NLTK unavailable: {e}")
+    except LookupError:
+        raise CaseUnavailable("NLTK corpora unavailable, run nltk.download while online")
+
+
+def _setup_text_processor(df, options):
+    processor = _text_processor()
+
+    def run(frame):
+        for description in frame['description']:
+            processor.preprocess(description)
+    return run, df
+
+
+def _setup_feature_engineer(df, options):
+    from src.preprocessing.data_cleaner import DataCleaner
+    from src.preprocessing.feature_engineer import FeatureEngineer
+    engineer = FeatureEngineer()
+    return engineer.transform, DataCleaner().clean(df).reset_index(drop=True)
+
+
+def _setup_pipeline(df, options):
+    _text_processor()
+    from src.preprocessing import PreprocessingPipeline
+    return (lambda frame: PreprocessingPipeline().fit_transform(frame)), df
+
+
+def _setup_create_sequences(df, options):
+    # create_sequences lives in the forecaster trainer, which imports TensorFlow
+    if importlib.util.find_spec('tensorflow') is None:
+        raise CaseUnavailable("TensorFlow is not installed, which the forecaster trainer needs")
+    try:
+        from src.training.train_forecaster import create_sequences
+    except ImportError as e:
+        raise CaseUnavailable(f"Forecaster training dependencies unavailable: {e}")
+    return (lambda amounts: create_sequences(amounts, 30)), df['amount'].to_numpy()
+
+
+def _setup_pattern_analyzer(df, options):
+    from src.models.pattern_analyzer import PatternAnalyzer
+    analyzer = PatternAnalyzer(eps=0.5, min_samples=1)
+    return analyzer.find_patterns, df
+
+
+def _setup_anomaly_detector(df, options):
+    from src.models.anomaly_detector import AnomalyDetector
+    from src.preprocessing.feature_engineer import FeatureEngineer
+    engineer = FeatureEngineer()
+    engineer.categorical_features = ['category']
+    features = engineer.transform(df).fillna(0)
+    detector = AnomalyDetector().fit(features.iloc[:10_000])
+    return detector.score_samples, features
+
+
+def _setup_categorizer(df, options):
+    if not options.categorizer_path or not os.path.isdir(options.categorizer_path):
+        raise CaseUnavailable("No categorizer artifact, pass --categorizer-path")
+    from src.models.transaction_categorizer import TransactionCategorizer
+    model = TransactionCategorizer.load(options.categorizer_path)
+    return (lambda frame: model.predict(frame['description'].tolist())), df
+
+
+CASES = [
+    Case('data_cleaner.clean', _setup_data_cleaner, 1000, None),
+    Case('text_processor.preprocess', _setup_text_processor, 1, None),
+    Case('feature_engineer.transform', _setup_feature_engineer, 1000, None),
+    Case('pipeline.fit_transform', _setup_pipeline, 1000, None),
+    Case('create_sequences', _setup_create_sequences, 1000, None),
+    Case('pattern_analyzer.find_patterns', _setup_pattern_analyzer, 1000, None),
+    Case('anomaly_detector.score_samples', _setup_anomaly_detector, 1000, None),
+    Case('transaction_categorizer.predict', _setup_categorizer, 1, 20_000)
+]
+
+
+def _run_case(case, size, options, queue):
+    try:
+        rows = min(size, case.max_rows) if case.max_rows else size
+        df = SyntheticTransactionGenerator(
+            n_merchants=options.merchants, seed=options.seed, include_labels=False
+        ).generate(rows)
+        try:
+            fn, data = case.setup(df, options)
+        except (CaseUnavailable, ImportError) as e:
+            queue.put({'status': 'skipped', 'reason': str(e)})
+            return
+        except LookupError:
+            # src.preprocessing builds a default pipeline, and so needs
+            # the NLTK corpora, on import
+            queue.put({'status': 'skipped', 'reason': 'NLTK corpora unavailable, run nltk.download while online'})
+            return
+
+        with RssSampler() as sampler:
+            start = time.perf_counter()
+            fn(data)
+            seconds = time.perf_counter() - start
+
+        # Request-sized calls over random slices of the same data
+        rng = np.random.default_rng(options.seed)
+        starts = rng.integers(0, max(len(data) - case.call_rows, 1), options.latency_calls + 3)
+        latencies = []
+        for i, offset in enumerate(starts):
+            batch = _slice(data, offset, offset + case.call_rows)
+            call_start = time.perf_counter()
+            fn(batch)
+            if i >= 3:  # first calls are warmup
+                latencies.append(time.perf_counter() - call_start)
+
+        queue.put({
+            'status': 'ok',
+            # Capped cases measure fewer rows than the size they run at
+            'rows': rows,
+            'rows_requested': size,
+            'seconds': seconds,
+            'rows_per_second': rows / seconds,
+            'peak_rss_mb': sampler.peak_bytes / 2**20,
+            'rss_growth_mb': (sampler.peak_bytes - sampler.start_bytes) / 2**20,
+            'call_rows': case.call_rows,
+            **latency_summary(latencies)
+        })
+    except Exception as e:
+        queue.put({'status': 'error', 'reason': f"{type(e).__name__}: {e}"})
+
+
+def _slice(data, start, stop):
+    if isinstance(data, np.ndarray):
+        return data[start:stop]
+    return data.iloc[start:stop]
+
+
+def run_suite(cases, sizes, options):
+    """
+    Run each case at each size, one fresh process per run.
+
+    Returns:
+        Dict: Run metadata and results keyed by "<case>@<size>"
+    """
+    ctx = mp.get_context('spawn')
+    results = {}
+    for case in cases:
+        for size in sizes:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_case, args=(case, size, options, queue))
+            process.start()
+            process.join(options.timeout)
+            if process.is_alive():
+                process.terminate()
+                result = {'status': 'error', 'reason': f"Timed out after {options.timeout}s"}
+            elif queue.empty():
+                result = {'status': 'error', 'reason': f"Exited with code {process.exitcode}"}
+            else:
+                result = queue.get()
+
+            key = f"{case.name}@{size}"
+            results[key] = result
+            print(f"{key}: {_describe(result)}", file=sys.stderr)
+
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'cpus': os.cpu_count(),
+            'sizes': sizes,
+            'seed': options.seed,
+            'merchants': options.merchants,
+            'created_at': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'results': results
+    }
+
+
+def compare(current, baseline, thresholds=None):
+    """
+    Compare results against a baseline.
+
+    Args:
+        current: Results from `run_suite`
+        baseline: Earlier results from `run_suite`
+        thresholds: Maximum relative change per metric
+
+    Returns:
+        List of regressions, each {case, metric, baseline, current, change}
+    """
+    thresholds = thresholds or DEFAULT_THRESHOLDS
+    regressions = []
+    for key, result in current['results'].items():
+        reference = baseline['results'].get(key)
+        if result.get('status') != 'ok' or not reference or reference.get('status') != 'ok':
+            continue
+        for metric, limit in thresholds.items():
+            before, after = reference[metric], result[metric]
+            if not before:
+                continue
+            change = (after - before) / before
+            # Throughput regresses downwards, latency and memory upwards
+            regressed = change < -limit if metric == 'rows_per_second' else change > limit
+            if regressed:
+                regressions.append({
+                    'case': key,
+                    'metric': metric,
+                    'baseline': before,
+                    'current': after,
+                    'change': change
+                })
+    return regressions
+
+
+def _describe(result):
+    if result['status'] != 'ok':
+        return f"{result['status']} ({result['reason']})"
+    capped = (
+        f"capped at {result['rows']:,} rows, "
+        if result['rows'] < result['rows_requested'] else ''
+    )
+    return (
+        f"{capped}{result['rows_per_second']:,.0f} rows/s, "
+        f"peak {result['peak_rss_mb']:.0f} MB, "
+        f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='Comma-separated row counts')
+    parser.add_argument('--cases', help='Comma-separated case names, default all')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--baseline', help='Earlier results file to compare against')
+    parser.add_argument('--threshold', action='append', default=[], metavar='METRIC=FRACTION',
+                        help='Override a regression threshold, e.g. p99_ms=0.5')
+    parser.add_argument('--latency-calls', type=int, default=200)
+    parser.add_argument('--categorizer-path', help='Saved TransactionCategorizer artifact')
+    parser.add_argument('--timeout', type=float, default=3600.0, help='Seconds per run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--merchants', type=int, default=100,
+                        help='Merchant cardinality; one-hot features grow with it')
+    args = parser.parse_args()
+
+    cases = CASES
+    if args.cases:
+        names = set(args.cases.split(','))
+        cases = [case for case in CASES if case.name in names]
+        unknown = names - {case.name for case in cases}
+        if unknown:
+            parser.error(f"Unknown cases: {', '.join(sorted(unknown))}")
+
+    thresholds = dict(DEFAULT_THRESHOLDS)
+    for override in args.threshold:
+        metric, _, value = override.partition('=')
+        if metric not in thresholds:
+            parser.error(f"Unknown threshold metric: {metric}")
+        thresholds[metric] = float(value)
+
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = run_suite(cases, sizes, args)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.output}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, thresholds)
+        for regression in regressions:
+            print(
+                f"REGRESSION {regression['case']} {regression['metric']}: "
+                f"{regression['baseline']:.4g} -> {regression['current']:.4g} "
+                f"({regression['change']:+.1%})",
+                file=sys.stderr
+            )
+        if regressions:
+            sys.exit(1)
+        print("No regressions against baseline", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+import os
+import time
+import resource
+import threading
+from typing import Callable, Dict, List
+import numpy as np
+
+
+def current_rss_bytes() -> int:
+    """Get the current resident set size of this process (Linux)."""
+    with open('/proc/self/statm') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+def peak_rss_bytes() -> int:
+    """Get the peak resident set size of this process."""
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def time_calls(fn: Callable, iterations: int, warmup: int = 3) -> List[float]:
+    """
+    Time repeated calls of `fn`.
+
+    Args:
+        fn: Callable taking no arguments
+        iterations: Number of timed calls
+        warmup: Number of untimed calls made first
+
+    Returns:
+        List of per-call latencies in seconds
+    """
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def latency_summary(latencies: List[float]) -> Dict[str, float]:
+    """Summarize per-call latencies in milliseconds."""
+    values = np.asarray(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean())
+    }
+
+
+class RssSampler:
+    """
+    Track the peak RSS while a block runs by sampling it from a thread.
+
+    Unlike `peak_rss_bytes`, the peak is scoped to the block rather than
+    the lifetime of the process.
+
+        with RssSampler() as sampler:
+            run()
+        sampler.peak_bytes
+    """
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
+
+    def __enter__(self) -> 'RssSampler':
+        self.start_bytes = self.peak_bytes = current_rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+        self.peak_bytes = max(self.peak_bytes, current_rss_bytes())
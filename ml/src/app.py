@@ -0,0 +1,358 @@
+import os
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field
+from .models import (
+    MODEL_PATHS,
+    CascadeCategorizer,
+    LinearTextCategorizer,
+    MerchantMatcher,
+    get_models,
+    load_bundle
+)
+from .instrumentation import render_prometheus
+from .preprocessing import PreprocessingPipeline
+from .serving import (
+    CpuPartition,
+    ExecutorPools,
+    PatternCacheKey,
+    PoolSaturatedError,
+    apply_thread_limits,
+    create_pattern_cache,
+    limit_model_jobs,
+    load_pool_config,
+    partitioning_enabled
+)
+from .serving import inference
+from .serving.streaming import DEFAULT_CHUNK_SIZE, stream_anomaly_scores
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FIRST_TIER_PATH = os.environ.get(
+    'CATEGORIZER_FIRST_TIER_PATH', 'models/categorizer_first_tier.joblib'
+)
+CASCADE_THRESHOLD = float(os.environ.get('CATEGORIZER_CASCADE_THRESHOLD', 0.9))
+MERCHANT_RULES_PATH = os.environ.get('MERCHANT_RULES_PATH', 'config/merchant_rules.json')
+ANOMALY_BUNDLE_PATH = os.environ.get(
+    'ANOMALY_BUNDLE_PATH', f"{MODEL_PATHS['anomaly_detector']}.bundle"
+)
+# Largest number of descriptions one batch categorization may carry
+CATEGORY_BATCH_LIMIT = int(os.environ.get('CATEGORY_BATCH_LIMIT', 1000))
+
+
+class CategoryRequest(BaseModel):
+    description: str
+    amount: Optional[float] = None
+    date: Optional[str] = None
+
+
+class CategoryBatchRequest(BaseModel):
+    descriptions: List[str] = Field(..., max_length=CATEGORY_BATCH_LIMIT)
+
+
+class AnomalyTransaction(BaseModel):
+    amount: float
+    category_id: Optional[str] = None
+    category: Optional[str] = None
+    description: str
+    date: str
+
+
+class AnomalyRequest(BaseModel):
+    transactions: List[AnomalyTransaction]
+
+
+class PatternRequest(BaseModel):
+    user_id: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+
+
+class PatternInvalidationRequest(BaseModel):
+    user_id: str
+    dates: Optional[List[str]] = None
+
+
+class ForecastRequest(BaseModel):
+    user_id: str
+    months: int = 3
+
+
+state = {}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Runtime thread pools are sized before any model loads; each family
+    # then runs on its own cores instead of every runtime using all of them
+    pool_config = load_pool_config()
+    partition = CpuPartition.from_config(pool_config) if partitioning_enabled() else None
+    if partition is not None:
+        apply_thread_limits(partition)
+        logger.info(f"CPU partition: {partition.to_dict()}")
+
+    state['pools'] = ExecutorPools(pool_config, partition=partition)
+    state['models'] = get_models()
+    if partition is not None:
+        limit_model_jobs(state['models'], partition)
+    state['pattern_cache'] = create_pattern_cache()
+    state['pattern_model_version'] = _model_version(MODEL_PATHS['pattern_analyzer'])
+
+    # Anomaly features need the preprocessing state saved at training time.
+    # A bundle carries both, so the detector and its features always match
+    if os.path.exists(ANOMALY_BUNDLE_PATH):
+        bundle = load_bundle(ANOMALY_BUNDLE_PATH)
+        state['models']['anomaly_detector'] = bundle.model
+        pipeline = bundle.pipeline
+        logger.info(f"Loaded anomaly bundle created {bundle.manifest['created']}")
+    else:
+        pipeline = PreprocessingPipeline()
+        stats_path = f"{MODEL_PATHS['anomaly_detector']}_pipeline.pkl"
+        if os.path.exists(stats_path):
+            pipeline.load_feature_stats(stats_path)
+    state['pipeline'] = pipeline
+
+    # Known merchants are categorized from rules without touching a model
+    state['merchant_matcher'] = (
+        MerchantMatcher(MERCHANT_RULES_PATH)
+        if os.path.exists(MERCHANT_RULES_PATH) else None
+    )
+
+    # Answer confident categorizations from the linear first tier and only
+    # escalate uncertain ones to the transformer
+    categorizer = state['models'].get('transaction_categorizer')
+    if categorizer is not None and os.path.exists(FIRST_TIER_PATH):
+        try:
+            state['models']['transaction_categorizer'] = CascadeCategorizer(
+                LinearTextCategorizer.load(FIRST_TIER_PATH),
+                categorizer,
+                threshold=CASCADE_THRESHOLD,
+                text_processor=pipeline.text_processor
+            )
+        except ValueError as e:
+            logger.error(f"Serving the categorizer without a first tier: {str(e)}")
+
+    logger.info(f"ML service started with models: {list(state['models'])}")
+    yield
+    state['pools'].shutdown(wait=False)
+
+
+app = FastAPI(title='FinTrack ML Service', lifespan=lifespan)
+
+
+@app.exception_handler(HTTPException)
+async def http_exception_handler(request: Request, exc: HTTPException):
+    # The API server reads error messages from `message`
+    return JSONResponse(status_code=exc.status_code, content={'message': exc.detail})
+
+
+@app.exception_handler(PoolSaturatedError)
+async def pool_saturated_handler(request: Request, exc: PoolSaturatedError):
+    return JSONResponse(
+        status_code=503,
+        content={'message': str(exc)},
+        headers={'Retry-After': '1'}
+    )
+
+
+def _model_version(path: str) -> str:
+    if not os.path.exists(path):
+        return 'unversioned'
+    return str(int(os.path.getmtime(path)))
+
+
+def _require_model(name: str):
+    model = state['models'].get(name)
+    if model is None:
+        raise HTTPException(status_code=503, detail=f"Model '{name}' is not loaded")
+    return model
+
+
+async def _run(pool: str, fn, *args):
+    try:
+        return await state['pools'][pool].run(fn, *args)
+    except (PoolSaturatedError, HTTPException):
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in {pool} inference: {str(e)}")
+        raise HTTPException(status_code=500, detail='Inference failed')
+
+
+@app.get('/health')
+async def health():
+    return {
+        'status': 'ok',
+        'models': sorted(state['models']),
+        'pools': state['pools'].stats(),
+        'pattern_cache': state['pattern_cache'].stats()
+    }
+
+
+@app.get('/metrics')
+async def prometheus_metrics():
+    # Span timings of model calls; populated when ML_INSTRUMENTATION=1
+    return Response(render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+@app.get('/metrics/pools')
+async def pool_metrics():
+    return state['pools'].stats()
+
+
+@app.get('/metrics/categorizer')
+async def categorizer_metrics():
+    model = _require_model('transaction_categorizer')
+    if not isinstance(model, CascadeCategorizer):
+        return {'cascade': False}
+    return {'cascade': True, **model.stats()}
+
+
+@app.post('/predict/category')
+async def predict_category(request: CategoryRequest):
+    matcher = state['merchant_matcher']
+    if matcher is not None:
+        category = matcher.match(request.description)
+        if category is not None:
+            return inference.rule_match_result(category)
+
+    model = _require_model('transaction_categorizer')
+    return await _run('categorizer', inference.categorize, model, request.description)
+
+
+@app.post('/predict/category/batch')
+async def predict_category_batch(request: CategoryBatchRequest):
+    matcher = state['merchant_matcher']
+    matches = (
+        await _run('categorizer', matcher.match_batch, request.descriptions)
+        if matcher is not None else [None] * len(request.descriptions)
+    )
+    results = [
+        inference.rule_match_result(category) if category is not None else None
+        for category in matches
+    ]
+
+    # Only descriptions without a rule hit go to the model
+    misses = [i for i, result in enumerate(results) if result is None]
+    if misses:
+        model = _require_model('transaction_categorizer')
+        predicted = await _run(
+            'categorizer', inference.categorize_batch,
+            model, [request.descriptions[i] for i in misses]
+        )
+        for i, result in zip(misses, predicted):
+            results[i] = result
+
+    return {'results': results}
+
+
+@app.post('/rules/merchants/reload')
+async def reload_merchant_rules():
+    matcher = state['merchant_matcher']
+    if matcher is None:
+        raise HTTPException(status_code=404, detail='No merchant rules file is configured')
+    try:
+        # Compiling the automaton is CPU-bound, so it runs off the event loop
+        reloaded = await state['pools']['categorizer'].run(matcher.reload)
+    except PoolSaturatedError:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid merchant rules: {str(e)}")
+    return {'reloaded': reloaded, 'version': matcher.version, 'rules': matcher.num_rules}
+
+
+@app.post('/predict/anomaly')
+async def predict_anomaly(request: AnomalyRequest):
+    detector = _require_model('anomaly_detector')
+    if not state['pipeline'].is_fitted:
+        raise HTTPException(status_code=503, detail='Anomaly preprocessing state is not loaded')
+    transactions = [t.model_dump() for t in request.transactions]
+    anomalies = await _run(
+        'anomaly', inference.score_anomalies, detector, state['pipeline'], transactions
+    )
+    return {'anomalies': anomalies}
+
+
+@app.post('/predict/anomaly/stream')
+async def predict_anomaly_stream(
+    request: Request,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=10000)
+):
+    """
+    Score an NDJSON body of transactions, one JSON object per line, and
+    stream back an NDJSON line of {index, score, reason} per anomaly.
+    """
+    detector = _require_model('anomaly_detector')
+    if not state['pipeline'].is_fitted:
+        raise HTTPException(status_code=503, detail='Anomaly preprocessing state is not loaded')
+    return StreamingResponse(
+        stream_anomaly_scores(
+            request.stream(),
+            detector,
+            state['pipeline'],
+            state['pools']['anomaly'],
+            chunk_size
+        ),
+        media_type='application/x-ndjson'
+    )
+
+
+def _analyze_user_patterns(analyzer, user_id, start_date, end_date):
+    df = inference.load_user_transactions(user_id, start_date, end_date)
+    return inference.analyze_patterns(analyzer, df)
+
+
+@app.post('/analyze/patterns')
+async def analyze_patterns(request: PatternRequest):
+    analyzer = _require_model('pattern_analyzer')
+    cache = state['pattern_cache']
+    key = PatternCacheKey(
+        request.user_id,
+        request.start_date,
+        request.end_date,
+        state['pattern_model_version']
+    )
+
+    body = cache.get(key)
+    if body is None:
+        generation = cache.generation(request.user_id)
+        result = await _run(
+            'patterns', _analyze_user_patterns,
+            analyzer, request.user_id, request.start_date, request.end_date
+        )
+        body = json.dumps(result).encode()
+        cache.put(key, body, generation)
+
+    return Response(content=body, media_type='application/json')
+
+
+@app.post('/cache/patterns/invalidate')
+async def invalidate_patterns(request: PatternInvalidationRequest):
+    """
+    Drop cached pattern results covering the dates of changed transactions.
+    """
+    try:
+        dropped = state['pattern_cache'].invalidate(request.user_id, request.dates)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {'invalidated': dropped}
+
+
+def _forecast_user_expenses(model, user_id, months):
+    df = inference.load_user_transactions(user_id)
+    return inference.forecast_expenses(model, df, months)
+
+
+@app.post('/predict/forecast')
+async def predict_forecast(request: ForecastRequest):
+    model = _require_model('expense_forecaster')
+    return await _run(
+        'forecaster', _forecast_user_expenses, model, request.user_id, request.months
+    )
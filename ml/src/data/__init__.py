@@ -0,0 +1,15 @@
+from .transaction_source import (
+    TransactionSource,
+    daily_expense_totals,
+    expense_transactions,
+    load_transactions
+)
+from .synthetic import SyntheticTransactionGenerator
+
+__all__ = [
+    'TransactionSource',
+    'load_transactions',
+    'expense_transactions',
+    'daily_expense_totals',
+    'SyntheticTransactionGenerator'
+]
@@ -0,0 +1,428 @@
+"""
+Deterministic synthetic transactions for load and scale testing.
+
+    python -m src.data.synthetic transactions.parquet --rows 100000000 --seed 42
+"""
+import os
+import time
+import logging
+import argparse
+from typing import Iterator, Optional
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Brand, category, typical amount. Brands are expanded into individual
+# merchant locations to reach the requested merchant cardinality.
+BRANDS = [
+    ('SHELL OIL', 'Gas', 45.0),
+    ('CHEVRON', 'Gas', 50.0),
+    ('EXXONMOBIL', 'Gas', 48.0),
+    ('STARBUCKS STORE', 'Coffee Shops', 6.5),
+    ('DUNKIN', 'Coffee Shops', 5.0),
+    ('MCDONALD\'S F', 'Fast Food', 11.0),
+    ('BURGER KING', 'Fast Food', 10.0),
+    ('TACO BELL', 'Fast Food', 9.0),
+    ('DOORDASH*', 'Food Delivery', 32.0),
+    ('UBER EATS', 'Food Delivery', 29.0),
+    ('WHOLEFDS MKT', 'Groceries', 85.0),
+    ('TRADER JOE\'S #', 'Groceries', 60.0),
+    ('KROGER', 'Groceries', 70.0),
+    ('SAFEWAY', 'Groceries', 65.0),
+    ('UBER *TRIP', 'Public Transit', 18.0),
+    ('LYFT *RIDE', 'Public Transit', 16.0),
+    ('MTA*NYCT PAYGO', 'Public Transit', 2.9),
+    ('AMZN MKTP US*', 'Shopping', 38.0),
+    ('TARGET', 'Shopping', 55.0),
+    ('WALMART', 'Shopping', 60.0),
+    ('CVS/PHARMACY #', 'Healthcare', 24.0),
+    ('WALGREENS #', 'Healthcare', 22.0),
+    ('AMC', 'Movies', 28.0),
+    ('STEAMGAMES.COM', 'Games', 25.0)
+]
+
+# Recurring charges: brand, category, amount
+SUBSCRIPTIONS = [
+    ('NETFLIX.COM', 'Movies', 15.49),
+    ('HULU', 'Movies', 7.99),
+    ('SPOTIFY USA', 'Music', 10.99),
+    ('PLAYSTATION NETWORK', 'Games', 9.99),
+    ('GEICO *AUTO', 'Car Insurance', 128.0),
+    ('PROGRESSIVE INS', 'Car Insurance', 112.0),
+    ('COMCAST CABLE', 'Utilities', 89.0),
+    ('CON EDISON', 'Utilities', 74.0),
+    ('PAYROLL ACME CORP', 'Income', 2450.0)
+]
+
+# Bank-feed decorations applied to noisy descriptions
+NOISE_PREFIXES = ['', 'POS DEBIT ', 'SQ *', 'TST* ', 'CHECKCARD ']
+NOISE_SUFFIXES = ['', ' CA', ' NY', ' TX', ' SAN FRANCISCO', ' 800-555-0199', ' ONLINE']
+
+SECONDS_PER_DAY = 24 * 3600
+
+# Resolution of the inverse-CDF tables used for weighted sampling
+SAMPLING_TABLE_SIZE = 2**20
+
+# Rows drawn from each random stream. Row i always comes from block
+# i // RNG_BLOCK_ROWS, whatever the chunk size
+RNG_BLOCK_ROWS = 10_000
+
+
+class SyntheticTransactionGenerator:
+    """
+    Streams realistic synthetic transactions in fixed-size chunks.
+
+    Every user has a spending scale, a set of favourite merchants, a
+    preferred time of day, a weekend bias and a few monthly recurring
+    charges. Descriptions carry bank-feed noise, and a small share of rows
+    are injected anomalies (outsized amounts at odd hours). Rows are drawn
+    in blocks of RNG_BLOCK_ROWS, each from its own seed, so row `i`
+    depends only on the seed, the generator parameters and `i`: any
+    `chunk_size` and any `n_rows` past `i` give the same row. Memory use is
+    bounded by `chunk_size`, however many rows are generated.
+
+    Columns match the `transactions` table reader: user_id, amount,
+    description, category, timestamp and type, plus `is_recurring` and
+    `is_anomaly` labels when `include_labels` is set.
+    """
+
+    def __init__(
+        self,
+        n_users: int = 10000,
+        n_merchants: int = 2000,
+        seed: int = 42,
+        start_date: str = '2023-01-01',
+        days: int = 365,
+        recurring_rate: float = 0.1,
+        anomaly_rate: float = 0.005,
+        noise_rate: float = 0.3,
+        unique_reference_rate: float = 0.0,
+        chunk_size: int = 1_000_000,
+        include_labels: bool = True
+    ):
+        """
+        Args:
+            n_users: Number of distinct users
+            n_merchants: Number of distinct merchant locations
+            seed: Random seed
+            start_date: First day of the generated period
+            days: Length of the generated period in days
+            recurring_rate: Share of rows that are recurring charges
+            anomaly_rate: Share of rows that are injected anomalies
+            noise_rate: Share of descriptions with bank-feed decorations
+            unique_reference_rate: Share of descriptions with a unique
+                reference number appended, which drives up cardinality
+            chunk_size: Rows per generated chunk
+            include_labels: Add `is_recurring` and `is_anomaly` columns
+        """
+        if n_users < 1 or n_merchants < len(BRANDS):
+            raise ValueError(f"Need at least 1 user and {len(BRANDS)} merchants")
+        for name, rate in [('recurring_rate', recurring_rate), ('anomaly_rate', anomaly_rate),
+                           ('noise_rate', noise_rate), ('unique_reference_rate', unique_reference_rate)]:
+            if not 0 <= rate <= 1:
+                raise ValueError(f"{name} must be between 0 and 1")
+
+        self.n_users = n_users
+        self.n_merchants = n_merchants
+        self.seed = seed
+        self.start = np.datetime64(start_date, 's')
+        self.days = days
+        self.recurring_rate = recurring_rate
+        self.anomaly_rate = anomaly_rate
+        self.noise_rate = noise_rate
+        self.unique_reference_rate = unique_reference_rate
+        self.chunk_size = chunk_size
+        self.include_labels = include_labels
+        self._build_catalogue()
+        self._build_users()
+
+    def _build_catalogue(self):
+        rng = np.random.default_rng([self.seed, 0])
+        brand = np.arange(self.n_merchants) % len(BRANDS)
+        store = rng.integers(100, 99999, self.n_merchants)
+        names = [f"{BRANDS[b][0]} {s}" if BRANDS[b][0][-1] not in '*#' else f"{BRANDS[b][0]}{s}"
+                 for b, s in zip(brand, store)]
+
+        # Every merchant gets a fixed set of noisy variants, so noise adds
+        # bounded cardinality unless unique references are requested.
+        # Descriptions are drawn as codes into this vocabulary.
+        self._variants = len(NOISE_PREFIXES) + 1
+        vocabulary = []
+        for name in names:
+            vocabulary.append(name)
+            for prefix in NOISE_PREFIXES:
+                suffix = NOISE_SUFFIXES[rng.integers(0, len(NOISE_SUFFIXES))]
+                vocabulary.append(f"{prefix}{name}{suffix}")
+        self._subscription_base = len(vocabulary)
+        vocabulary.extend(s[0] for s in SUBSCRIPTIONS)
+        self._vocabulary = np.array(vocabulary, dtype=object)
+
+        categories = sorted({b[1] for b in BRANDS} | {s[1] for s in SUBSCRIPTIONS})
+        category_code = {category: i for i, category in enumerate(categories)}
+        self._category_vocabulary = np.array(categories, dtype=object)
+        self._merchant_categories = np.array([category_code[BRANDS[b][1]] for b in brand], dtype=np.int32)
+        self._subscription_categories = np.array([category_code[s[1]] for s in SUBSCRIPTIONS], dtype=np.int32)
+        self._income_code = category_code['Income']
+
+        # Locations of a brand differ a little in typical ticket size
+        self._merchant_amounts = np.array([BRANDS[b][2] for b in brand]) * rng.lognormal(0, 0.15, self.n_merchants)
+        self._subscription_amounts = np.array([s[2] for s in SUBSCRIPTIONS])
+
+        # Merchant popularity follows a power law
+        popularity = 1.0 / np.arange(1, self.n_merchants + 1) ** 1.1
+        self._merchant_table = _sampling_table(rng.permutation(popularity))
+
+    def _build_users(self):
+        rng = np.random.default_rng([self.seed, 1])
+        n = self.n_users
+        self._user_ids = np.array([f"user_{i:07d}" for i in range(n)], dtype=object)
+        self._user_scale = rng.lognormal(0, 0.5, n)
+        self._user_offset = rng.integers(0, self.n_merchants, n)
+        self._user_hour = rng.normal(14, 3, n).clip(7, 22)
+        self._user_weekend_bias = rng.uniform(0.5, 2.0, n)
+        # Each user holds up to 4 subscriptions, billed on a fixed day
+        self._user_subscriptions = rng.integers(0, len(SUBSCRIPTIONS), (n, 4))
+        self._user_subscription_count = rng.integers(1, 5, n)
+        self._user_billing_day = rng.integers(0, 28, (n, 4))
+        # Users are not equally active
+        self._user_table = _sampling_table(rng.lognormal(0, 1.0, n))
+
+    def _columns(self, start: int, rows: int) -> dict:
+        """Columns of rows `start` to `start + rows`, cut from whole RNG blocks."""
+        first = start // RNG_BLOCK_ROWS
+        last = max(first, (start + rows - 1) // RNG_BLOCK_ROWS)
+        blocks = [self._block(index) for index in range(first, last + 1)]
+        offset = start - first * RNG_BLOCK_ROWS
+        return {
+            name: np.concatenate([block[name] for block in blocks])[offset:offset + rows]
+            if blocks[0][name] is not None else None
+            for name in blocks[0]
+        }
+
+    def _block(self, index: int) -> dict:
+        rng = np.random.default_rng([self.seed, 2, index])
+        rows = RNG_BLOCK_ROWS
+        user = self._user_table[rng.integers(0, len(self._user_table), rows)]
+        recurring = rng.random(rows) < self.recurring_rate
+        anomaly = ~recurring & (rng.random(rows) < self.anomaly_rate)
+
+        # Discretionary spending: favourite merchants are the head of the
+        # popularity distribution rotated by a per-user offset
+        merchant = self._merchant_table[rng.integers(0, len(self._merchant_table), rows)]
+        merchant = (merchant + self._user_offset[user]) % self.n_merchants
+        variant = np.where(rng.random(rows) < self.noise_rate, rng.integers(1, self._variants, rows), 0)
+        description = merchant * self._variants + variant
+        category = self._merchant_categories[merchant]
+        amount = self._merchant_amounts[merchant] * self._user_scale[user] * rng.lognormal(0, 0.35, rows)
+
+        # Day of the period; weekend days are moved to a weekday for users
+        # who mostly spend during the week
+        day = rng.integers(0, self.days, rows)
+        start_dow = (self.start.astype('datetime64[D]').view('int64') + 3) % 7  # 1970-01-01 was a Thursday
+        dow = (day + start_dow) % 7
+        moved = (dow >= 5) & (rng.random(rows) > self._user_weekend_bias[user] / 2)
+        day = np.where(moved, np.maximum(day - dow + rng.integers(0, 5, rows), 0), day)
+        hour = rng.normal(self._user_hour[user], 2.5).clip(0, 23.99)
+
+        # Recurring charges: same merchant, amount and day every month
+        slot = rng.integers(0, 4, rows) % self._user_subscription_count[user]
+        subscription = self._user_subscriptions[user, slot]
+        month = rng.integers(0, max(self.days // 30, 1), rows)
+        recurring_day = np.minimum(month * 30 + self._user_billing_day[user, slot], self.days - 1)
+        description = np.where(recurring, self._subscription_base + subscription, description)
+        category = np.where(recurring, self._subscription_categories[subscription], category)
+        amount = np.where(recurring, self._subscription_amounts[subscription], amount)
+        day = np.where(recurring, recurring_day, day)
+        hour = np.where(recurring, 6.0, hour)
+
+        # Anomalies: outsized amounts in the middle of the night
+        amount = np.where(anomaly, amount * rng.uniform(8, 40, rows), amount)
+        hour = np.where(anomaly, rng.uniform(1, 5, rows), hour)
+
+        # Reference number of each row, 0 for none
+        references = None
+        if self.unique_reference_rate:
+            references = np.where(
+                rng.random(rows) < self.unique_reference_rate,
+                rng.integers(10**9, 10**10, rows),
+                0
+            )
+
+        seconds = day * SECONDS_PER_DAY + (hour * 3600).astype(np.int64)
+        return {
+            'user': user,
+            'amount': np.round(amount, 2),
+            'description': description.astype(np.int32),
+            'category': category.astype(np.int32),
+            'timestamp': self.start + seconds.astype('timedelta64[s]'),
+            'recurring': recurring,
+            'anomaly': anomaly,
+            'references': references
+        }
+
+    def _descriptions(self, columns: dict) -> np.ndarray:
+        description = self._vocabulary[columns['description']]
+        if columns['references'] is not None:
+            unique = np.flatnonzero(columns['references'])
+            description[unique] = [
+                f"{d} REF{r}" for d, r in zip(description[unique], columns['references'][unique])
+            ]
+        return description
+
+    def _chunk(self, start: int, rows: int) -> pd.DataFrame:
+        columns = self._columns(start, rows)
+        frame = pd.DataFrame({
+            'user_id': self._user_ids[columns['user']],
+            'amount': columns['amount'],
+            'description': self._descriptions(columns),
+            'category': self._category_vocabulary[columns['category']],
+            'timestamp': columns['timestamp'],
+            'type': np.where(columns['category'] == self._income_code, 'income', 'expense')
+        })
+        if self.include_labels:
+            frame['is_recurring'] = columns['recurring']
+            frame['is_anomaly'] = columns['anomaly']
+        return frame
+
+    def _table(self, start: int, rows: int, vocabularies: dict):
+        # Strings are written as dictionary codes, which skips building
+        # millions of Python strings per chunk
+        import pyarrow as pa
+
+        columns = self._columns(start, rows)
+        if columns['references'] is not None:
+            description = pa.array(self._descriptions(columns), type=pa.string())
+        else:
+            description = pa.DictionaryArray.from_arrays(columns['description'], vocabularies['description'])
+        data = {
+            'user_id': pa.DictionaryArray.from_arrays(columns['user'].astype(np.int32), vocabularies['user_id']),
+            'amount': columns['amount'],
+            'description': description,
+            'category': pa.DictionaryArray.from_arrays(columns['category'], vocabularies['category']),
+            'timestamp': columns['timestamp'],
+            'type': pa.DictionaryArray.from_arrays(
+                (columns['category'] != self._income_code).astype(np.int32), vocabularies['type']
+            )
+        }
+        if self.include_labels:
+            data['is_recurring'] = columns['recurring']
+            data['is_anomaly'] = columns['anomaly']
+        return pa.table(data)
+
+    def iter_chunks(self, n_rows: int) -> Iterator[pd.DataFrame]:
+        """
+        Generate `n_rows` transactions as chunks of up to `chunk_size` rows.
+
+        Rows are not ordered by user or time across chunks.
+        """
+        for start in range(0, n_rows, self.chunk_size):
+            yield self._chunk(start, min(self.chunk_size, n_rows - start))
+
+    def generate(self, n_rows: int) -> pd.DataFrame:
+        """Generate `n_rows` transactions as one DataFrame."""
+        chunks = list(self.iter_chunks(n_rows))
+        if not chunks:
+            return self._chunk(0, 0)
+        return pd.concat(chunks, ignore_index=True)
+
+    def write(self, path: str, n_rows: int, file_format: Optional[str] = None) -> int:
+        """
+        Stream `n_rows` transactions to a CSV or Parquet file chunk by chunk.
+
+        Args:
+            path: Output file
+            n_rows: Number of transactions
+            file_format: 'csv' or 'parquet', inferred from the extension if None
+
+        Returns:
+            int: Number of rows written
+        """
+        file_format = file_format or os.path.splitext(path)[1].lstrip('.').lower()
+        if file_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unsupported output format: {file_format}")
+
+        import pyarrow as pa
+        if file_format == 'csv':
+            from pyarrow import csv as pa_csv
+        else:
+            import pyarrow.parquet as pq
+
+        vocabularies = {
+            'user_id': pa.array(self._user_ids, type=pa.string()),
+            'description': pa.array(self._vocabulary, type=pa.string()),
+            'category': pa.array(self._category_vocabulary, type=pa.string()),
+            'type': pa.array(['income', 'expense'])
+        }
+        written = 0
+        writer = None
+        start = time.perf_counter()
+        try:
+            for offset in range(0, n_rows, self.chunk_size):
+                table = self._table(offset, min(self.chunk_size, n_rows - offset), vocabularies)
+                if writer is None:
+                    writer = (pa_csv.CSVWriter(path, table.schema) if file_format == 'csv'
+                              else pq.ParquetWriter(path, table.schema))
+                writer.write_table(table)
+                written += table.num_rows
+        finally:
+            if writer is not None:
+                writer.close()
+
+        seconds = time.perf_counter() - start
+        logger.info(
+            f"Wrote {written} transactions to {path} in {seconds:.1f}s "
+            f"({written / seconds if seconds else 0:,.0f} rows/s)"
+        )
+        return written
+
+
+def _sampling_table(weights: np.ndarray) -> np.ndarray:
+    """
+    Build an inverse-CDF lookup table for drawing indices by weight.
+
+    Indexing the table with uniform integers samples in O(1) per draw,
+    which is much cheaper than a binary search over the CDF.
+    """
+    cdf = np.cumsum(weights) / np.sum(weights)
+    positions = (np.arange(SAMPLING_TABLE_SIZE) + 0.5) / SAMPLING_TABLE_SIZE
+    return np.minimum(np.searchsorted(cdf, positions), len(weights) - 1).astype(np.int32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('output', help='Output .csv or .parquet file')
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--merchants', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--start-date', default='2023-01-01')
+    parser.add_argument('--days', type=int, default=365)
+    parser.add_argument('--recurring-rate', type=float, default=0.1)
+    parser.add_argument('--anomaly-rate', type=float, default=0.005)
+    parser.add_argument('--noise-rate', type=float, default=0.3)
+    parser.add_argument('--unique-reference-rate', type=float, default=0.0)
+    parser.add_argument('--chunk-size', type=int, default=1_000_000)
+    parser.add_argument('--no-labels', action='store_true', help='Omit is_recurring/is_anomaly')
+    args = parser.parse_args()
+
+    generator = SyntheticTransactionGenerator(
+        n_users=args.users,
+        n_merchants=args.merchants,
+        seed=args.seed,
+        start_date=args.start_date,
+        days=args.days,
+        recurring_rate=args.recurring_rate,
+        anomaly_rate=args.anomaly_rate,
+        noise_rate=args.noise_rate,
+        unique_reference_rate=args.unique_reference_rate,
+        chunk_size=args.chunk_size,
+        include_labels=not args.no_labels
+    )
+    generator.write(args.output, args.rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,266 @@
+import os
+import uuid
+import sqlite3
+import logging
+from typing import Iterator, Optional, Union
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Rows are ordered by (user_id, date) so the scan follows
+# idx_transactions_user_id_date; user and date predicates are range
+# conditions on that index.
+TRANSACTIONS_QUERY = """
+    SELECT t.user_id, t.amount, t.description, c.name AS category,
+           t.date AS timestamp, t.type
+    FROM transactions t
+    LEFT JOIN categories c ON c.id = t.category_id
+    {where}
+    ORDER BY t.user_id, t.date
+"""
+
+COLUMN_DTYPES = {
+    'user_id': object,
+    'amount': np.float64,
+    'description': object,
+    'category': object,
+    'timestamp': 'datetime64[ns]',
+    'type': object
+}
+
+
+class TransactionSource:
+    """
+    Streams rows of the `transactions` table as typed DataFrame chunks.
+
+    Postgres is read through a server-side (named) cursor, so only one chunk
+    of rows is in client memory at a time and DECIMAL amounts are decoded
+    straight to floats. Any other DB-API connection, such as sqlite3 for
+    tests, is read with `fetchmany`.
+    """
+
+    def __init__(
+        self,
+        dsn: Optional[str] = None,
+        connection=None,
+        chunk_size: int = 50000,
+        user_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ):
+        """
+        Args:
+            dsn: Postgres connection string, defaults to DATABASE_URL
+            connection: An open DB-API connection to use instead of `dsn`
+            chunk_size: Rows per chunk
+            user_id: Default user filter
+            start_date: Default inclusive start date filter
+            end_date: Default inclusive end date filter
+        """
+        if connection is None and dsn is None:
+            dsn = os.environ.get('DATABASE_URL')
+        if connection is None and dsn is None:
+            raise ValueError("Either a dsn, DATABASE_URL or a connection is required")
+
+        self.dsn = dsn
+        self.connection = connection
+        self.chunk_size = chunk_size
+        self.user_id = user_id
+        self.start_date = start_date
+        self.end_date = end_date
+
+    def iter_chunks(
+        self,
+        user_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over transactions in typed chunks.
+
+        Filters that are not given fall back to the ones set on the source.
+
+        Args:
+            user_id: Only read this user's transactions
+            start_date: Inclusive start date
+            end_date: Inclusive end date
+
+        Yields:
+            pd.DataFrame: Up to `chunk_size` transactions with user_id,
+                amount, description, category, timestamp and type columns
+        """
+        user_id = user_id if user_id is not None else self.user_id
+        start_date = start_date if start_date is not None else self.start_date
+        end_date = end_date if end_date is not None else self.end_date
+
+        connection = self.connection or self._connect()
+        try:
+            query, params = self._build_query(connection, user_id, start_date, end_date)
+            cursor = self._cursor(connection)
+            try:
+                cursor.execute(query, params)
+                while True:
+                    rows = cursor.fetchmany(self.chunk_size)
+                    if not rows:
+                        break
+                    yield self._to_frame(rows)
+            finally:
+                cursor.close()
+        finally:
+            if self.connection is None:
+                connection.close()
+
+    def read(
+        self,
+        user_id: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None
+    ) -> pd.DataFrame:
+        """
+        Read all matching transactions into one DataFrame.
+
+        Args:
+            user_id: Only read this user's transactions
+            start_date: Inclusive start date
+            end_date: Inclusive end date
+
+        Returns:
+            pd.DataFrame: The matching transactions
+        """
+        chunks = list(self.iter_chunks(user_id, start_date, end_date))
+        if not chunks:
+            return self._to_frame([])
+        return pd.concat(chunks, ignore_index=True)
+
+    def _connect(self):
+        try:
+            import psycopg2
+            import psycopg2.extensions
+        except ImportError:
+            raise ImportError("psycopg2 is required to read transactions from Postgres")
+
+        connection = psycopg2.connect(self.dsn)
+        # Decode NUMERIC straight to float instead of Decimal objects
+        decimal_to_float = psycopg2.extensions.new_type(
+            psycopg2.extensions.DECIMAL.values,
+            'DECIMAL_TO_FLOAT',
+            lambda value, cursor: float(value) if value is not None else None
+        )
+        psycopg2.extensions.register_type(decimal_to_float, connection)
+        return connection
+
+    def _cursor(self, connection):
+        if isinstance(connection, sqlite3.Connection):
+            return connection.cursor()
+        # Named cursors are server-side in psycopg2. Names must be unique
+        # per connection, so sources sharing one can read concurrently.
+        cursor = connection.cursor(name=f"fintrack_transaction_source_{uuid.uuid4().hex}")
+        cursor.itersize = self.chunk_size
+        return cursor
+
+    def _build_query(self, connection, user_id, start_date, end_date):
+        placeholder = '?' if isinstance(connection, sqlite3.Connection) else '%s'
+        conditions = []
+        params = []
+        if user_id is not None:
+            conditions.append(f"t.user_id = {placeholder}")
+            params.append(str(user_id))
+        if start_date is not None:
+            conditions.append(f"t.date >= {placeholder}")
+            params.append(str(start_date))
+        if end_date is not None:
+            conditions.append(f"t.date <= {placeholder}")
+            params.append(str(end_date))
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        return TRANSACTIONS_QUERY.format(where=where), params
+
+    def _to_frame(self, rows) -> pd.DataFrame:
+        columns = list(zip(*rows)) if rows else [()] * len(COLUMN_DTYPES)
+        data = {}
+        for (name, dtype), values in zip(COLUMN_DTYPES.items(), columns):
+            if dtype == 'datetime64[ns]':
+                data[name] = pd.to_datetime(pd.Series(values, dtype=object)).astype(dtype)
+            elif dtype is object:
+                data[name] = pd.Series(
+                    [None if v is None else str(v) for v in values], dtype=object
+                )
+            else:
+                data[name] = pd.Series(np.array(values, dtype=dtype))
+        return pd.DataFrame(data)
+
+
+def load_transactions(source: Union[str, TransactionSource, pd.DataFrame]) -> pd.DataFrame:
+    """
+    Load training transactions from a CSV path or a TransactionSource.
+
+    Args:
+        source: Path to a CSV file, a TransactionSource, or transactions
+            already loaded, which are returned as they are
+
+    Returns:
+        pd.DataFrame: Transactions
+    """
+    if isinstance(source, pd.DataFrame):
+        return source
+    if isinstance(source, TransactionSource):
+        logger.info("Reading transactions from database...")
+        return source.read()
+    return pd.read_csv(source)
+
+
+def expense_transactions(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Keep only expenses.
+
+    Database rows hold unsigned amounts with a `type` of 'income' or
+    'expense', so totals must be taken over expenses alone. Frames without
+    a `type` column are taken to hold expenses only.
+
+    Args:
+        df: Transactions
+
+    Returns:
+        pd.DataFrame: The expense transactions
+    """
+    if 'type' not in df.columns:
+        return df
+    return df[df['type'] == 'expense']
+
+
+def daily_expense_totals(source: Union[str, TransactionSource, pd.DataFrame]) -> pd.Series:
+    """
+    Sum expenses per calendar day.
+
+    A TransactionSource is aggregated chunk by chunk, so the table is never
+    held in memory as one frame.
+
+    Args:
+        source: Path to a CSV file, a TransactionSource, or transactions
+            already loaded
+
+    Returns:
+        pd.Series: Expense totals indexed by every day from the first to
+            the last transaction, with 0 on days without expenses
+    """
+    if isinstance(source, TransactionSource):
+        chunks = source.iter_chunks()
+    else:
+        chunks = [load_transactions(source)]
+
+    totals = []
+    for chunk in chunks:
+        # Database sources name the date column `timestamp`
+        date_column = 'date' if 'date' in chunk.columns else 'timestamp'
+        # Database amounts are unsigned, so income must not be added in
+        chunk = expense_transactions(chunk)
+        dates = pd.to_datetime(chunk[date_column]).dt.normalize()
+        totals.append(chunk['amount'].groupby(dates.values).sum())
+
+    if not totals:
+        return pd.Series(dtype=np.float64, index=pd.DatetimeIndex([]))
+    daily = pd.concat(totals).groupby(level=0).sum()
+    return daily.resample('D').sum().fillna(0)
@@ -0,0 +1,24 @@
+from .spans import (
+    SpanRecorder,
+    collect_spans,
+    disable,
+    enable,
+    get_recorder,
+    instrumented,
+    is_enabled,
+    span
+)
+from .exporters import log_spans_to_mlflow, render_prometheus
+
+__all__ = [
+    'SpanRecorder',
+    'collect_spans',
+    'disable',
+    'enable',
+    'get_recorder',
+    'instrumented',
+    'is_enabled',
+    'span',
+    'log_spans_to_mlflow',
+    'render_prometheus'
+]
@@ -0,0 +1,85 @@
+import re
+import logging
+from typing import Optional
+from .spans import DURATION_BUCKETS, SpanRecorder, get_recorder
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_UNSAFE_METRIC_CHARS = re.compile(r'[^A-Za-z0-9_\-./ ]')
+
+
+def log_spans_to_mlflow(recorder: SpanRecorder, prefix: str = 'span', tracker=None) -> None:
+    """
+    Log aggregated spans as MLflow metrics of the active run.
+
+    Each span path gets `<prefix>/<path>/seconds`, and `rows`,
+    `rows_per_second` and `bytes` when those were recorded.
+
+    Args:
+        recorder: Recorder holding the spans
+        prefix: Metric name prefix
+        tracker: Logger with `log_metrics`, e.g. an AsyncRunLogger,
+            defaults to logging with mlflow directly
+    """
+    metrics = {}
+    for path, stats in recorder.summary().items():
+        name = _UNSAFE_METRIC_CHARS.sub('_', f"{prefix}/{path}")
+        metrics[f"{name}/seconds"] = stats['seconds']
+        if stats['calls'] > 1:
+            metrics[f"{name}/calls"] = stats['calls']
+        if stats['rows']:
+            metrics[f"{name}/rows"] = stats['rows']
+            metrics[f"{name}/rows_per_second"] = stats['rows_per_second']
+        if stats['bytes']:
+            metrics[f"{name}/bytes"] = stats['bytes']
+    if metrics:
+        if tracker is None:
+            import mlflow as tracker
+        tracker.log_metrics(metrics)
+
+
+def render_prometheus(recorder: Optional[SpanRecorder] = None, namespace: str = 'fintrack_ml') -> str:
+    """
+    Render spans in the Prometheus text exposition format.
+
+    Durations are a histogram labelled by span path; calls, rows and bytes
+    are counters.
+
+    Args:
+        recorder: Recorder holding the spans, defaults to the process-wide one
+        namespace: Metric name prefix
+
+    Returns:
+        str: Exposition text
+    """
+    recorder = recorder or get_recorder()
+    snapshot = recorder.snapshot()
+    lines = [
+        f"# HELP {namespace}_span_duration_seconds Time spent in instrumented spans",
+        f"# TYPE {namespace}_span_duration_seconds histogram"
+    ]
+    for path, stats in sorted(snapshot.items()):
+        label = _escape_label(path)
+        cumulative = 0
+        for bound, count in zip(DURATION_BUCKETS, stats.buckets):
+            cumulative += count
+            lines.append(f'{namespace}_span_duration_seconds_bucket{{span="{label}",le="{bound}"}} {cumulative}')
+        lines.append(f'{namespace}_span_duration_seconds_bucket{{span="{label}",le="+Inf"}} {stats.calls}')
+        lines.append(f'{namespace}_span_duration_seconds_sum{{span="{label}"}} {stats.seconds}')
+        lines.append(f'{namespace}_span_duration_seconds_count{{span="{label}"}} {stats.calls}')
+
+    for metric, attribute, help_text in [
+        ('span_rows_total', 'rows', 'Rows processed in instrumented spans'),
+        ('span_allocated_bytes_total', 'bytes', 'Net traced memory growth in instrumented spans')
+    ]:
+        lines.append(f"# HELP {namespace}_{metric} {help_text}")
+        lines.append(f"# TYPE {namespace}_{metric} counter")
+        for path, stats in sorted(snapshot.items()):
+            lines.append(f'{namespace}_{metric}{{span="{_escape_label(path)}"}} {getattr(stats, attribute)}')
+    return '\n'.join(lines) + '\n'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,242 @@
+import os
+import time
+import threading
+import functools
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, Optional
+
+# Upper bounds of span duration histogram buckets, in seconds
+DURATION_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0
+)
+
+
+class SpanStats:
+    """Aggregated timings of every span recorded under one path."""
+
+    __slots__ = ('calls', 'seconds', 'rows', 'bytes', 'buckets')
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def add(self, seconds: float, rows: Optional[int], allocated: Optional[int]) -> None:
+        self.calls += 1
+        self.seconds += seconds
+        self.rows += rows or 0
+        self.bytes += allocated or 0
+        for i, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def to_dict(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'seconds': self.seconds,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'rows_per_second': self.rows / self.seconds if self.seconds else 0.0
+        }
+
+
+class SpanRecorder:
+    """Thread-safe aggregation of finished spans keyed by span path."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record(self, path: str, seconds: float, rows: Optional[int], allocated: Optional[int]) -> None:
+        with self._lock:
+            stats = self._stats.get(path)
+            if stats is None:
+                stats = self._stats[path] = SpanStats()
+            stats.add(seconds, rows, allocated)
+
+    def snapshot(self) -> Dict[str, SpanStats]:
+        with self._lock:
+            snapshot = {}
+            for path, stats in self._stats.items():
+                copy = SpanStats()
+                copy.calls, copy.seconds, copy.rows, copy.bytes = stats.calls, stats.seconds, stats.rows, stats.bytes
+                copy.buckets = list(stats.buckets)
+                snapshot[path] = copy
+            return snapshot
+
+    def summary(self) -> Dict[str, Dict]:
+        return {path: stats.to_dict() for path, stats in self.snapshot().items()}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+
+
+# Process-wide recorder used by serving; off unless ML_INSTRUMENTATION is set
+_global_recorder = SpanRecorder()
+_global_enabled = os.environ.get('ML_INSTRUMENTATION', '0').lower() in ('1', 'true', 'yes')
+_track_memory = os.environ.get('ML_INSTRUMENTATION_MEMORY', '0').lower() in ('1', 'true', 'yes')
+
+# Recorders opened with `collect_spans` and the path of the enclosing spans
+_scoped_recorders = ContextVar('scoped_recorders', default=())
+_span_path = ContextVar('span_path', default=())
+
+
+class Span:
+    """A running timing span. Use `set_rows` once the row count is known."""
+
+    __slots__ = ('name', 'rows', '_recorders', '_token', '_path', '_start', '_memory_start')
+
+    def __init__(self, name: str, rows: Optional[int], recorders: tuple):
+        self.name = name
+        self.rows = rows
+        self._recorders = recorders
+
+    def set_rows(self, rows: int) -> None:
+        self.rows = rows
+
+    def __enter__(self) -> 'Span':
+        self._path = _span_path.get() + (self.name,)
+        self._token = _span_path.set(self._path)
+        self._memory_start = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        seconds = time.perf_counter() - self._start
+        allocated = None
+        if self._memory_start is not None and tracemalloc.is_tracing():
+            # Net growth of traced (Python and numpy) memory over the span
+            allocated = max(tracemalloc.get_traced_memory()[0] - self._memory_start, 0)
+        _span_path.reset(self._token)
+        path = '/'.join(self._path)
+        for recorder in self._recorders:
+            recorder.record(path, seconds, self.rows, allocated)
+
+
+class _NoopSpan:
+    """Stand-in returned while instrumentation is off."""
+
+    __slots__ = ()
+
+    def set_rows(self, rows: int) -> None:
+        pass
+
+    def __enter__(self) -> '_NoopSpan':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+def span(name: str, rows: Optional[int] = None):
+    """
+    Time a block as a span nested under any enclosing spans.
+
+        with span('clean', rows=len(df)):
+            df = cleaner.clean(df)
+
+    With instrumentation off and no `collect_spans` scope open, this returns
+    a shared no-op, so the cost is one function call.
+
+    Args:
+        name: Span name, joined with enclosing span names into its path
+        rows: Rows processed, if known up front
+
+    Returns:
+        A context manager
+    """
+    recorders = _scoped_recorders.get()
+    if _global_enabled:
+        recorders = recorders + (_global_recorder,)
+    if not recorders:
+        return _NOOP_SPAN
+    return Span(name, rows, recorders)
+
+
+def instrumented(name: Optional[str] = None):
+    """
+    Decorate a method to run inside a span.
+
+    Rows are taken from the length of the first argument after `self`
+    when it has one, which fits `predict(X)`-style methods.
+
+    Args:
+        name: Span name, defaults to the method's qualified name
+    """
+    def decorator(fn: Callable) -> Callable:
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _global_enabled and not _scoped_recorders.get():
+                return fn(*args, **kwargs)
+            rows = None
+            if len(args) > 1 and hasattr(args[1], '__len__') and not isinstance(args[1], str):
+                rows = len(args[1])
+            with span(span_name, rows=rows):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect_spans(track_memory: Optional[bool] = None) -> Iterator[SpanRecorder]:
+    """
+    Record spans opened in this context into a fresh recorder.
+
+    Used by trainers to gather the spans of one run whether or not
+    process-wide instrumentation is on.
+
+    Args:
+        track_memory: Trace allocations to report bytes per span, defaults
+            to ML_INSTRUMENTATION_MEMORY. Tracing slows allocation-heavy
+            code noticeably.
+
+    Yields:
+        SpanRecorder: The recorder spans are collected into
+    """
+    recorder = SpanRecorder()
+    track_memory = _track_memory if track_memory is None else track_memory
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    token = _scoped_recorders.set(_scoped_recorders.get() + (recorder,))
+    try:
+        yield recorder
+    finally:
+        _scoped_recorders.reset(token)
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def enable(track_memory: bool = False) -> None:
+    """Turn on the process-wide recorder."""
+    global _global_enabled
+    _global_enabled = True
+    if track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable() -> None:
+    """Turn off the process-wide recorder."""
+    global _global_enabled
+    _global_enabled = False
+
+
+def is_enabled() -> bool:
+    return _global_enabled
+
+
+def get_recorder() -> SpanRecorder:
+    """Get the process-wide recorder."""
+    return _global_recorder
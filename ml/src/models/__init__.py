@@ -1,29 +1,62 @@
 # src/models/__init__.py
 import os
-import requests
-import torch
+import shutil
+import tarfile
+import importlib
 from pathlib import Path
-from tqdm import tqdm
+from typing import TYPE_CHECKING
 import logging
-from .transaction_categorizer import TransactionCategorizer
-from .anomaly_detector import AnomalyDetector
-from .expense_forecaster import ExpenseForecaster
-from .pattern_analyzer import PatternAnalyzer
+
+if TYPE_CHECKING:
+    from .transaction_categorizer import TransactionCategorizer, OnnxTransactionCategorizer
+    from .cascade_categorizer import CascadeCategorizer, LinearTextCategorizer
+    from .merchant_matcher import MerchantMatcher
+    from .anomaly_detector import AnomalyDetector
+    from .expense_forecaster import ExpenseForecaster
+    from .pattern_analyzer import PatternAnalyzer
+    from .bundle import ModelBundle, load_bundle, save_bundle
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Model classes are imported on first access, so torch, transformers and
+# TensorFlow load only when a model that needs them is used
+_LAZY_ATTRIBUTES = {
+    'TransactionCategorizer': '.transaction_categorizer',
+    'OnnxTransactionCategorizer': '.transaction_categorizer',
+    'CascadeCategorizer': '.cascade_categorizer',
+    'LinearTextCategorizer': '.cascade_categorizer',
+    'MerchantMatcher': '.merchant_matcher',
+    'AnomalyDetector': '.anomaly_detector',
+    'ExpenseForecaster': '.expense_forecaster',
+    'PatternAnalyzer': '.pattern_analyzer',
+    'ModelBundle': '.bundle',
+    'load_bundle': '.bundle',
+    'save_bundle': '.bundle'
+}
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
 # Define model URLs and file paths
 MODEL_URLS = {
-    'transaction_categorizer': 'https://fintrack-models.s3.amazonaws.com/models/transaction_categorizer.pt',
+    'transaction_categorizer': 'https://fintrack-models.s3.amazonaws.com/models/transaction_categorizer.tar.gz',
     'anomaly_detector': 'https://fintrack-models.s3.amazonaws.com/models/anomaly_detector.joblib',
     'expense_forecaster': 'https://fintrack-models.s3.amazonaws.com/models/expense_forecaster.h5',
     'pattern_analyzer': 'https://fintrack-models.s3.amazonaws.com/models/pattern_analyzer.joblib'
 }
 
 MODEL_PATHS = {
-    'transaction_categorizer': 'models/transaction_categorizer.pt',
+    'transaction_categorizer': 'models/transaction_categorizer',
     'anomaly_detector': 'models/anomaly_detector.joblib',
     'expense_forecaster': 'models/expense_forecaster.h5',
     'pattern_analyzer': 'models/pattern_analyzer.joblib'
@@ -38,6 +71,9 @@ def download_file(url: str, destination: str, chunk_size: int = 8192) -> None:
         destination (str): Local path to save the file
         chunk_size (int): Size of chunks to download
     """
+    import requests
+    from tqdm import tqdm
+
     try:
         response = requests.get(url, stream=True)
         response.raise_for_status()
@@ -66,6 +102,45 @@ def download_file(url: str, destination: str, chunk_size: int = 8192) -> None:
         logger.error(f"Error downloading {url}: {str(e)}")
         raise
 
+def extract_archive(archive: tarfile.TarFile, destination: str) -> None:
+    """
+    Extract a tar archive, refusing members that would land outside it.
+    
+    Python 3.9 has no extraction filters, so every member is checked before
+    anything is written: its path, and a link's target, must resolve under
+    `destination`, and only regular files, directories and links are
+    accepted.
+    
+    Args:
+        archive: Open tar archive
+        destination: Directory to extract into
+        
+    Raises:
+        ValueError: If a member is unsafe to extract
+    """
+    root = os.path.realpath(destination)
+    
+    def inside(path: str) -> bool:
+        path = os.path.realpath(path)
+        return path == root or path.startswith(root + os.sep)
+    
+    members = archive.getmembers()
+    for member in members:
+        target = os.path.join(root, member.name)
+        if not inside(target):
+            raise ValueError(f"Archive member {member.name} is outside {destination}")
+        if member.issym():
+            link = os.path.join(os.path.dirname(target), member.linkname)
+        elif member.islnk():
+            link = os.path.join(root, member.linkname)
+        elif member.isfile() or member.isdir():
+            continue
+        else:
+            raise ValueError(f"Archive member {member.name} is not a file, directory or link")
+        if not inside(link):
+            raise ValueError(f"Archive link {member.name} points outside {destination}")
+    archive.extractall(root, members=members)
+
 def verify_model_file(file_path: str, min_size_bytes: int = 1000) -> bool:
     """
     Verify if a model file exists and has a minimum size.
@@ -80,7 +155,12 @@ def verify_model_file(file_path: str, min_size_bytes: int = 1000) -> bool:
     path = Path(file_path)
     if not path.exists():
         return False
-    if path.stat().st_size < min_size_bytes:
+    if path.is_dir():
+        # Directory artifacts, e.g. the categorizer, are checked as a whole
+        size = sum(f.stat().st_size for f in path.iterdir() if f.is_file())
+    else:
+        size = path.stat().st_size
+    if size < min_size_bytes:
         logger.warning(f"Model file {file_path} is smaller than expected")
         return False
     return True
@@ -96,24 +176,28 @@ def load_models():
     try:
         # Load transaction categorizer
         if verify_model_file(MODEL_PATHS['transaction_categorizer']):
+            from .transaction_categorizer import TransactionCategorizer
             models['transaction_categorizer'] = TransactionCategorizer.load(
                 MODEL_PATHS['transaction_categorizer']
             )
         
         # Load anomaly detector
         if verify_model_file(MODEL_PATHS['anomaly_detector']):
+            from .anomaly_detector import AnomalyDetector
             models['anomaly_detector'] = AnomalyDetector.load(
                 MODEL_PATHS['anomaly_detector']
             )
         
         # Load expense forecaster
         if verify_model_file(MODEL_PATHS['expense_forecaster']):
+            from .expense_forecaster import ExpenseForecaster
             models['expense_forecaster'] = ExpenseForecaster.load(
                 MODEL_PATHS['expense_forecaster']
             )
         
         # Load pattern analyzer
         if verify_model_file(MODEL_PATHS['pattern_analyzer']):
+            from .pattern_analyzer import PatternAnalyzer
             models['pattern_analyzer'] = PatternAnalyzer.load(
                 MODEL_PATHS['pattern_analyzer']
             )
@@ -143,7 +227,15 @@ def download_models(force: bool = False) -> None:
             
             if force or not verify_model_file(file_path):
                 logger.info(f"Downloading {model_name} model...")
-                download_file(url, file_path)
+                if url.endswith('.tar.gz'):
+                    # Directory artifacts are shipped as archives
+                    archive_path = f"{file_path}.tar.gz"
+                    download_file(url, archive_path)
+                    with tarfile.open(archive_path) as archive:
+                        extract_archive(archive, file_path)
+                    os.remove(archive_path)
+                else:
+                    download_file(url, file_path)
             else:
                 logger.info(f"{model_name} model already exists")
         
@@ -159,7 +251,10 @@ def cleanup_models() -> None:
     """
     try:
         for file_path in MODEL_PATHS.values():
-            if os.path.exists(file_path):
+            if os.path.isdir(file_path):
+                shutil.rmtree(file_path)
+                logger.info(f"Removed {file_path}")
+            elif os.path.exists(file_path):
                 os.remove(file_path)
                 logger.info(f"Removed {file_path}")
         
@@ -193,9 +288,16 @@ def get_models():
 # Export classes and functions
 __all__ = [
     'TransactionCategorizer',
+    'OnnxTransactionCategorizer',
+    'CascadeCategorizer',
+    'LinearTextCategorizer',
+    'MerchantMatcher',
     'AnomalyDetector',
     'ExpenseForecaster',
     'PatternAnalyzer',
+    'ModelBundle',
+    'load_bundle',
+    'save_bundle',
     'download_models',
     'load_models',
     'cleanup_models',
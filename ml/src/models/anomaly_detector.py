@@ -1,22 +1,169 @@
+import numpy as np
+import pandas as pd
 from sklearn.ensemble import IsolationForest
 import joblib
+from ..instrumentation import instrumented
 
 class AnomalyDetector:
-    def __init__(self, contamination=0.1):
-        self.model = IsolationForest(contamination=contamination, random_state=42)
-        
-    def fit(self, X):
+    """
+    IsolationForest detector that can be retrained on a sliding window.
+
+    `fit` trains the whole ensemble on one window of data. `update` then
+    warm-starts the forest to add `trees_per_window` trees fitted on the
+    newest window only, and retires the oldest trees beyond
+    `max_estimators`, so each retrain costs one window rather than the
+    full history. The window each tree was fitted on is kept in
+    `tree_windows` and saved with the model.
+
+    The forest's per-tree seeds are kept aligned with its trees, so
+    `estimators_samples_` has one entry per tree. Those indices are drawn
+    over the rows of the last window fitted, so they are only the real
+    in-bag rows for trees of that window.
+    """
+
+    def __init__(self, contamination=0.1, n_estimators=100, max_samples='auto',
+                 random_state=42, trees_per_window=10, max_estimators=None):
+        self.model = IsolationForest(
+            contamination=contamination,
+            n_estimators=n_estimators,
+            max_samples=max_samples,
+            random_state=random_state
+        )
+        self.trees_per_window = trees_per_window
+        self.max_estimators = max_estimators or n_estimators
+        self.feature_names = None
+        self.windows = []
+        self.tree_windows = []
+
+    def fit(self, X, start=None, end=None):
+        self.feature_names = list(X.columns) if isinstance(X, pd.DataFrame) else None
+        self.model.warm_start = False
         self.model.fit(X)
+        self.windows = []
+        self.tree_windows = [self._add_window(start, end, len(X))] * len(self.model.estimators_)
         return self
-        
+
+    def update(self, X, start=None, end=None, n_trees=None):
+        """
+        Add trees fitted on a new window and retire the oldest ones.
+
+        Columns are aligned to those seen by `fit`; features the model has
+        never seen are dropped and missing ones are zero. New trees draw the
+        same number of samples as those from `fit`, so all trees score on
+        one path length scale; a window with fewer rows than that is
+        rejected. The contamination threshold is re-estimated on the new
+        window.
+
+        Args:
+            X: Features of the newest window
+            start: Start of the window, e.g. its first timestamp
+            end: End of the window
+            n_trees: Trees to add, defaults to `trees_per_window`
+
+        Returns:
+            self
+
+        Raises:
+            ValueError: If the window has fewer rows than each tree samples
+        """
+        if not hasattr(self.model, 'estimators_'):
+            return self.fit(X, start, end)
+        X = self._align(X)
+        max_samples = self.model.max_samples_
+        if len(X) < max_samples:
+            raise ValueError(
+                f"Window has {len(X)} rows but each tree samples {max_samples}"
+            )
+        n_trees = n_trees or self.trees_per_window
+        window = self._add_window(start, end, len(X))
+
+        # A fit recomputes max_samples_ from the window for 'auto' or float
+        # max_samples, which would change the normalisation of the old trees
+        params = {'max_samples': self.model.max_samples}
+        # A warm-start fit only keeps the seeds of the trees it adds
+        seeds = self.model._seeds
+        self.model.warm_start = True
+        self.model.max_samples = max_samples
+        self.model.n_estimators = len(self.model.estimators_) + n_trees
+        try:
+            self.model.fit(X)
+        finally:
+            self.model.warm_start = False
+            self.model.set_params(**params)
+        self.model._seeds = np.concatenate([seeds, self.model._seeds])
+        self.tree_windows = self.tree_windows + [window] * n_trees
+        self._retire()
+
+        if self.model.contamination != 'auto':
+            self.model.offset_ = np.percentile(
+                self.model.score_samples(X), 100.0 * self.model.contamination
+            )
+        return self
+
+    def _retire(self):
+        drop = len(self.model.estimators_) - self.max_estimators
+        if drop <= 0:
+            return
+        model = self.model
+        model.estimators_ = model.estimators_[drop:]
+        model.estimators_features_ = model.estimators_features_[drop:]
+        model._seeds = model._seeds[drop:]
+        model._average_path_length_per_tree = model._average_path_length_per_tree[drop:]
+        model._decision_path_lengths = model._decision_path_lengths[drop:]
+        model.n_estimators = len(model.estimators_)
+        self.tree_windows = self.tree_windows[drop:]
+        live = set(self.tree_windows)
+        self.windows = [window for window in self.windows if window['id'] in live]
+
+    def _add_window(self, start, end, rows):
+        window_id = self.windows[-1]['id'] + 1 if self.windows else 0
+        self.windows.append({
+            'id': window_id,
+            'start': None if start is None else str(start),
+            'end': None if end is None else str(end),
+            'rows': rows
+        })
+        return window_id
+
+    def _align(self, X):
+        if self.feature_names is None or not isinstance(X, pd.DataFrame):
+            return X
+        if list(X.columns) == self.feature_names:
+            return X
+        return X.reindex(columns=self.feature_names, fill_value=0)
+
+    @instrumented('anomaly_detector.predict')
     def predict(self, X):
-        return self.model.predict(X)
-    
+        return self.model.predict(self._align(X))
+
+    @instrumented('anomaly_detector.score_samples')
+    def score_samples(self, X):
+        return self.model.score_samples(self._align(X))
+
     def save(self, path):
-        joblib.dump(self.model, path)
-    
+        joblib.dump({
+            'model': self.model,
+            'feature_names': self.feature_names,
+            'windows': self.windows,
+            'tree_windows': self.tree_windows,
+            'trees_per_window': self.trees_per_window,
+            'max_estimators': self.max_estimators
+        }, path)
+
     @classmethod
     def load(cls, path):
         detector = cls()
-        detector.model = joblib.load(path)
-        return detector
\ No newline at end of file
+        saved = joblib.load(path)
+        if isinstance(saved, IsolationForest):
+            # Artifacts saved before windows were tracked hold the bare forest
+            detector.model = saved
+            detector.max_estimators = saved.n_estimators
+            detector.tree_windows = [None] * len(getattr(saved, 'estimators_', []))
+            return detector
+        detector.model = saved['model']
+        detector.feature_names = saved['feature_names']
+        detector.windows = saved['windows']
+        detector.tree_windows = saved['tree_windows']
+        detector.trees_per_window = saved['trees_per_window']
+        detector.max_estimators = saved['max_estimators']
+        return detector
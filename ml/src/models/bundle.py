@@ -0,0 +1,496 @@
+import os
+import sys
+import json
+import mmap
+import time
+import struct
+import hashlib
+import logging
+from collections import namedtuple
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BUNDLE_MAGIC = b'FTBUNDLE'
+BUNDLE_FORMAT_VERSION = 1
+# Array offsets are multiples of this, so memory-mapped views are aligned
+ALIGNMENT = 64
+# Magic, format version, manifest length, data offset
+_HEADER = struct.Struct('<8sIQQ')
+
+ModelBundle = namedtuple('ModelBundle', ['model', 'pipeline', 'scaler', 'patterns', 'manifest'])
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is malformed, corrupted or of an unknown version."""
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_bundle(
+    path: str,
+    kind: str,
+    arrays: Dict[str, np.ndarray],
+    objects: Dict[str, Any],
+    metadata: Optional[Dict] = None
+) -> Dict:
+    """
+    Write arrays and JSON objects to a single bundle file.
+
+    The file is a fixed header, a JSON manifest and the raw arrays, each
+    uncompressed, in native little-endian layout and aligned to
+    ALIGNMENT bytes. The manifest lists every array's offset, dtype, shape
+    and SHA-256. The file is written next to `path` and moved into place,
+    so readers never see a partial bundle.
+
+    Args:
+        path: Bundle path
+        kind: Model kind, used by `load_bundle` to rebuild the model
+        arrays: Numeric arrays by name
+        objects: JSON-serializable values by name
+        metadata: Free-form JSON metadata, e.g. training parameters
+
+    Returns:
+        Dict: The manifest
+    """
+    layout = {}
+    offset = 0
+    prepared = {}
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        if array.dtype.kind not in 'biufS':
+            raise BundleError(f"Array {name} has unsupported dtype {array.dtype}")
+        if array.dtype.byteorder == '>':
+            array = array.astype(array.dtype.newbyteorder('<'))
+        offset = _align(offset)
+        layout[name] = {
+            'offset': offset,
+            'dtype': array.dtype.str,
+            'shape': list(array.shape),
+            'nbytes': array.nbytes,
+            'sha256': hashlib.sha256(memoryview(array).cast('B')).hexdigest()
+        }
+        prepared[name] = array
+        offset += array.nbytes
+
+    manifest = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'kind': kind,
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'versions': _library_versions(),
+        'arrays': layout,
+        'objects': objects,
+        'metadata': metadata or {}
+    }
+    manifest_bytes = json.dumps(manifest, default=_json_default).encode()
+    data_offset = _align(_HEADER.size + len(manifest_bytes))
+
+    tmp_path = f"{path}.tmp"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(tmp_path, 'wb') as f:
+        f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_FORMAT_VERSION, len(manifest_bytes), data_offset))
+        f.write(manifest_bytes)
+        for name, array in prepared.items():
+            f.write(b'\0' * (data_offset + layout[name]['offset'] - f.tell()))
+            f.write(memoryview(array).cast('B'))
+    os.replace(tmp_path, path)
+    logger.info(f"Bundle written to {path}: {len(arrays)} arrays, {offset} bytes")
+    return manifest
+
+
+class Bundle:
+    """
+    Read-only view of a bundle file.
+
+    The file is memory-mapped once and `array` returns views into the map,
+    so arrays are neither read nor copied until they're used.
+    """
+
+    def __init__(self, path: str, verify: bool = True):
+        """
+        Args:
+            path: Bundle path
+            verify: Check every array's checksum on open
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < _HEADER.size:
+            raise BundleError(f"{path} is not a model bundle")
+        magic, version, manifest_length, self._data_offset = _HEADER.unpack_from(self._mmap, 0)
+        if magic != BUNDLE_MAGIC:
+            raise BundleError(f"{path} is not a model bundle")
+        if version > BUNDLE_FORMAT_VERSION:
+            raise BundleError(f"{path} has bundle format {version}, newer than {BUNDLE_FORMAT_VERSION}")
+        self.manifest = json.loads(self._mmap[_HEADER.size:_HEADER.size + manifest_length])
+        for name, entry in self.manifest['arrays'].items():
+            if self._data_offset + entry['offset'] + entry['nbytes'] > len(self._mmap):
+                raise BundleError(f"{path} is truncated: array {name} is incomplete")
+        if verify:
+            self.verify()
+
+    @property
+    def kind(self) -> str:
+        return self.manifest['kind']
+
+    @property
+    def objects(self) -> Dict[str, Any]:
+        return self.manifest['objects']
+
+    def array(self, name: str) -> np.ndarray:
+        """Get a read-only array view into the mapped file."""
+        entry = self.manifest['arrays'][name]
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        array = np.frombuffer(
+            self._mmap, dtype=dtype, count=count, offset=self._data_offset + entry['offset']
+        )
+        return array.reshape(entry['shape'])
+
+    def verify(self) -> None:
+        """
+        Check every array against its manifest checksum.
+
+        Raises:
+            BundleError: If an array doesn't match
+        """
+        view = memoryview(self._mmap)
+        for name, entry in self.manifest['arrays'].items():
+            start = self._data_offset + entry['offset']
+            digest = hashlib.sha256(view[start:start + entry['nbytes']]).hexdigest()
+            if digest != entry['sha256']:
+                raise BundleError(f"{self.path} is corrupted: checksum mismatch in {name}")
+        view.release()
+
+
+def read_manifest(path: str) -> Dict:
+    """Read a bundle's manifest without verifying its arrays."""
+    return Bundle(path, verify=False).manifest
+
+
+def save_bundle(
+    path: str,
+    model,
+    pipeline=None,
+    scaler=None,
+    patterns: Optional[List[Dict]] = None,
+    metadata: Optional[Dict] = None
+) -> Dict:
+    """
+    Save a trained model with its preprocessing state as one bundle.
+
+    Args:
+        path: Bundle path
+        model: Trained AnomalyDetector or PatternAnalyzer
+        pipeline: Fitted PreprocessingPipeline whose statistics to include
+        scaler: Fitted StandardScaler applied to the features
+        patterns: Patterns found at training time
+        metadata: Free-form JSON metadata, e.g. training parameters
+
+    Returns:
+        Dict: The manifest
+    """
+    from .anomaly_detector import AnomalyDetector
+    from .pattern_analyzer import PatternAnalyzer
+
+    arrays, objects = {}, {}
+    if isinstance(model, AnomalyDetector):
+        kind = 'anomaly_detector'
+        _pack_forest(model, arrays, objects)
+    elif isinstance(model, PatternAnalyzer):
+        kind = 'pattern_analyzer'
+        objects['dbscan_params'] = model.model.get_params()
+    else:
+        raise BundleError(f"Can't bundle a {type(model).__name__}")
+    if pipeline is not None:
+        _pack_pipeline(pipeline, arrays, objects)
+    if scaler is not None:
+        _pack_scaler(scaler, arrays, objects)
+    if patterns is not None:
+        objects['patterns'] = [
+            {**pattern, 'frequency': pd.Timedelta(pattern['frequency']).total_seconds()
+             if pd.notna(pattern['frequency']) else None}
+            for pattern in patterns
+        ]
+    return write_bundle(path, kind, arrays, objects, metadata)
+
+
+def load_bundle(path: str, verify: bool = True) -> ModelBundle:
+    """
+    Load a bundle as a ready-to-serve model with its exact preprocessing.
+
+    Tree and scaler arrays stay memory-mapped rather than being copied, so
+    loading is fast and processes loading the same bundle share its pages.
+    An anomaly detector's forest is served by FlatIsolationForest, which
+    scores like the original IsolationForest.
+
+    Args:
+        path: Bundle path
+        verify: Check array checksums first
+
+    Returns:
+        ModelBundle: Model, pipeline, scaler and patterns, each None when
+            not bundled, and the manifest
+    """
+    from .anomaly_detector import AnomalyDetector
+    from .pattern_analyzer import PatternAnalyzer
+
+    bundle = Bundle(path, verify=verify)
+    objects = bundle.objects
+    if bundle.kind == 'anomaly_detector':
+        model = AnomalyDetector()
+        model.model = FlatIsolationForest.from_bundle(bundle)
+        model.feature_names = objects['forest']['feature_names']
+        model.windows = objects['forest']['windows']
+        model.tree_windows = objects['forest']['tree_windows']
+        model.max_estimators = len(model.tree_windows)
+    elif bundle.kind == 'pattern_analyzer':
+        model = PatternAnalyzer()
+        model.model.set_params(**objects['dbscan_params'])
+    else:
+        raise BundleError(f"{path} holds an unknown model kind: {bundle.kind}")
+
+    pipeline = _unpack_pipeline(bundle) if 'pipeline' in objects else None
+    scaler = _unpack_scaler(bundle) if 'scaler' in objects else None
+    patterns = objects.get('patterns')
+    if patterns is not None:
+        patterns = [
+            {**pattern, 'frequency': pd.Timedelta(seconds=pattern['frequency'])
+             if pattern['frequency'] is not None else pd.NaT}
+            for pattern in patterns
+        ]
+    return ModelBundle(model, pipeline, scaler, patterns, bundle.manifest)
+
+
+class FlatIsolationForest:
+    """
+    IsolationForest scoring over flat node arrays.
+
+    All trees are concatenated into one set of node arrays, which can be
+    views into a memory-mapped bundle. Each leaf holds its depth plus the
+    average path length of its remaining samples, as precomputed by
+    IsolationForest, so scores equal `IsolationForest.score_samples`.
+    """
+
+    def __init__(self, feature, threshold, missing_left, left, right, leaf_value,
+                 roots, max_depth, denominator, offset):
+        self.feature = feature
+        self.threshold = threshold
+        self.missing_left = missing_left
+        self.left = left
+        self.right = right
+        self.leaf_value = leaf_value
+        self.roots = roots
+        self.max_depth = max_depth
+        self.denominator = denominator
+        self.offset_ = offset
+
+    @classmethod
+    def from_bundle(cls, bundle: Bundle) -> 'FlatIsolationForest':
+        forest = bundle.objects['forest']
+        return cls(
+            bundle.array('forest/feature'),
+            bundle.array('forest/threshold'),
+            bundle.array('forest/missing_left'),
+            bundle.array('forest/left'),
+            bundle.array('forest/right'),
+            bundle.array('forest/leaf_value'),
+            bundle.array('forest/roots'),
+            forest['max_depth'],
+            forest['denominator'],
+            forest['offset']
+        )
+
+    def score_samples(self, X) -> np.ndarray:
+        # Trees compare float32 features, as sklearn's do
+        X = np.asarray(X, dtype=np.float32)
+        rows = np.arange(len(X))
+        depths = np.zeros(len(X), dtype=np.float64)
+        for root in self.roots:
+            node = np.full(len(X), root, dtype=np.int64)
+            for _ in range(self.max_depth):
+                left = self.left[node]
+                internal = left >= 0
+                if not internal.any():
+                    break
+                values = X[rows, self.feature[node]]
+                # Missing values follow the side the tree learned for them
+                go_left = np.where(
+                    np.isnan(values), self.missing_left[node], values <= self.threshold[node]
+                )
+                node = np.where(internal, np.where(go_left, left, self.right[node]), node)
+            depths += self.leaf_value[node]
+        return -(2 ** (-depths / self.denominator))
+
+    def decision_function(self, X) -> np.ndarray:
+        return self.score_samples(X) - self.offset_
+
+    def predict(self, X) -> np.ndarray:
+        return np.where(self.decision_function(X) < 0, -1, 1)
+
+
+def _pack_forest(detector, arrays: Dict, objects: Dict) -> None:
+    from sklearn.ensemble._iforest import _average_path_length
+
+    forest = detector.model
+    n_features = forest.n_features_in_
+    subsample_features = forest._max_features != n_features
+    features, thresholds, missing_left = [], [], []
+    lefts, rights, leaf_values, roots = [], [], [], []
+    base = 0
+    max_depth = 0
+    for i, (estimator, estimator_features) in enumerate(
+        zip(forest.estimators_, forest.estimators_features_)
+    ):
+        tree = estimator.tree_
+        is_leaf = tree.children_left < 0
+        feature = np.where(is_leaf, 0, tree.feature)
+        if subsample_features:
+            # Trees split on columns of their own feature subset
+            feature = np.asarray(estimator_features)[feature]
+        features.append(feature.astype(np.int32))
+        thresholds.append(tree.threshold)
+        missing_left.append(tree.missing_go_to_left.astype(bool))
+        lefts.append(np.where(is_leaf, -1, tree.children_left + base))
+        rights.append(np.where(is_leaf, -1, tree.children_right + base))
+        leaf_values.append(
+            forest._decision_path_lengths[i] + forest._average_path_length_per_tree[i] - 1.0
+        )
+        roots.append(base)
+        base += tree.node_count
+        max_depth = max(max_depth, tree.max_depth)
+
+    arrays['forest/feature'] = np.concatenate(features)
+    arrays['forest/threshold'] = np.concatenate(thresholds).astype(np.float64)
+    arrays['forest/missing_left'] = np.concatenate(missing_left)
+    arrays['forest/left'] = np.concatenate(lefts).astype(np.int64)
+    arrays['forest/right'] = np.concatenate(rights).astype(np.int64)
+    arrays['forest/leaf_value'] = np.concatenate(leaf_values).astype(np.float64)
+    arrays['forest/roots'] = np.asarray(roots, dtype=np.int64)
+    objects['forest'] = {
+        'n_features': n_features,
+        'feature_names': detector.feature_names,
+        'max_depth': int(max_depth),
+        'denominator': float(
+            len(forest.estimators_) * _average_path_length([forest.max_samples_])[0]
+        ),
+        'offset': float(forest.offset_),
+        'contamination': forest.contamination,
+        'windows': detector.windows,
+        'tree_windows': detector.tree_windows
+    }
+
+
+def _pack_pipeline(pipeline, arrays: Dict, objects: Dict) -> None:
+    if pipeline.stats is None:
+        raise BundleError("Pipeline has no feature statistics to bundle")
+    engineer = pipeline.feature_engineer
+    objects['pipeline'] = {
+        'numerical_features': engineer.numerical_features,
+        'categorical_features': engineer.categorical_features,
+        'temporal_features': engineer.temporal_features,
+        'overflow': {},
+        'max_entries': {}
+    }
+    for col, moments in pipeline.stats.numerical.items():
+        arrays[f'stats/numerical/{col}'] = np.array(
+            [moments.count, moments.mean, moments.m2, moments.min, moments.max], dtype=np.float64
+        )
+    for col, table in pipeline.stats.categorical.items():
+        # Vocabularies are stored as UTF-8 bytes with offsets
+        encoded = [str(value).encode() for value in table.counts]
+        arrays[f'stats/categorical/{col}/vocabulary'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+        arrays[f'stats/categorical/{col}/offsets'] = np.cumsum(
+            [0] + [len(value) for value in encoded], dtype=np.int64
+        )
+        arrays[f'stats/categorical/{col}/counts'] = np.fromiter(
+            table.counts.values(), dtype=np.int64, count=len(table.counts)
+        )
+        objects['pipeline']['overflow'][col] = table.overflow
+        objects['pipeline']['max_entries'][col] = table.max_entries
+
+
+def _unpack_pipeline(bundle: Bundle):
+    from ..preprocessing import PreprocessingPipeline
+    from ..preprocessing.feature_stats import FeatureStats
+
+    layout = bundle.objects['pipeline']
+    pipeline = PreprocessingPipeline()
+    engineer = pipeline.feature_engineer
+    engineer.numerical_features = layout['numerical_features']
+    engineer.categorical_features = layout['categorical_features']
+    engineer.temporal_features = layout['temporal_features']
+
+    stats = FeatureStats(engineer.numerical_features, engineer.categorical_features)
+    for col, moments in stats.numerical.items():
+        count, mean, m2, minimum, maximum = bundle.array(f'stats/numerical/{col}')
+        moments.count, moments.mean, moments.m2 = int(count), float(mean), float(m2)
+        moments.min, moments.max = float(minimum), float(maximum)
+    for col, table in stats.categorical.items():
+        vocabulary = bundle.array(f'stats/categorical/{col}/vocabulary').tobytes()
+        offsets = bundle.array(f'stats/categorical/{col}/offsets')
+        counts = bundle.array(f'stats/categorical/{col}/counts')
+        table.max_entries = layout['max_entries'][col]
+        table.overflow = layout['overflow'][col]
+        table.counts = {
+            vocabulary[start:end].decode(): int(count)
+            for start, end, count in zip(offsets[:-1], offsets[1:], counts)
+        }
+    pipeline.stats = stats
+    pipeline.feature_stats = stats.to_dict()
+    pipeline.is_fitted = True
+    return pipeline
+
+
+def _pack_scaler(scaler, arrays: Dict, objects: Dict) -> None:
+    for attribute in ('mean_', 'scale_', 'var_'):
+        value = getattr(scaler, attribute, None)
+        if value is not None:
+            arrays[f'scaler/{attribute}'] = np.asarray(value, dtype=np.float64)
+    objects['scaler'] = {
+        'params': scaler.get_params(),
+        'n_features_in': int(scaler.n_features_in_),
+        'n_samples_seen': np.asarray(scaler.n_samples_seen_).tolist(),
+        'feature_names_in': list(getattr(scaler, 'feature_names_in_', [])) or None
+    }
+
+
+def _unpack_scaler(bundle: Bundle):
+    from sklearn.preprocessing import StandardScaler
+
+    layout = bundle.objects['scaler']
+    scaler = StandardScaler(**layout['params'])
+    for attribute in ('mean_', 'scale_', 'var_'):
+        name = f'scaler/{attribute}'
+        setattr(scaler, attribute, bundle.array(name) if name in bundle.manifest['arrays'] else None)
+    scaler.n_features_in_ = layout['n_features_in']
+    scaler.n_samples_seen_ = np.asarray(layout['n_samples_seen'])
+    if layout['feature_names_in']:
+        scaler.feature_names_in_ = np.asarray(layout['feature_names_in'], dtype=object)
+    return scaler
+
+
+def _library_versions() -> Dict[str, str]:
+    import sklearn
+
+    return {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__
+    }
+
+
+def _json_default(value):
+    # numpy scalars in patterns and parameters
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
@@ -0,0 +1,136 @@
+import time
+import threading
+import numpy as np
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from ..instrumentation import instrumented
+
+class LinearTextCategorizer:
+    def __init__(self, n_features=2**18, ngram_range=(3, 5), alpha=1e-5):
+        # Hashed character n-grams are robust to merchant string noise
+        # ("NETFLIX.COM", "NETFLIX COM 8559") and need no fitted vocabulary
+        self.vectorizer = HashingVectorizer(
+            analyzer='char_wb',
+            ngram_range=ngram_range,
+            n_features=n_features,
+            alternate_sign=False
+        )
+        self.model = SGDClassifier(loss='log_loss', alpha=alpha, random_state=42)
+
+    @property
+    def classes_(self):
+        return self.model.classes_
+
+    def fit(self, texts, labels):
+        self.model.fit(self.vectorizer.transform(texts), labels)
+        return self
+
+    def predict(self, texts):
+        return self.model.predict(self.vectorizer.transform(texts))
+
+    @instrumented('linear_text_categorizer.predict_proba')
+    def predict_proba(self, texts):
+        return self.model.predict_proba(self.vectorizer.transform(texts))
+
+    def save(self, path):
+        joblib.dump(self, path)
+
+    @classmethod
+    def load(cls, path):
+        return joblib.load(path)
+
+
+class CascadeCategorizer:
+    def __init__(self, first_tier, fallback, threshold=0.9, text_processor=None):
+        self.first_tier = first_tier
+        self.fallback = fallback
+        self.threshold = threshold
+        self.text_processor = text_processor
+        self.categories = list(first_tier.classes_)
+        self._fallback_order = self._align_fallback_labels()
+        self._lock = threading.Lock()
+        self._counts = {'first_tier': 0, 'fallback': 0}
+        self._seconds = {'first_tier': 0.0, 'fallback': 0.0}
+
+    def _align_fallback_labels(self):
+        # Column order that maps fallback probabilities onto `categories`
+        fallback_labels = getattr(self.fallback, 'categories', None)
+        if fallback_labels is None:
+            raise ValueError("Fallback model must expose its labels as `categories`")
+        if sorted(map(str, fallback_labels)) != sorted(map(str, self.categories)):
+            raise ValueError(
+                f"Fallback labels {sorted(map(str, fallback_labels))} don't match the "
+                f"first tier's {sorted(map(str, self.categories))}"
+            )
+        position = {str(label): i for i, label in enumerate(fallback_labels)}
+        return np.array([position[str(label)] for label in self.categories])
+
+    def _first_tier_texts(self, texts):
+        if self.text_processor is None:
+            return texts
+        return [self.text_processor.preprocess(text) for text in texts]
+
+    @instrumented('cascade_categorizer.predict_proba')
+    def predict_proba(self, texts):
+        texts = list(texts)
+        start = time.perf_counter()
+        probabilities = self.first_tier.predict_proba(self._first_tier_texts(texts))
+        first_tier_seconds = time.perf_counter() - start
+
+        escalated = np.flatnonzero(probabilities.max(axis=1) < self.threshold)
+        fallback_seconds = 0.0
+        if len(escalated):
+            start = time.perf_counter()
+            fallback_probabilities = self.fallback.predict_proba(
+                [texts[i] for i in escalated]
+            )
+            fallback_seconds = time.perf_counter() - start
+            probabilities[escalated] = fallback_probabilities[:, self._fallback_order]
+
+        with self._lock:
+            self._counts['first_tier'] += len(texts) - len(escalated)
+            self._counts['fallback'] += len(escalated)
+            self._seconds['first_tier'] += first_tier_seconds
+            self._seconds['fallback'] += fallback_seconds
+        return probabilities
+
+    def tier_probabilities(self, texts):
+        """
+        Probabilities of both tiers for every text, whatever the threshold.
+
+        Columns of both are ordered as `categories`. Unlike `predict_proba`,
+        every text goes through both tiers and the tier counts are not
+        updated, so thresholds can be compared over one pass.
+
+        Returns:
+            Tuple of (first tier probabilities, fallback probabilities)
+        """
+        texts = list(texts)
+        first_tier_probabilities = self.first_tier.predict_proba(self._first_tier_texts(texts))
+        fallback_probabilities = self.fallback.predict_proba(texts)
+        return first_tier_probabilities, fallback_probabilities[:, self._fallback_order]
+
+    def predict(self, texts):
+        probabilities = self.predict_proba(texts)
+        return np.asarray(self.categories)[probabilities.argmax(axis=1)]
+
+    def stats(self):
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                'threshold': self.threshold,
+                'requests': total,
+                'tiers': {
+                    tier: {
+                        'count': count,
+                        'hit_rate': count / total if total else 0.0,
+                        # First tier time is spread over every text it saw,
+                        # fallback time over the escalated texts only
+                        'mean_latency_ms': 1000 * self._seconds[tier] / (
+                            (total if tier == 'first_tier' else count) or 1
+                        )
+                    }
+                    for tier, count in self._counts.items()
+                }
+            }
@@ -1,11 +1,14 @@
 import tensorflow as tf
+from ..instrumentation import instrumented
 
 class ExpenseForecaster(tf.keras.Model):
-    def __init__(self, num_features, lstm_units=64):
+    def __init__(self, num_features=1, lstm_units=64, sequence_length=30, dropout_rate=0.2):
         super(ExpenseForecaster, self).__init__()
+        self.num_features = num_features
+        self.sequence_length = sequence_length
         self.lstm = tf.keras.layers.LSTM(lstm_units, return_sequences=True)
         self.lstm2 = tf.keras.layers.LSTM(lstm_units // 2)
-        self.dropout = tf.keras.layers.Dropout(0.2)
+        self.dropout = tf.keras.layers.Dropout(dropout_rate)
         self.dense = tf.keras.layers.Dense(1)
         
     def call(self, inputs):
@@ -14,5 +17,6 @@ class ExpenseForecaster(tf.keras.Model):
         x = self.dropout(x)
         return self.dense(x)
     
+    @instrumented('expense_forecaster.predict')
     def predict(self, X):
         return self.call(X).numpy()
\ No newline at end of file
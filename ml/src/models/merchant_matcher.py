@@ -0,0 +1,244 @@
+import os
+import re
+import json
+import time
+import bisect
+import threading
+import logging
+from collections import deque, namedtuple
+from typing import Dict, List, Optional, Sequence
+from ..instrumentation import instrumented
+
+try:
+    import ahocorasick
+except ImportError:  # optional C implementation
+    ahocorasick = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MerchantRule = namedtuple('MerchantRule', ['pattern', 'category', 'kind', 'priority'])
+
+_NON_ALNUM = re.compile(r'[^A-Z0-9]+')
+_SEPARATOR = '\n'
+
+
+def normalize_description(description: str) -> str:
+    """Upper-case a description and collapse punctuation to single spaces."""
+    return _NON_ALNUM.sub(' ', str(description).upper()).strip()
+
+
+class _Automaton:
+    """Pure-Python Aho-Corasick automaton over normalized patterns."""
+
+    def __init__(self, patterns: Sequence[str]):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = next_state
+            self.out[state].append(pattern_id)
+
+        # Breadth-first fail links; outputs are merged along them so a scan
+        # never has to walk fail links to report matches
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.out[next_state] = self.out[next_state] + self.out[self.fail[next_state]]
+
+    def iter(self, text: str):
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for end, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for pattern_id in out[state]:
+                yield end, pattern_id
+
+
+class _CompiledRules:
+    def __init__(self, rules: List[MerchantRule]):
+        self.rules = rules
+        self.patterns = [rule.pattern for rule in rules]
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for pattern_id, pattern in enumerate(self.patterns):
+                # Several rules may share a pattern; keep them all
+                existing = self.automaton.get(pattern, ())
+                self.automaton.add_word(pattern, existing + (pattern_id,))
+            self.automaton.make_automaton()
+        else:
+            self.automaton = _Automaton(self.patterns)
+
+    def iter(self, text: str):
+        if ahocorasick is None:
+            yield from self.automaton.iter(text)
+            return
+        for end, pattern_ids in self.automaton.iter(text):
+            for pattern_id in pattern_ids:
+                yield end, pattern_id
+
+
+class MerchantMatcher:
+    """
+    Zero-model categorization from merchant keyword and prefix rules.
+
+    Rules are compiled once into an Aho-Corasick automaton. A batch of
+    descriptions is joined and scanned in a single pass, so matching cost is
+    linear in the total text length regardless of the number of rules.
+    Keyword rules match whole words anywhere in a description, prefix rules
+    only at its start. When several rules match, the highest priority and
+    then the longest pattern wins.
+
+    The rules file is reloaded when it changes on disk, checked at most
+    every `reload_interval` seconds, so workers pick up new rules without
+    a restart.
+    """
+
+    def __init__(self, rules_path: Optional[str] = None, reload_interval: float = 30.0):
+        self.rules_path = rules_path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._compiled = _CompiledRules([])
+        self._mtime = None
+        self._checked_at = 0.0
+        self.version = None
+        if rules_path is not None:
+            self.reload()
+
+    @classmethod
+    def from_rules(cls, rules: List[Dict]) -> 'MerchantMatcher':
+        matcher = cls()
+        matcher._compiled = _CompiledRules(_parse_rules(rules))
+        return matcher
+
+    @property
+    def num_rules(self) -> int:
+        return len(self._compiled.rules)
+
+    def reload(self) -> bool:
+        """
+        Recompile the rules file if it changed since it was last loaded.
+
+        Returns:
+            bool: True if new rules were loaded
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            mtime = os.path.getmtime(self.rules_path)
+            if mtime == self._mtime:
+                return False
+
+            with open(self.rules_path) as f:
+                config = json.load(f)
+            compiled = _CompiledRules(_parse_rules(config['rules']))
+
+            # Swapping the reference is atomic, so concurrent matches see
+            # either the old or the new rules, never a partial set
+            self._compiled = compiled
+            self._mtime = mtime
+            self.version = config.get('version')
+            logger.info(
+                f"Loaded {len(compiled.rules)} merchant rules from {self.rules_path}"
+            )
+            return True
+
+    def _maybe_reload(self) -> None:
+        if self.rules_path is None:
+            return
+        if time.monotonic() - self._checked_at < self.reload_interval:
+            return
+        try:
+            self.reload()
+        except Exception as e:
+            # Keep serving the last good rule set
+            logger.error(f"Error reloading merchant rules: {str(e)}")
+
+    def match(self, description: str) -> Optional[str]:
+        """Get the category for one description, or None if no rule matches."""
+        return self.match_batch([description])[0]
+
+    @instrumented('merchant_matcher.match_batch')
+    def match_batch(self, descriptions: Sequence[str]) -> List[Optional[str]]:
+        """
+        Match a batch of descriptions in one scan.
+
+        Args:
+            descriptions: Raw transaction descriptions
+
+        Returns:
+            List with the matched category, or None, for each description
+        """
+        self._maybe_reload()
+        compiled = self._compiled
+        rules = compiled.rules
+
+        normalized = [normalize_description(d) for d in descriptions]
+        text = _SEPARATOR.join(normalized)
+        starts = []
+        offset = 0
+        for desc in normalized:
+            starts.append(offset)
+            offset += len(desc) + 1
+
+        best = [None] * len(normalized)
+        for end, pattern_id in compiled.iter(text):
+            rule = rules[pattern_id]
+            start = end - len(rule.pattern) + 1
+            index = bisect.bisect_right(starts, start) - 1
+            desc_start = starts[index]
+            desc_end = desc_start + len(normalized[index])
+
+            # Rules must cover whole words of a single description
+            if end >= desc_end:
+                continue
+            if start > desc_start and text[start - 1] != ' ':
+                continue
+            if end + 1 < desc_end and text[end + 1] != ' ':
+                continue
+            if rule.kind == 'prefix' and start != desc_start:
+                continue
+
+            current = best[index]
+            if current is None or (rule.priority, len(rule.pattern)) > (
+                current.priority, len(current.pattern)
+            ):
+                best[index] = rule
+
+        return [rule.category if rule is not None else None for rule in best]
+
+
+def _parse_rules(rules: List[Dict]) -> List[MerchantRule]:
+    parsed = []
+    for rule in rules:
+        kind = rule.get('type', 'keyword')
+        if kind not in ('keyword', 'prefix'):
+            raise ValueError(f"Unknown merchant rule type: {kind}")
+        pattern = normalize_description(rule['pattern'])
+        if not pattern:
+            raise ValueError(f"Empty merchant rule pattern: {rule['pattern']!r}")
+        parsed.append(MerchantRule(
+            pattern=pattern,
+            category=rule['category'],
+            kind=kind,
+            priority=int(rule.get('priority', 0))
+        ))
+    return parsed
@@ -1,11 +1,14 @@
 from sklearn.cluster import DBSCAN
 import numpy as np
 import pandas as pd
+import joblib
+from ..instrumentation import instrumented
 
 class PatternAnalyzer:
-    def __init__(self, eps=0.5, min_samples=5):
-        self.model = DBSCAN(eps=eps, min_samples=min_samples)
+    def __init__(self, eps=0.5, min_samples=5, **dbscan_params):
+        self.model = DBSCAN(eps=eps, min_samples=min_samples, **dbscan_params)
         
+    @instrumented('pattern_analyzer.find_patterns')
     def find_patterns(self, transactions_df):
         # Extract features
         features = self._extract_features(transactions_df)
@@ -13,8 +16,12 @@ class PatternAnalyzer:
         # Perform clustering
         clusters = self.model.fit_predict(features)
         
+        # Clusters are found per category; map them back onto transactions
+        groups = transactions_df.groupby('category').ngroup().to_numpy()
+        row_clusters = np.where(groups >= 0, clusters[np.maximum(groups, 0)], -1)
+        
         # Analyze patterns
-        patterns = self._analyze_clusters(transactions_df, clusters)
+        patterns = self._analyze_clusters(transactions_df, row_clusters)
         return patterns
     
     def _extract_features(self, df):
@@ -54,4 +61,13 @@ class PatternAnalyzer:
     def _calculate_frequency(self, cluster_data):
         timestamps = pd.to_datetime(cluster_data['timestamp'])
         diff = timestamps.diff().dropna()
-        return diff.mean()
\ No newline at end of file
+        return diff.mean()
+    
+    def save(self, path):
+        joblib.dump(self.model, path)
+    
+    @classmethod
+    def load(cls, path):
+        analyzer = cls()
+        analyzer.model = joblib.load(path)
+        return analyzer
\ No newline at end of file
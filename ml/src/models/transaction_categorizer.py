@@ -1,29 +1,298 @@
+import os
+import json
+import mmap
+import struct
 import numpy as np
 from sklearn.base import BaseEstimator, ClassifierMixin
-from transformers import DistilBertTokenizer, DistilBertModel
+from transformers import DistilBertConfig, DistilBertModel, DistilBertTokenizerFast
 import torch
 import torch.nn as nn
+from ..instrumentation import instrumented
+
+PRETRAINED_MODEL = 'distilbert-base-uncased'
+
+# Self-contained artifact layout; loading it needs no hub access
+ARTIFACT_FORMAT_VERSION = 1
+ARTIFACT_CONFIG = 'config.json'
+ARTIFACT_TOKENIZER = 'tokenizer.json'
+ARTIFACT_WEIGHTS = 'model.safetensors'
+ARTIFACT_QUANTIZED_WEIGHTS = 'model.int8.pt'
+
+# Texts per forward pass at inference; bounds activation memory on large batches
+PREDICT_BATCH_SIZE = 64
+
+_SAFETENSORS_DTYPES = {
+    'F32': torch.float32,
+    'F16': torch.float16,
+    'BF16': torch.bfloat16,
+    'I64': torch.int64,
+    'I32': torch.int32
+}
 
 class TransactionCategorizer(BaseEstimator, ClassifierMixin):
-    def __init__(self, num_categories, max_length=128):
-        self.tokenizer = DistilBertTokenizer.from_pretrained('distilbert-base-uncased')
-        self.bert = DistilBertModel.from_pretrained('distilbert-base-uncased')
+    def __init__(self, num_categories, max_length=128, tokenizer=None, bert=None):
+        # Pretrained weights are only fetched when training from scratch;
+        # `load` passes in modules built from a local artifact
+        self.tokenizer = tokenizer if tokenizer is not None else \
+            DistilBertTokenizerFast.from_pretrained(PRETRAINED_MODEL)
+        self.bert = bert if bert is not None else \
+            DistilBertModel.from_pretrained(PRETRAINED_MODEL)
         self.max_length = max_length
-        self.classifier = nn.Linear(768, num_categories)
-        
+        self.num_categories = num_categories
+        self.classifier = nn.Linear(self.bert.config.dim, num_categories)
+        self.quantized = False
+
     def forward(self, text):
-        inputs = self.tokenizer(text, padding=True, truncation=True, 
+        inputs = self.tokenizer(text, padding=True, truncation=True,
                               max_length=self.max_length, return_tensors="pt")
-        outputs = self.bert(**inputs)
-        pooled_output = outputs[0][:, 0]
+        return self.forward_tokens(inputs['input_ids'], inputs['attention_mask'])
+
+    def forward_tokens(self, input_ids, attention_mask, dropout=0.0):
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        pooled_output = nn.functional.dropout(
+            outputs[0][:, 0], p=dropout, training=self.bert.training
+        )
         return self.classifier(pooled_output)
 
-    def predict(self, texts):
-        self.eval()
+    def parameters(self):
+        return list(self.bert.parameters()) + list(self.classifier.parameters())
+
+    def train(self, mode=True):
+        self.bert.train(mode)
+        self.classifier.train(mode)
+        return self
+
+    def _logits(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        texts = list(texts)
+        self.bert.eval()
         with torch.no_grad():
-            predictions = []
-            for text in texts:
-                outputs = self.forward(text)
-                _, predicted = torch.max(outputs, 1)
-                predictions.append(predicted.item())
-            return np.array(predictions)
\ No newline at end of file
+            outputs = [
+                self.forward(texts[start:start + batch_size])
+                for start in range(0, len(texts), batch_size)
+            ]
+        if not outputs:
+            return torch.empty((0, self.num_categories))
+        return torch.cat(outputs)
+
+    @instrumented('transaction_categorizer.predict')
+    def predict(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        return torch.argmax(self._logits(texts, batch_size), dim=1).numpy()
+
+    @instrumented('transaction_categorizer.predict_proba')
+    def predict_proba(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        return torch.softmax(self._logits(texts, batch_size), dim=1).numpy()
+
+    def quantize(self):
+        # Dynamic int8 quantization: Linear weights are stored as int8 and
+        # activations are quantized on the fly, which suits CPU inference
+        self.bert.eval()
+        self.bert = torch.quantization.quantize_dynamic(
+            self.bert, {nn.Linear}, dtype=torch.qint8
+        )
+        self.classifier = torch.quantization.quantize_dynamic(
+            nn.Sequential(self.classifier), {nn.Linear}, dtype=torch.qint8
+        )
+        self.quantized = True
+        return self
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        config = {
+            'format_version': ARTIFACT_FORMAT_VERSION,
+            'num_categories': self.num_categories,
+            'max_length': self.max_length,
+            'categories': getattr(self, 'categories', None),
+            'quantized': self.quantized,
+            'bert_config': self.bert.config.to_dict()
+        }
+        with open(os.path.join(path, ARTIFACT_CONFIG), 'w') as f:
+            json.dump(config, f, indent=2)
+        self.tokenizer.backend_tokenizer.save(os.path.join(path, ARTIFACT_TOKENIZER))
+
+        if self.quantized:
+            # Packed int8 weights are not plain tensors, so they can't be
+            # stored as safetensors
+            torch.save({
+                'bert': self.bert.state_dict(),
+                'classifier': self.classifier.state_dict()
+            }, os.path.join(path, ARTIFACT_QUANTIZED_WEIGHTS))
+        else:
+            from safetensors.torch import save_file
+            state = {f'bert.{k}': v for k, v in self.bert.state_dict().items()}
+            state.update({f'classifier.{k}': v for k, v in self.classifier.state_dict().items()})
+            save_file(
+                {k: v.contiguous() for k, v in state.items()},
+                os.path.join(path, ARTIFACT_WEIGHTS)
+            )
+
+    @classmethod
+    def load(cls, path):
+        with open(os.path.join(path, ARTIFACT_CONFIG)) as f:
+            config = json.load(f)
+        if config.get('format_version') != ARTIFACT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported categorizer artifact version: {config.get('format_version')}")
+
+        tokenizer = DistilBertTokenizerFast(tokenizer_file=os.path.join(path, ARTIFACT_TOKENIZER))
+        bert_config = DistilBertConfig.from_dict(config['bert_config'])
+
+        if config['quantized']:
+            # Quantized state dicts only load into modules that are already quantized
+            categorizer = cls(config['num_categories'], config['max_length'],
+                              tokenizer=tokenizer, bert=DistilBertModel(bert_config))
+            categorizer.quantize()
+            weights = torch.load(os.path.join(path, ARTIFACT_QUANTIZED_WEIGHTS), map_location='cpu')
+            categorizer.bert.load_state_dict(weights['bert'])
+            categorizer.classifier.load_state_dict(weights['classifier'])
+        else:
+            # Modules are built on the meta device, so no weights are
+            # allocated or initialized, and then take the memory-mapped
+            # tensors as their parameters without copying them
+            with torch.device('meta'):
+                bert = DistilBertModel(bert_config)
+                categorizer = cls(config['num_categories'], config['max_length'],
+                                  tokenizer=tokenizer, bert=bert)
+            state = _mmap_safetensors(os.path.join(path, ARTIFACT_WEIGHTS))
+            categorizer.bert.load_state_dict(_strip_prefix(state, 'bert.'), assign=True)
+            categorizer.classifier.load_state_dict(_strip_prefix(state, 'classifier.'), assign=True)
+            _materialize_position_ids(categorizer.bert)
+
+        if config['categories'] is not None:
+            categorizer.categories = config['categories']
+        categorizer.bert.eval()
+        return categorizer
+
+    def export_onnx(self, output_dir, quantize=True):
+        if self.quantized:
+            raise ValueError("Export the fp32 model; ONNX export quantizes separately")
+        os.makedirs(output_dir, exist_ok=True)
+        model_path = os.path.join(output_dir, 'model.onnx')
+
+        self.bert.eval()
+        inputs = self.tokenizer(['sample transaction'], padding=True, truncation=True,
+                                max_length=self.max_length, return_tensors="pt")
+        torch.onnx.export(
+            _OnnxExportModule(self.bert, self.classifier),
+            (inputs['input_ids'], inputs['attention_mask']),
+            model_path,
+            input_names=['input_ids', 'attention_mask'],
+            output_names=['logits'],
+            dynamic_axes={
+                'input_ids': {0: 'batch', 1: 'sequence'},
+                'attention_mask': {0: 'batch', 1: 'sequence'},
+                'logits': {0: 'batch'}
+            },
+            opset_version=14
+        )
+
+        if quantize:
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            quantized_path = os.path.join(output_dir, 'model.int8.onnx')
+            quantize_dynamic(model_path, quantized_path, weight_type=QuantType.QInt8)
+            os.replace(quantized_path, model_path)
+
+        self.tokenizer.backend_tokenizer.save(os.path.join(output_dir, ARTIFACT_TOKENIZER))
+        with open(os.path.join(output_dir, ARTIFACT_CONFIG), 'w') as f:
+            json.dump({
+                'format_version': ARTIFACT_FORMAT_VERSION,
+                'max_length': self.max_length,
+                'categories': getattr(self, 'categories', None)
+            }, f, indent=2)
+        return model_path
+
+
+def _mmap_safetensors(path):
+    # Copy-on-write mapping: tensors view the file pages directly and are
+    # only paged in as they are read
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header_size = struct.unpack('<Q', buffer[:8])[0]
+    header = json.loads(buffer[8:8 + header_size])
+    data_start = 8 + header_size
+
+    tensors = {}
+    for name, info in header.items():
+        if name == '__metadata__':
+            continue
+        dtype = _SAFETENSORS_DTYPES[info['dtype']]
+        begin, end = info['data_offsets']
+        count = (end - begin) // torch.tensor([], dtype=dtype).element_size()
+        if count == 0:
+            tensor = torch.empty(0, dtype=dtype)
+        else:
+            tensor = torch.frombuffer(buffer, dtype=dtype, count=count, offset=data_start + begin)
+        tensors[name] = tensor.reshape(info['shape'])
+    return tensors
+
+
+def _strip_prefix(state, prefix):
+    return {k[len(prefix):]: v for k, v in state.items() if k.startswith(prefix)}
+
+
+def _materialize_position_ids(bert):
+    # position_ids is a non-persistent buffer, so it is not in the weights
+    # file and is still on the meta device after loading
+    embeddings = bert.embeddings
+    if hasattr(embeddings, 'position_ids') and embeddings.position_ids.is_meta:
+        embeddings.register_buffer(
+            'position_ids',
+            torch.arange(bert.config.max_position_embeddings).expand((1, -1)),
+            persistent=False
+        )
+
+
+class _OnnxExportModule(nn.Module):
+    def __init__(self, bert, classifier):
+        super().__init__()
+        self.bert = bert
+        self.classifier = classifier
+
+    def forward(self, input_ids, attention_mask):
+        outputs = self.bert(input_ids=input_ids, attention_mask=attention_mask)
+        return self.classifier(outputs[0][:, 0])
+
+
+class OnnxTransactionCategorizer:
+    def __init__(self, model_dir, max_length=128, num_threads=None):
+        import onnxruntime as ort
+
+        options = ort.SessionOptions()
+        if num_threads is not None:
+            options.intra_op_num_threads = num_threads
+        self.session = ort.InferenceSession(
+            os.path.join(model_dir, 'model.onnx'),
+            sess_options=options,
+            providers=['CPUExecutionProvider']
+        )
+        self.tokenizer = DistilBertTokenizerFast(tokenizer_file=os.path.join(model_dir, ARTIFACT_TOKENIZER))
+        self.max_length = max_length
+        # Labels of the logit columns, saved by `export_onnx`
+        config_path = os.path.join(model_dir, ARTIFACT_CONFIG)
+        config = {}
+        if os.path.exists(config_path):
+            with open(config_path) as f:
+                config = json.load(f)
+        self.categories = config.get('categories')
+
+    def _logits(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        texts = list(texts)
+        outputs = []
+        for start in range(0, len(texts), batch_size):
+            inputs = self.tokenizer(texts[start:start + batch_size], padding=True, truncation=True,
+                                    max_length=self.max_length, return_tensors="np")
+            outputs.append(self.session.run(['logits'], {
+                'input_ids': inputs['input_ids'].astype(np.int64),
+                'attention_mask': inputs['attention_mask'].astype(np.int64)
+            })[0])
+        if not outputs:
+            return np.empty((0, len(self.categories or [])), dtype=np.float32)
+        return np.concatenate(outputs)
+
+    @instrumented('onnx_transaction_categorizer.predict')
+    def predict(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        return np.argmax(self._logits(texts, batch_size), axis=1)
+
+    @instrumented('onnx_transaction_categorizer.predict_proba')
+    def predict_proba(self, texts, batch_size=PREDICT_BATCH_SIZE):
+        logits = self._logits(texts, batch_size)
+        exp = np.exp(logits - logits.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
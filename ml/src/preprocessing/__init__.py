@@ -1,11 +1,16 @@
 # src/preprocessing/__init__.py
+import copy
 import logging
-from typing import Union, Dict, List
+from typing import Callable, Dict, List, Optional, Tuple, Union
+import joblib
 import pandas as pd
 import numpy as np
 from .text_processor import TextProcessor
 from .feature_engineer import FeatureEngineer
 from .data_cleaner import DataCleaner
+from .feature_stats import CountTable, FeatureStats, RunningMoments
+from .parallel import ParallelPreprocessor
+from ..instrumentation import span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,6 +28,7 @@ class PreprocessingPipeline:
         self.data_cleaner = DataCleaner()
         self.is_fitted = False
         self.feature_stats = {}
+        self.stats = None
         
     def fit(self, data: Union[pd.DataFrame, Dict, List]) -> 'PreprocessingPipeline':
         """
@@ -40,35 +46,10 @@ class PreprocessingPipeline:
             
             logger.info("Starting preprocessing pipeline fitting...")
             
-            # Clean data
-            logger.info("Fitting data cleaner...")
-            df = self.data_cleaner.clean(df)
-            
-            # Process text features
-            logger.info("Processing text features...")
-            if 'description' in df.columns:
-                df['processed_description'] = df['description'].apply(
-                    self.text_processor.preprocess
-                )
-            
-            # Engineer features and store feature statistics
-            logger.info("Engineering features...")
-            features_df = self.feature_engineer.transform(df)
-            self.feature_stats = {
-                'numerical': {
-                    col: {
-                        'mean': features_df[col].mean(),
-                        'std': features_df[col].std(),
-                        'min': features_df[col].min(),
-                        'max': features_df[col].max()
-                    }
-                    for col in self.feature_engineer.numerical_features
-                },
-                'categorical': {
-                    col: features_df[col].value_counts().to_dict()
-                    for col in self.feature_engineer.categorical_features
-                }
-            }
+            with span('pipeline.fit'):
+                df, features_df = self._prepare(df)
+                with span('stats', rows=len(features_df)):
+                    self._fit_stats(df, features_df)
             
             self.is_fitted = True
             logger.info("Pipeline fitting completed successfully")
@@ -97,17 +78,8 @@ class PreprocessingPipeline:
             
             logger.info("Starting data transformation...")
             
-            # Clean data
-            df = self.data_cleaner.clean(df)
-            
-            # Process text features
-            if 'description' in df.columns:
-                df['processed_description'] = df['description'].apply(
-                    self.text_processor.preprocess
-                )
-            
-            # Engineer features
-            features_df = self.feature_engineer.transform(df)
+            with span('pipeline.transform'):
+                _, features_df = self._prepare(df)
             
             logger.info("Data transformation completed successfully")
             return features_df
@@ -116,17 +88,204 @@ class PreprocessingPipeline:
             logger.error(f"Error during data transformation: {str(e)}")
             raise
             
+    def transform_rows(self, data: Union[pd.DataFrame, Dict, List]) -> pd.DataFrame:
+        """
+        Transform every row on its own with the fitted statistics.
+        
+        `transform` cleans its input as a training batch, dropping
+        duplicates and amount outliers and scaling with the batch's own mean
+        and std. Here no row is dropped, a missing amount is filled with the
+        fitted mean and numerical features are scaled with the fitted mean
+        and std, so each row's features depend only on that row and the
+        fitted pipeline. Scoring rows in chunks of any size then gives the
+        same features as scoring them at once.
+        
+        Args:
+            data: Input data as DataFrame, dict, or list
+            
+        Returns:
+            pd.DataFrame: Transformed features, one row per input row
+        """
+        if not self.is_fitted:
+            raise ValueError("Pipeline must be fitted before transforming data")
+            
+        try:
+            # Convert input to DataFrame if necessary
+            df = self._validate_and_convert_input(data)
+            
+            with span('pipeline.transform_rows'):
+                engineer = self._fitted_feature_engineer()
+                amount_fill = engineer.scaling.get('amount', (0.0, None))[0]
+                _, features_df = self._prepare(
+                    df,
+                    clean=lambda df: self.data_cleaner.clean_rows(df, amount_fill),
+                    feature_engineer=engineer
+                )
+            return features_df
+            
+        except Exception as e:
+            logger.error(f"Error during row transformation: {str(e)}")
+            raise
+            
     def fit_transform(self, data: Union[pd.DataFrame, Dict, List]) -> pd.DataFrame:
         """
         Fit the pipeline and transform the data in one step.
         
+        Cleaning, text processing and feature engineering run once, and
+        the statistics are fitted on the same intermediate frames that
+        produce the returned features. The output equals
+        `fit(data).transform(data)`, since transforming doesn't depend
+        on the fitted statistics.
+        
         Args:
             data: Input data as DataFrame, dict, or list
             
         Returns:
             pd.DataFrame: Transformed features
         """
-        return self.fit(data).transform(data)
+        try:
+            # Convert input to DataFrame if necessary
+            df = self._validate_and_convert_input(data)
+            
+            logger.info("Starting preprocessing pipeline fit_transform...")
+            
+            with span('pipeline.fit_transform'):
+                df, features_df = self._prepare(df)
+                with span('stats', rows=len(features_df)):
+                    self._fit_stats(df, features_df)
+            
+            self.is_fitted = True
+            logger.info("Pipeline fit_transform completed successfully")
+            return features_df
+            
+        except Exception as e:
+            logger.error(f"Error during pipeline fit_transform: {str(e)}")
+            raise
+    
+    def partial_fit(self, data: Union[pd.DataFrame, Dict, List]) -> 'PreprocessingPipeline':
+        """
+        Update the feature statistics with one more chunk of data.
+        
+        Statistics over several chunks equal a fit on the same cleaned
+        rows. Note that cleaning is per chunk: duplicates, median fills and
+        amount outliers are judged within each chunk.
+        
+        Args:
+            data: Input data as DataFrame, dict, or list
+            
+        Returns:
+            self: The updated pipeline
+        """
+        if self.is_fitted and self.stats is None:
+            raise ValueError("Legacy feature statistics can't be updated, refit the pipeline")
+            
+        try:
+            # Convert input to DataFrame if necessary
+            df = self._validate_and_convert_input(data)
+            
+            with span('pipeline.partial_fit'):
+                df, features_df = self._prepare(df)
+                with span('stats', rows=len(features_df)):
+                    if self.stats is None:
+                        self.stats = self._new_stats()
+                    self.stats.update(df, features_df)
+                    self.feature_stats = self.stats.to_dict()
+            
+            self.is_fitted = True
+            return self
+            
+        except Exception as e:
+            logger.error(f"Error during partial pipeline fitting: {str(e)}")
+            raise
+    
+    def merge(self, other: 'PreprocessingPipeline') -> 'PreprocessingPipeline':
+        """
+        Combine statistics fitted by another pipeline on a separate shard.
+        
+        Args:
+            other: Pipeline fitted on another shard
+            
+        Returns:
+            self: The merged pipeline
+        """
+        if other.stats is None:
+            raise ValueError("Pipeline to merge has no mergeable statistics")
+        if self.stats is None:
+            if self.is_fitted:
+                raise ValueError("Pipeline has no mergeable statistics")
+            self.stats = self._new_stats()
+        self.stats.merge(other.stats)
+        self.feature_stats = self.stats.to_dict()
+        self.is_fitted = True
+        return self
+    
+    def _prepare(
+        self,
+        df: pd.DataFrame,
+        clean: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+        feature_engineer: Optional[FeatureEngineer] = None
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Clean the data, process descriptions and engineer features.
+        
+        Args:
+            df: Input DataFrame
+            clean: Cleaning function, defaults to `data_cleaner.clean`
+            feature_engineer: Feature engineer, defaults to `feature_engineer`
+            
+        Returns:
+            Tuple of (cleaned DataFrame, engineered features)
+        """
+        clean = clean or self.data_cleaner.clean
+        feature_engineer = feature_engineer or self.feature_engineer
+        
+        # Clean data
+        logger.info("Cleaning data...")
+        with span('clean', rows=len(df)):
+            df = clean(df)
+        
+        # Process text features
+        if 'description' in df.columns:
+            logger.info("Processing text features...")
+            with span('text', rows=len(df)):
+                df['processed_description'] = df['description'].apply(
+                    self.text_processor.preprocess
+                )
+        
+        # Engineer features
+        logger.info("Engineering features...")
+        with span('features', rows=len(df)):
+            features_df = feature_engineer.transform(df)
+        return df, features_df
+    
+    def _fitted_feature_engineer(self) -> FeatureEngineer:
+        """Copy of the feature engineer that scales with the fitted mean and std."""
+        engineer = copy.copy(self.feature_engineer)
+        engineer.scaling = {
+            col: (stats['mean'], stats['std'])
+            for col, stats in self.feature_stats['numerical'].items()
+        }
+        return engineer
+    
+    def _fit_stats(self, df: pd.DataFrame, features_df: pd.DataFrame) -> None:
+        """
+        Compute feature statistics.
+        
+        Categorical columns are one-hot encoded in the features, so their
+        counts are taken from the cleaned frame.
+        
+        Args:
+            df: Cleaned DataFrame
+            features_df: Engineered features
+        """
+        self.stats = self._new_stats().update(df, features_df)
+        self.feature_stats = self.stats.to_dict()
+    
+    def _new_stats(self) -> FeatureStats:
+        return FeatureStats(
+            self.feature_engineer.numerical_features,
+            self.feature_engineer.categorical_features
+        )
     
     def _validate_and_convert_input(self, data: Union[pd.DataFrame, Dict, List]) -> pd.DataFrame:
         """
@@ -139,7 +298,9 @@ class PreprocessingPipeline:
             pd.DataFrame: Validated DataFrame
         """
         if isinstance(data, pd.DataFrame):
-            df = data.copy()
+            # No copy: cleaning starts with drop_duplicates, which returns a
+            # new frame, so the caller's frame is never modified
+            df = data
         elif isinstance(data, dict):
             df = pd.DataFrame([data])
         elif isinstance(data, list):
@@ -166,14 +327,19 @@ class PreprocessingPipeline:
         """
         Save feature statistics to a file.
         
+        The accumulators themselves are saved, so a loaded pipeline can
+        still be updated with `partial_fit` or merged.
+        
         Args:
             filepath: Path to save the statistics
         """
         if not self.is_fitted:
             raise ValueError("Pipeline must be fitted to save feature statistics")
+        if self.stats is None:
+            raise ValueError("Legacy feature statistics can't be saved, refit the pipeline")
             
         try:
-            pd.DataFrame(self.feature_stats).to_pickle(filepath)
+            joblib.dump(self.stats, filepath)
             logger.info(f"Feature statistics saved to {filepath}")
         except Exception as e:
             logger.error(f"Error saving feature statistics: {str(e)}")
@@ -187,7 +353,17 @@ class PreprocessingPipeline:
             filepath: Path to load the statistics from
         """
         try:
-            self.feature_stats = pd.read_pickle(filepath)
+            stats = joblib.load(filepath)
+            if isinstance(stats, pd.DataFrame):
+                # Files written before statistics were mergeable
+                logger.warning(f"{filepath} holds legacy statistics that can't be updated, refit to upgrade")
+                self.stats = None
+                self.feature_stats = {
+                    kind: stats[kind].dropna().to_dict() for kind in stats.columns
+                }
+            else:
+                self.stats = stats
+                self.feature_stats = stats.to_dict()
             self.is_fitted = True
             logger.info(f"Feature statistics loaded from {filepath}")
         except Exception as e:
@@ -199,8 +375,17 @@ __all__ = [
     'TextProcessor',
     'FeatureEngineer',
     'DataCleaner',
-    'PreprocessingPipeline'
+    'FeatureStats',
+    'RunningMoments',
+    'CountTable',
+    'PreprocessingPipeline',
+    'ParallelPreprocessor'
 ]
 
-# Create default pipeline instance
-default_pipeline = PreprocessingPipeline()
\ No newline at end of file
+def __getattr__(name: str):
+    # The default pipeline is created on first use: building its
+    # TextProcessor downloads NLTK corpora
+    if name == 'default_pipeline':
+        pipeline = globals()['default_pipeline'] = PreprocessingPipeline()
+        return pipeline
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -26,6 +26,24 @@ class DataCleaner:
         
         return df
     
+    def clean_rows(self, df, amount_fill=0.0):
+        """
+        Clean each row on its own, keeping every row.
+        
+        Unlike `clean`, nothing depends on the rest of the batch: no
+        duplicates, missing categories or amount outliers are dropped, and
+        missing amounts are filled with `amount_fill`. Used for scoring,
+        where every transaction needs a result.
+        """
+        self._validate_columns(df)
+        df = df.copy()
+        
+        df['amount'] = self._parse_amounts(df['amount']).fillna(amount_fill)
+        df['description'] = df['description'].apply(self._clean_description)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        
+        return df
+    
     def _validate_columns(self, df):
         missing_cols = set(self.required_columns) - set(df.columns)
         if missing_cols:
@@ -44,11 +62,7 @@ class DataCleaner:
         return df
     
     def _clean_amounts(self, amounts):
-        # Convert to float and handle currency symbols
-        amounts = amounts.replace('[\$,]', '', regex=True).astype(float)
-        
-        # Handle negative values
-        amounts = amounts.abs()
+        amounts = self._parse_amounts(amounts)
         
         # Remove outliers
         q1 = amounts.quantile(0.25)
@@ -59,6 +73,13 @@ class DataCleaner:
         
         return amounts
     
+    def _parse_amounts(self, amounts):
+        # Convert to float and handle currency symbols
+        amounts = amounts.replace('[\$,]', '', regex=True).astype(float)
+        
+        # Handle negative values
+        return amounts.abs()
+    
     def _clean_description(self, desc):
         if not isinstance(desc, str):
             return 'Unknown'
@@ -7,6 +7,8 @@ class FeatureEngineer:
         self.numerical_features = ['amount']
         self.categorical_features = ['category', 'description']
         self.temporal_features = ['timestamp']
+        # Fixed (mean, std) per numerical feature; scaling uses the data's own when None
+        self.scaling = None
         
     def transform(self, df):
         features = pd.DataFrame()
@@ -26,7 +28,11 @@ class FeatureEngineer:
         for col in self.numerical_features:
             features[col] = df[col]
             features[f'{col}_log'] = np.log1p(df[col])
-            features[f'{col}_scaled'] = (df[col] - df[col].mean()) / df[col].std()
+            if self.scaling is not None:
+                mean, std = self.scaling[col]
+            else:
+                mean, std = df[col].mean(), df[col].std()
+            features[f'{col}_scaled'] = (df[col] - mean) / std
         return features
     
     def _process_categorical(self, df, features):
@@ -45,4 +51,16 @@ class FeatureEngineer:
             features[f'{col}_dayofweek'] = dt.dt.dayofweek
             features[f'{col}_quarter'] = dt.dt.quarter
             features[f'{col}_is_weekend'] = dt.dt.dayofweek.isin([5, 6]).astype(int)
-        return features
\ No newline at end of file
+        return features
+    
+    def feature_names(self, categories):
+        """Names of the columns `transform` produces for the given categorical values."""
+        names = []
+        for col in self.numerical_features:
+            names += [col, f'{col}_log', f'{col}_scaled']
+        for col in self.categorical_features:
+            names += [f'{col}_{value}' for value in sorted(categories.get(col, []))]
+        for col in self.temporal_features:
+            names += [f'{col}_{part}' for part in
+                      ['hour', 'day', 'month', 'year', 'dayofweek', 'quarter', 'is_weekend']]
+        return names
\ No newline at end of file
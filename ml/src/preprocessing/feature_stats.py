@@ -0,0 +1,165 @@
+import heapq
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+
+# Distinct values a count table keeps before folding the rarest into overflow
+DEFAULT_MAX_ENTRIES = 100000
+
+
+class RunningMoments:
+    """
+    Count, mean, variance, min and max of a column, updated chunk by chunk.
+
+    Chunks are reduced with numpy and folded in with the parallel form of
+    Welford's algorithm (Chan et al.), which is also how two accumulators
+    built on separate shards are merged. NaNs are skipped, as in pandas.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values) -> 'RunningMoments':
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        chunk = RunningMoments()
+        chunk.count = len(values)
+        chunk.mean = float(values.mean())
+        chunk.m2 = float(((values - chunk.mean) ** 2).sum())
+        chunk.min = float(values.min())
+        chunk.max = float(values.max())
+        return self.merge(chunk)
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            self.min, self.max = other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self) -> Dict[str, float]:
+        """Summary matching pandas `mean`, `std` (ddof=1), `min` and `max`."""
+        if self.count == 0:
+            return {'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+        return {
+            'mean': self.mean,
+            'std': float(np.sqrt(self.m2 / (self.count - 1))) if self.count > 1 else np.nan,
+            'min': self.min,
+            'max': self.max
+        }
+
+
+class CountTable:
+    """
+    Value counts bounded to `max_entries` distinct values.
+
+    Beyond the bound the rarest values are folded into `overflow`, so memory
+    stays flat on high-cardinality columns such as descriptions. Counts are
+    exact while the column has at most `max_entries` distinct values;
+    past that, kept counts can undercount values that were evicted and
+    later seen again.
+    """
+
+    __slots__ = ('max_entries', 'counts', 'overflow')
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.counts = {}
+        self.overflow = 0
+
+    def update(self, values: pd.Series) -> 'CountTable':
+        counts = self.counts
+        for value, count in values.value_counts().items():
+            counts[value] = counts.get(value, 0) + int(count)
+        self._trim()
+        return self
+
+    def merge(self, other: 'CountTable') -> 'CountTable':
+        counts = self.counts
+        for value, count in other.counts.items():
+            counts[value] = counts.get(value, 0) + count
+        self.overflow += other.overflow
+        self._trim()
+        return self
+
+    def top_k(self, k: Optional[int] = None) -> List:
+        """Get the `k` most common (value, count) pairs, all if `k` is None."""
+        items = sorted(self.counts.items(), key=lambda item: item[1], reverse=True)
+        return items if k is None else items[:k]
+
+    def to_dict(self) -> Dict:
+        """Counts ordered most common first, like `value_counts().to_dict()`."""
+        return dict(self.top_k())
+
+    def _trim(self) -> None:
+        if len(self.counts) <= self.max_entries:
+            return
+        kept = heapq.nlargest(self.max_entries, self.counts.items(), key=lambda item: item[1])
+        self.overflow += sum(self.counts.values()) - sum(count for _, count in kept)
+        self.counts = dict(kept)
+
+
+class FeatureStats:
+    """
+    Mergeable statistics of a PreprocessingPipeline.
+
+    Numerical features are summarized by RunningMoments over the engineered
+    features and categorical columns by a CountTable over the cleaned data.
+    `to_dict` renders the nested dict exposed as `feature_stats`.
+    """
+
+    def __init__(
+        self,
+        numerical_features: List[str],
+        categorical_features: List[str],
+        max_entries: int = DEFAULT_MAX_ENTRIES
+    ):
+        self.numerical = {col: RunningMoments() for col in numerical_features}
+        self.categorical = {col: CountTable(max_entries) for col in categorical_features}
+
+    def update(self, df: pd.DataFrame, features_df: pd.DataFrame) -> 'FeatureStats':
+        """
+        Fold in one chunk.
+
+        Args:
+            df: Cleaned chunk
+            features_df: Features engineered from the chunk
+        """
+        for col, moments in self.numerical.items():
+            moments.update(features_df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        for col, table in self.categorical.items():
+            table.update(df[col])
+        return self
+
+    def merge(self, other: 'FeatureStats') -> 'FeatureStats':
+        """Fold in statistics computed on another shard of the data."""
+        if set(other.numerical) != set(self.numerical) or set(other.categorical) != set(self.categorical):
+            raise ValueError("Cannot merge statistics of different features")
+        for col, moments in other.numerical.items():
+            self.numerical[col].merge(moments)
+        for col, table in other.categorical.items():
+            self.categorical[col].merge(table)
+        return self
+
+    def to_dict(self) -> Dict:
+        return {
+            'numerical': {col: moments.to_dict() for col, moments in self.numerical.items()},
+            'categorical': {col: table.to_dict() for col, table in self.categorical.items()}
+        }
@@ -0,0 +1,202 @@
+import os
+import copy
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Union
+import numpy as np
+import pandas as pd
+from ..instrumentation import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pipeline of the current worker process, set by `_init_worker`
+_worker_pipeline = None
+
+
+def _init_worker(pipeline) -> None:
+    global _worker_pipeline
+    _worker_pipeline = pipeline
+
+
+def _transform_shard(shard: pd.DataFrame) -> Dict:
+    """
+    Transform one shard in a worker and publish its features in shared memory.
+
+    The shard is indexed by row position in the full input. Columns of each
+    dtype are written as one (columns, rows) block, so every column is
+    contiguous.
+
+    Returns:
+        Dict with the surviving row positions and the block descriptions
+    """
+    _, features = _worker_pipeline._prepare(shard)
+    blocks = []
+    for dtype, columns in features.columns.groupby(features.dtypes).items():
+        values = features[list(columns)].to_numpy(dtype=dtype).T
+        shm = SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        blocks.append({
+            'name': shm.name,
+            'dtype': values.dtype.str,
+            'shape': values.shape,
+            'columns': list(columns)
+        })
+        shm.close()
+        # The parent unlinks the block once it has copied it
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return {'positions': features.index.to_numpy(dtype=np.int64), 'blocks': blocks}
+
+
+class ParallelPreprocessor:
+    """
+    Run a fitted PreprocessingPipeline's transform over shards in a process pool.
+
+    The input is split by a hash of `user_id` (all of a user's rows land in
+    one shard) or into row ranges. Each worker cleans, processes text and
+    engineers features for its shards with the fitted pipeline state:
+    numerical features are scaled with the fitted mean and std, and
+    one-hot columns are those of the fitted categorical values. Feature
+    blocks come back through shared memory and rows are returned in input
+    order.
+
+    Cleaning decisions (duplicates, median fills, amount outliers) are made
+    within each shard, as they would be for a batch of that size.
+
+        preprocessor = ParallelPreprocessor(pipeline, n_workers=8)
+        features = preprocessor.transform(df)
+    """
+
+    def __init__(
+        self,
+        pipeline,
+        n_workers: Optional[int] = None,
+        shard_by: str = 'user_id',
+        shards_per_worker: int = 4
+    ):
+        """
+        Args:
+            pipeline: Fitted PreprocessingPipeline with mergeable statistics
+            n_workers: Worker processes, defaults to the available CPUs
+            shard_by: 'user_id' or 'rows'
+            shards_per_worker: Shards per worker, more even out uneven shards
+        """
+        if not pipeline.is_fitted or pipeline.stats is None:
+            raise ValueError("Pipeline must be fitted before parallel transforming")
+        if shard_by not in ('user_id', 'rows'):
+            raise ValueError(f"Unknown shard_by: {shard_by}")
+        self.pipeline = pipeline
+        self.n_workers = n_workers or len(os.sched_getaffinity(0))
+        self.shard_by = shard_by
+        self.shards_per_worker = shards_per_worker
+        self.columns = pipeline.feature_engineer.feature_names({
+            col: list(counts) for col, counts in pipeline.feature_stats['categorical'].items()
+        })
+        self._executor = None
+
+    def __enter__(self) -> 'ParallelPreprocessor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
+
+    def transform(self, data: Union[pd.DataFrame, Dict, List]) -> pd.DataFrame:
+        """
+        Transform data on all workers.
+
+        Args:
+            data: Input data as DataFrame, dict, or list
+
+        Returns:
+            pd.DataFrame: Features of the surviving rows, in input order
+        """
+        try:
+            df = self.pipeline._validate_and_convert_input(data)
+            with span('parallel_preprocessor.transform', rows=len(df)):
+                shards = self._shards(df)
+                results = list(self._pool().map(_transform_shard, shards))
+                return self._assemble(df.index, results)
+        except Exception as e:
+            logger.error(f"Error during parallel transformation: {str(e)}")
+            raise
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            pipeline = self._worker_pipeline()
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.n_workers,
+                initializer=_init_worker,
+                initargs=(pipeline,)
+            )
+        return self._executor
+
+    def _worker_pipeline(self):
+        # Workers scale with the fitted statistics rather than per shard
+        pipeline = copy.copy(self.pipeline)
+        pipeline.feature_engineer = self.pipeline._fitted_feature_engineer()
+        return pipeline
+
+    def _shards(self, df: pd.DataFrame) -> List[pd.DataFrame]:
+        n_shards = max(1, min(self.n_workers * self.shards_per_worker, len(df)))
+        # Shards are indexed by row position so results can be put back in order
+        df = df.set_axis(pd.RangeIndex(len(df)))
+        if self.shard_by == 'rows':
+            bounds = np.linspace(0, len(df), n_shards + 1).astype(int)
+            return [df.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+        keys = pd.util.hash_array(df['user_id'].to_numpy()) % n_shards
+        return [df[keys == shard] for shard in range(n_shards) if (keys == shard).any()]
+
+    def _assemble(self, index: pd.Index, results: List[Dict]) -> pd.DataFrame:
+        positions = np.concatenate([result['positions'] for result in results])
+        order = np.argsort(positions, kind='stable')
+        n_rows = len(positions)
+
+        # Copy every shard block into whole-output columns, in shard order
+        columns = {}
+        offset = 0
+        pending = [block['name'] for result in results for block in result['blocks']]
+        try:
+            for result in results:
+                rows = len(result['positions'])
+                for block in result['blocks']:
+                    shm = SharedMemory(name=block['name'])
+                    try:
+                        values = np.ndarray(block['shape'], dtype=np.dtype(block['dtype']), buffer=shm.buf)
+                        for i, column in enumerate(block['columns']):
+                            if column not in columns:
+                                # One-hot columns missing from a shard stay False
+                                columns[column] = np.zeros(n_rows, dtype=values.dtype)
+                            columns[column][offset:offset + rows] = values[i]
+                        del values
+                    finally:
+                        shm.close()
+                        shm.unlink()
+                        pending.remove(block['name'])
+                offset += rows
+        finally:
+            # Don't leak the blocks of shards that were never copied
+            for name in pending:
+                try:
+                    shm = SharedMemory(name=name)
+                    shm.close()
+                    shm.unlink()
+                except FileNotFoundError:
+                    pass
+
+        features = pd.DataFrame(
+            {
+                column: columns[column][order] if column in columns else np.zeros(n_rows, dtype=bool)
+                for column in self.columns
+            },
+            index=index[positions[order]],
+            copy=False
+        )
+        return features
@@ -0,0 +1,27 @@
+from .cache import PatternCache, PatternCacheKey, create_pattern_cache
+from .executors import (
+    ExecutorPool,
+    ExecutorPools,
+    PoolSaturatedError,
+    load_pool_config
+)
+from .resources import (
+    CpuPartition,
+    apply_thread_limits,
+    limit_model_jobs,
+    partitioning_enabled
+)
+
+__all__ = [
+    'PatternCache',
+    'PatternCacheKey',
+    'create_pattern_cache',
+    'ExecutorPool',
+    'ExecutorPools',
+    'PoolSaturatedError',
+    'load_pool_config',
+    'CpuPartition',
+    'apply_thread_limits',
+    'limit_model_jobs',
+    'partitioning_enabled'
+]
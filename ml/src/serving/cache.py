@@ -0,0 +1,192 @@
+import os
+import time
+import threading
+import logging
+from collections import OrderedDict, namedtuple
+from datetime import date
+from typing import Any, Callable, Dict, Iterable, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PatternCacheKey = namedtuple(
+    'PatternCacheKey', ['user_id', 'start_date', 'end_date', 'model_version']
+)
+
+_Entry = namedtuple('_Entry', ['body', 'start', 'end', 'expires_at'])
+
+
+def _parse_date(value: Optional[str]) -> Optional[date]:
+    if value is None:
+        return None
+    return date.fromisoformat(str(value)[:10])
+
+
+class PatternCache:
+    """
+    LRU cache of serialized /analyze/patterns responses.
+
+    Entries are stored as encoded JSON so a hit is returned as-is, without
+    rebuilding any frames. The cache is bounded by total body size and each
+    entry expires after `ttl_seconds`, but entries are normally dropped by
+    `invalidate` as soon as a transaction inside their date range changes.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 3600,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._generations = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._evictions = 0
+
+    def get(self, key: PatternCacheKey) -> Optional[bytes]:
+        """
+        Get a cached response body.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached body, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= self._clock():
+                if entry is not None:
+                    self._remove(key)
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry.body
+
+    def generation(self, user_id: str) -> int:
+        """
+        Get the invalidation generation of a user.
+
+        Read this before computing a result and pass it to `put`, so a result
+        computed from data that was invalidated meanwhile is not cached.
+        """
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def put(self, key: PatternCacheKey, body: bytes, generation: int) -> bool:
+        """
+        Cache a response body.
+
+        Args:
+            key: Cache key
+            body: Encoded response body
+            generation: Value of `generation(key.user_id)` read before
+                the result was computed
+
+        Returns:
+            bool: True if the body was cached
+        """
+        if len(body) > self.max_bytes:
+            return False
+        try:
+            start = _parse_date(key.start_date)
+            end = _parse_date(key.end_date)
+        except ValueError:
+            # Ranges that can't be matched against invalidations aren't cached
+            return False
+
+        with self._lock:
+            if self._generations.get(key.user_id, 0) != generation:
+                return False
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = _Entry(
+                body=body,
+                start=start,
+                end=end,
+                expires_at=self._clock() + self.ttl_seconds
+            )
+            self._keys_by_user.setdefault(key.user_id, set()).add(key)
+            self._size += len(body)
+
+            while self._size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+            return True
+
+    def invalidate(self, user_id: str, dates: Optional[Iterable[str]] = None) -> int:
+        """
+        Drop cached results affected by changed transactions.
+
+        Args:
+            user_id: User whose transactions changed
+            dates: Dates of the changed transactions. Only entries whose
+                range contains one of them are dropped. If None, all of the
+                user's entries are dropped.
+
+        Returns:
+            int: Number of entries dropped
+        """
+        parsed = None if dates is None else [_parse_date(d) for d in dates]
+
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+
+            dropped = 0
+            for key in list(self._keys_by_user.get(user_id, ())):
+                entry = self._entries[key]
+                if parsed is None or any(
+                    (entry.start is None or d >= entry.start) and
+                    (entry.end is None or d <= entry.end)
+                    for d in parsed
+                ):
+                    self._remove(key)
+                    dropped += 1
+
+            self._invalidations += dropped
+            return dropped
+
+    def _remove(self, key: PatternCacheKey) -> None:
+        entry = self._entries.pop(key)
+        self._size -= len(entry.body)
+        user_keys = self._keys_by_user[key.user_id]
+        user_keys.discard(key)
+        if not user_keys:
+            del self._keys_by_user[key.user_id]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._size,
+                'max_bytes': self.max_bytes,
+                'hits': self._hits,
+                'misses': self._misses,
+                'invalidations': self._invalidations,
+                'evictions': self._evictions
+            }
+
+
+def create_pattern_cache() -> PatternCache:
+    """
+    Create the pattern cache, configured from the environment.
+
+    `ML_PATTERN_CACHE_MAX_BYTES` and `ML_PATTERN_CACHE_TTL` (seconds)
+    override the defaults.
+    """
+    return PatternCache(
+        max_bytes=int(os.environ.get('ML_PATTERN_CACHE_MAX_BYTES', 64 * 1024 * 1024)),
+        ttl_seconds=float(os.environ.get('ML_PATTERN_CACHE_TTL', 3600))
+    )
@@ -0,0 +1,200 @@
+import os
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Sequence
+from .resources import CpuPartition, pin_current_thread
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Concurrency limits per model family. `max_workers` bounds how many calls
+# run at once, `max_queue` bounds how many more may wait for a worker and
+# `cpu_share` is the family's relative share of cores when partitioning.
+DEFAULT_POOL_CONFIG = {
+    'categorizer': {'max_workers': 2, 'max_queue': 32, 'cpu_share': 0.5},
+    'forecaster': {'max_workers': 1, 'max_queue': 8, 'cpu_share': 0.25},
+    'anomaly': {'max_workers': 2, 'max_queue': 16, 'cpu_share': 0.125},
+    'patterns': {'max_workers': 1, 'max_queue': 4, 'cpu_share': 0.125}
+}
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised when an executor pool has no free worker and a full queue."""
+
+    def __init__(self, pool_name: str):
+        super().__init__(f"Executor pool '{pool_name}' is saturated")
+        self.pool_name = pool_name
+
+
+class ExecutorPool:
+    """
+    A bounded executor for one model family.
+
+    Blocking model calls are run on a dedicated thread pool so they never
+    block the event loop. Calls beyond `max_workers + max_queue` are
+    rejected immediately instead of piling up behind a slow model. When
+    `cpus` is given, worker threads are pinned to those cores, and so are
+    the runtime threads they start. TensorFlow starts its threads when it
+    initializes, which `apply_thread_limits` does pinned to the forecaster
+    cores.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int,
+                 cpus: Optional[Sequence[int]] = None):
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if max_queue < 0:
+            raise ValueError("max_queue must be non-negative")
+
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.cpus = list(cpus) if cpus is not None else None
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix=f"{name}-pool",
+            initializer=pin_current_thread if cpus is not None else None,
+            initargs=(self.cpus,) if cpus is not None else ()
+        )
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._active = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Run a blocking callable on this pool and await its result.
+
+        Args:
+            fn: Callable to run
+            *args, **kwargs: Arguments passed to the callable
+
+        Returns:
+            The callable's return value
+
+        Raises:
+            PoolSaturatedError: If the pool and its queue are full
+        """
+        with self._lock:
+            if self._in_flight >= self.capacity:
+                self._rejected += 1
+                raise PoolSaturatedError(self.name)
+            self._in_flight += 1
+
+        try:
+            future = self._executor.submit(self._call, fn, args, kwargs)
+        except Exception:
+            self._release()
+            raise
+        # The slot is held until the call itself finishes: a cancelled
+        # await leaves a running call on its worker thread
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    def _call(self, fn: Callable, args: tuple, kwargs: dict) -> Any:
+        with self._lock:
+            self._active += 1
+        succeeded = False
+        try:
+            result = fn(*args, **kwargs)
+            succeeded = True
+            return result
+        finally:
+            with self._lock:
+                self._active -= 1
+                if succeeded:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get a snapshot of pool usage.
+
+        Returns:
+            Dict: Worker/queue usage, counters and saturation ratio
+        """
+        with self._lock:
+            queued = max(self._in_flight - self._active, 0)
+            return {
+                'max_workers': self.max_workers,
+                'max_queue': self.max_queue,
+                'cpus': self.cpus,
+                'active': self._active,
+                'queued': queued,
+                'completed': self._completed,
+                'failed': self._failed,
+                'rejected': self._rejected,
+                'saturation': self._in_flight / self.capacity
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+class ExecutorPools:
+    """
+    Registry of executor pools, one per model family.
+    """
+
+    def __init__(self, config: Optional[Dict[str, Dict[str, Any]]] = None,
+                 partition: Optional[CpuPartition] = None):
+        config = config or load_pool_config()
+        self._pools = {
+            name: ExecutorPool(
+                name, cfg['max_workers'], cfg['max_queue'],
+                cpus=partition.cores(name) if partition is not None else None
+            )
+            for name, cfg in config.items()
+        }
+        logger.info(
+            "Executor pools initialized: %s",
+            {name: pool.max_workers for name, pool in self._pools.items()}
+        )
+
+    def __getitem__(self, name: str) -> ExecutorPool:
+        if name not in self._pools:
+            raise KeyError(f"Unknown executor pool: {name}")
+        return self._pools[name]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: pool.stats() for name, pool in self._pools.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for pool in self._pools.values():
+            pool.shutdown(wait=wait)
+
+
+def load_pool_config() -> Dict[str, Dict[str, Any]]:
+    """
+    Get pool configuration, overriding defaults from the environment.
+
+    `ML_POOL_<NAME>_WORKERS`, `ML_POOL_<NAME>_QUEUE` and
+    `ML_POOL_<NAME>_CPU_SHARE` override the defaults for a pool, e.g.
+    `ML_POOL_PATTERNS_WORKERS=2`.
+
+    Returns:
+        Dictionary of pool name to its limits
+    """
+    config = {}
+    for name, defaults in DEFAULT_POOL_CONFIG.items():
+        prefix = f"ML_POOL_{name.upper()}"
+        config[name] = {
+            'max_workers': int(os.environ.get(f"{prefix}_WORKERS", defaults['max_workers'])),
+            'max_queue': int(os.environ.get(f"{prefix}_QUEUE", defaults['max_queue'])),
+            'cpu_share': float(os.environ.get(f"{prefix}_CPU_SHARE", defaults['cpu_share']))
+        }
+    return config
@@ -0,0 +1,272 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional
+import numpy as np
+import pandas as pd
+from ..data import TransactionSource, expense_transactions
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Blocking inference functions. Each one is meant to be run on the executor
+# pool of its model family, never directly on the event loop.
+
+TRANSACTIONS_PATH = os.environ.get('TRANSACTIONS_PATH', 'data/transactions.csv')
+
+
+def load_user_transactions(
+    user_id: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None
+) -> pd.DataFrame:
+    """
+    Load a user's transactions, optionally restricted to a date range.
+
+    Transactions are read from the database when DATABASE_URL is set, and
+    from the CSV at TRANSACTIONS_PATH otherwise.
+
+    Args:
+        user_id: User to load transactions for
+        start_date: Inclusive start date
+        end_date: Inclusive end date
+
+    Returns:
+        pd.DataFrame: The user's transactions
+    """
+    if os.environ.get('DATABASE_URL'):
+        return TransactionSource().read(user_id, start_date, end_date)
+
+    df = pd.read_csv(TRANSACTIONS_PATH)
+    timestamps = pd.to_datetime(df['timestamp'])
+    mask = df['user_id'].astype(str) == str(user_id)
+    if start_date is not None:
+        mask &= timestamps >= pd.Timestamp(start_date)
+    if end_date is not None:
+        mask &= timestamps <= pd.Timestamp(end_date)
+    return df[mask].reset_index(drop=True)
+
+
+def transactions_to_frame(transactions: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Convert API transaction payloads to the columns DataCleaner expects.
+
+    The models are trained on category names, so the payload's category
+    name is used; category_id is only a fallback for callers that do not
+    send one.
+
+    Args:
+        transactions: List of transactions with amount, category (name),
+            category_id, description and date
+
+    Returns:
+        pd.DataFrame: Transactions with amount, description, category
+            and timestamp columns
+    """
+    df = pd.DataFrame(transactions)
+    if 'category_id' in df.columns:
+        if 'category' in df.columns:
+            df['category'] = df['category'].fillna(df['category_id'])
+        else:
+            df['category'] = df['category_id']
+        df = df.drop(columns='category_id')
+    return df.rename(columns={'date': 'timestamp'})
+
+
+def categorize(model, description: str, top_k: int = 3) -> Dict[str, Any]:
+    """Predict the category of a single transaction description."""
+    return categorize_batch(model, [description], top_k)[0]
+
+
+def categorize_batch(model, descriptions: List[str], top_k: int = 3) -> List[Dict[str, Any]]:
+    """Predict the categories of a batch of transaction descriptions."""
+    probabilities = model.predict_proba(descriptions)
+    labels = getattr(model, 'categories', None)
+
+    def label(index):
+        return labels[index] if labels is not None else int(index)
+
+    results = []
+    for row in probabilities:
+        ranked = np.argsort(row)[::-1][:top_k]
+        results.append({
+            'category': label(ranked[0]),
+            'confidence': float(row[ranked[0]]),
+            'alternatives': [
+                {'category': label(i), 'confidence': float(row[i])}
+                for i in ranked[1:]
+            ],
+            'source': 'model'
+        })
+    return results
+
+
+def rule_match_result(category: str) -> Dict[str, Any]:
+    """Build a categorization result for a merchant rule hit."""
+    return {
+        'category': category,
+        'confidence': 1.0,
+        'alternatives': [],
+        'source': 'merchant_rule'
+    }
+
+
+def anomaly_features(pipeline, detector, df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Build anomaly features aligned to the columns the detector was fit on.
+
+    Rows are transformed one by one with the pipeline's fitted statistics,
+    so every transaction is scored, outliers included, and its features
+    don't depend on the rest of the request.
+    """
+    features = pipeline.transform_rows(df)
+    columns = getattr(detector.model, 'feature_names_in_', None)
+    if columns is not None:
+        features = features.reindex(columns=columns, fill_value=0)
+    return features.fillna(0)
+
+
+def anomaly_reason(amount: float, typical_amount: float) -> str:
+    """Give a short human-readable reason for a flagged transaction."""
+    if typical_amount > 0 and amount > 3 * typical_amount:
+        return 'Amount is unusually high compared to similar transactions'
+    return 'Unusual combination of amount, category and timing'
+
+
+def score_anomalies(
+    detector,
+    pipeline,
+    transactions: List[Dict[str, Any]],
+    offset: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Score transactions and return the ones flagged as anomalous.
+
+    Each transaction's score and reason depend only on the transaction and
+    the fitted models, so scoring a request in chunks gives the same
+    anomalies as scoring it at once.
+
+    Args:
+        detector: Fitted AnomalyDetector
+        pipeline: Fitted PreprocessingPipeline
+        transactions: Transaction payloads
+        offset: Index of the first transaction in the full request
+
+    Returns:
+        List of {index, score, reason} for anomalous transactions
+    """
+    df = transactions_to_frame(transactions)
+    features = anomaly_features(pipeline, detector, df)
+    scores = detector.score_samples(features)
+    predictions = detector.predict(features)
+
+    amounts = pd.to_numeric(df['amount'], errors='coerce').abs()
+    typical_amount = pipeline.feature_stats['numerical']['amount']['mean']
+
+    anomalies = []
+    for position, index in enumerate(features.index):
+        if predictions[position] != -1:
+            continue
+        anomalies.append({
+            'index': int(index) + offset,
+            'score': float(scores[position]),
+            'reason': anomaly_reason(amounts.loc[index], typical_amount)
+        })
+    return anomalies
+
+
+def analyze_patterns(analyzer, df: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Find spending patterns and derive insights and recommendations.
+    """
+    patterns = [to_jsonable(p) for p in analyzer.find_patterns(df)]
+
+    insights = []
+    recommendations = []
+    if len(df):
+        totals = df.groupby('category')['amount'].sum().sort_values(ascending=False)
+        top_category = totals.index[0]
+        share = totals.iloc[0] / totals.sum() if totals.sum() else 0
+        insights.append(
+            f"{top_category} accounts for {share:.0%} of spending in this period"
+        )
+        if share > 0.4:
+            recommendations.append(
+                f"Consider setting a budget for {top_category}"
+            )
+    for pattern in patterns:
+        if pattern['size'] >= 3:
+            insights.append(
+                f"Recurring pattern of {pattern['size']} transactions "
+                f"averaging {pattern['avg_amount']:.2f}"
+            )
+
+    return {
+        'patterns': patterns,
+        'insights': insights,
+        'recommendations': recommendations
+    }
+
+
+def forecast_expenses(model, df: pd.DataFrame, months: int) -> Dict[str, Any]:
+    """
+    Forecast monthly expenses by rolling the daily model forward.
+    """
+    sequence_length = getattr(model, 'sequence_length', 30)
+    daily = (
+        expense_transactions(df)
+        .assign(timestamp=lambda expenses: pd.to_datetime(expenses['timestamp']))
+        .set_index('timestamp')['amount']
+        .resample('D').sum()
+        .fillna(0)
+    )
+    if len(daily) < sequence_length:
+        raise ValueError(
+            f"At least {sequence_length} days of history are required"
+        )
+
+    window = list(daily.values[-sequence_length:])
+    predictions = []
+    for _ in range(months * 30):
+        X = np.array(window[-sequence_length:], dtype=np.float32)
+        value = float(np.ravel(model.predict(X.reshape(1, sequence_length, 1)))[0])
+        predictions.append(max(value, 0.0))
+        window.append(predictions[-1])
+
+    monthly = [
+        float(np.sum(predictions[i * 30:(i + 1) * 30])) for i in range(months)
+    ]
+    last_month = float(daily.values[-30:].sum())
+    if monthly[0] > last_month * 1.05:
+        trend = 'increasing'
+    elif monthly[0] < last_month * 0.95:
+        trend = 'decreasing'
+    else:
+        trend = 'stable'
+
+    return {
+        'forecasts': [
+            {'month': i + 1, 'amount': amount} for i, amount in enumerate(monthly)
+        ],
+        'confidence': float(min(len(daily) / 365, 1.0)),
+        'trends': {'direction': trend, 'last_month_amount': last_month}
+    }
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert numpy/pandas values to JSON-serializable Python values."""
+    if isinstance(value, dict):
+        return {str(k): to_jsonable(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(v) for v in value]
+    if value is pd.NaT:
+        return None
+    if isinstance(value, pd.Timedelta):
+        return value.total_seconds()
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, float) and np.isnan(value):
+        return None
+    return value
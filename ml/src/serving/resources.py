@@ -0,0 +1,222 @@
+import os
+import logging
+import importlib.util
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Families whose models run on sklearn/joblib and numpy BLAS
+SKLEARN_FAMILIES = ('anomaly', 'patterns')
+
+
+def partitioning_enabled() -> bool:
+    """Check whether CPU partitioning is enabled (`ML_CPU_PARTITIONING`)."""
+    return os.environ.get('ML_CPU_PARTITIONING', '1').lower() not in ('0', 'false', 'no')
+
+
+def available_cpus() -> List[int]:
+    """Get the CPUs this process may run on."""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class CpuPartition:
+    """
+    Assignment of CPU cores to model families.
+
+    Every family gets a contiguous slice of the available cores sized by
+    its `cpu_share`, and at least one core. Sizes are apportioned by
+    largest remainder, so with at least as many cores as families the
+    slices are disjoint and cover every core. With fewer cores, each
+    family gets one core and cores are reused in turn.
+    """
+
+    def __init__(self, shares: Dict[str, float], cpus: Optional[Sequence[int]] = None):
+        cpus = list(cpus) if cpus is not None else available_cpus()
+        if not cpus:
+            raise ValueError("No CPUs available to partition")
+        if any(share <= 0 for share in shares.values()):
+            raise ValueError("cpu_share must be positive")
+
+        self.cpus = cpus
+        self.assignments = {}
+        start = 0
+        for name, count in _apportion(shares, len(cpus)).items():
+            self.assignments[name] = [cpus[(start + i) % len(cpus)] for i in range(count)]
+            start += count
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Dict], cpus: Optional[Sequence[int]] = None) -> 'CpuPartition':
+        return cls({name: cfg['cpu_share'] for name, cfg in config.items()}, cpus)
+
+    def cores(self, name: str) -> List[int]:
+        return self.assignments[name]
+
+    def threads(self, name: str) -> int:
+        return len(self.assignments[name])
+
+    def to_dict(self) -> Dict[str, List[int]]:
+        return dict(self.assignments)
+
+
+def _apportion(shares: Dict[str, float], n: int) -> Dict[str, int]:
+    """Split `n` cores by share, at least one each, summing to `n` when possible."""
+    if n < len(shares):
+        return {name: 1 for name in shares}
+    total = sum(shares.values())
+    quotas = {name: n * share / total for name, share in shares.items()}
+    counts = {name: max(1, int(quota)) for name, quota in quotas.items()}
+    # Cores left over go to the largest remainders; cores over-allocated
+    # by the one-core minimum come from the most over-allocated families
+    by_remainder = sorted(quotas, key=lambda name: quotas[name] - counts[name], reverse=True)
+    surplus = sum(counts.values()) - n
+    for name in by_remainder[:max(-surplus, 0)]:
+        counts[name] += 1
+    while surplus > 0:
+        name = min(
+            (name for name in counts if counts[name] > 1),
+            key=lambda name: quotas[name] - counts[name]
+        )
+        counts[name] -= 1
+        surplus -= 1
+    return counts
+
+
+def pin_current_thread(cpus: Sequence[int]) -> None:
+    """Restrict the calling thread to `cpus` (Linux only, otherwise a no-op)."""
+    if hasattr(os, 'sched_setaffinity'):
+        # pid 0 is the calling thread on Linux
+        os.sched_setaffinity(0, set(cpus))
+
+
+@contextmanager
+def pinned(cpus: Sequence[int]) -> Iterator[None]:
+    """Pin the calling thread to `cpus` for the block, then restore its affinity."""
+    if not hasattr(os, 'sched_getaffinity'):
+        yield
+        return
+    previous = os.sched_getaffinity(0)
+    pin_current_thread(cpus)
+    try:
+        yield
+    finally:
+        os.sched_setaffinity(0, previous)
+
+
+def limit_blas_threads(threads: int) -> List[str]:
+    """
+    Cap the BLAS libraries numpy and sklearn use to `threads`.
+
+    BLAS thread counts are set per library for the whole process, so
+    libraries shipped inside the torch package are left alone and the
+    categorizer keeps the threads `torch.set_num_threads` gave it.
+
+    Args:
+        threads: Threads per BLAS call
+
+    Returns:
+        List: Paths of the libraries that were limited
+    """
+    from threadpoolctl import ThreadpoolController
+
+    controller = ThreadpoolController()
+    excluded = _package_dir('torch')
+    paths = [
+        lib.filepath for lib in controller.select(user_api='blas').lib_controllers
+        if excluded is None or not lib.filepath.startswith(excluded)
+    ]
+    if paths:
+        controller.select(filepath=paths).limit(limits=threads)
+    return paths
+
+
+def _package_dir(name: str) -> Optional[str]:
+    spec = importlib.util.find_spec(name)
+    if spec is None or not spec.submodule_search_locations:
+        return None
+    return os.path.realpath(list(spec.submodule_search_locations)[0]) + os.sep
+
+
+def apply_thread_limits(partition: CpuPartition) -> Dict[str, int]:
+    """
+    Size each runtime's thread pools to its family's share of cores.
+
+    Must run at startup before any model is loaded or called: TensorFlow
+    and torch inter-op pools can only be sized before they first start.
+    TensorFlow's runtime is started here, pinned to the forecaster cores,
+    since its threads keep the affinity of the thread that starts them.
+
+    Args:
+        partition: Core assignment per model family
+
+    Returns:
+        Dict: Thread counts that were applied per runtime
+    """
+    applied = {}
+
+    if 'categorizer' in partition.assignments:
+        import torch
+        torch.set_num_threads(partition.threads('categorizer'))
+        try:
+            # Requests already run concurrently on the executor pools
+            torch.set_num_interop_threads(1)
+        except RuntimeError:
+            logger.warning("torch inter-op threads already started; leaving them as is")
+        applied['torch'] = partition.threads('categorizer')
+
+    if 'forecaster' in partition.assignments:
+        try:
+            import tensorflow as tf
+            tf.config.threading.set_intra_op_parallelism_threads(partition.threads('forecaster'))
+            tf.config.threading.set_inter_op_parallelism_threads(1)
+            with pinned(partition.cores('forecaster')):
+                # Initializing the context creates the runtime's thread pools
+                tf.config.list_logical_devices('CPU')
+            applied['tensorflow'] = partition.threads('forecaster')
+        except ImportError:
+            pass
+        except RuntimeError:
+            logger.warning("TensorFlow runtime already initialized; leaving its threads as is")
+
+    sklearn_threads = max(
+        (partition.threads(name) for name in SKLEARN_FAMILIES if name in partition.assignments),
+        default=None
+    )
+    if sklearn_threads is not None:
+        # BLAS pools are process-wide, so they get the largest sklearn share
+        if limit_blas_threads(sklearn_threads):
+            applied['blas'] = sklearn_threads
+
+    logger.info(f"Thread limits applied: {applied}")
+    return applied
+
+
+def limit_estimator_jobs(model, n_jobs: int) -> None:
+    """
+    Cap joblib parallelism of a model's estimator.
+
+    Estimators trained with `n_jobs=-1` would otherwise fan out to every
+    core. Both the model itself and a wrapped `.model` estimator are
+    checked.
+    """
+    for estimator in (model, getattr(model, 'model', None)):
+        if estimator is not None and hasattr(estimator, 'n_jobs'):
+            estimator.n_jobs = n_jobs
+
+
+def limit_model_jobs(models: Dict, partition: CpuPartition) -> None:
+    """
+    Cap joblib parallelism of loaded sklearn models to their family's cores.
+
+    Args:
+        models: Loaded models keyed by MODEL_PATHS name
+        partition: Core assignment per model family
+    """
+    families = {'anomaly_detector': 'anomaly', 'pattern_analyzer': 'patterns'}
+    for model_name, family in families.items():
+        if model_name in models and family in partition.assignments:
+            limit_estimator_jobs(models[model_name], partition.threads(family))
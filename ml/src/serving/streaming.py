@@ -0,0 +1,122 @@
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List
+from .executors import ExecutorPool
+from . import inference
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_LINE_BYTES = 64 * 1024
+
+
+class NDJSONError(ValueError):
+    """Raised when an NDJSON request body cannot be parsed."""
+
+
+async def iter_ndjson(
+    byte_stream: AsyncIterator[bytes],
+    max_line_bytes: int = MAX_LINE_BYTES
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Parse an NDJSON byte stream into records as the bytes arrive.
+
+    Only the current partial line is buffered, so memory does not grow
+    with the size of the body.
+
+    Args:
+        byte_stream: Async iterator of raw body chunks
+        max_line_bytes: Longest accepted line
+
+    Yields:
+        Dict: One decoded record per non-empty line
+    """
+    buffer = b''
+    line_number = 0
+    async for data in byte_stream:
+        buffer += data
+        *lines, buffer = buffer.split(b'\n')
+        if len(buffer) > max_line_bytes:
+            raise NDJSONError(f"Line {line_number + len(lines) + 1} exceeds {max_line_bytes} bytes")
+        for line in lines:
+            line_number += 1
+            record = _decode_line(line, line_number)
+            if record is not None:
+                yield record
+
+    record = _decode_line(buffer, line_number + 1)
+    if record is not None:
+        yield record
+
+
+def _decode_line(line: bytes, line_number: int):
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise NDJSONError(f"Invalid JSON on line {line_number}: {e.msg}")
+    if not isinstance(record, dict):
+        raise NDJSONError(f"Line {line_number} is not a JSON object")
+    return record
+
+
+async def iter_chunks(
+    records: AsyncIterator[Dict[str, Any]],
+    chunk_size: int
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Group records into lists of at most `chunk_size`."""
+    chunk = []
+    async for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+async def stream_anomaly_scores(
+    byte_stream: AsyncIterator[bytes],
+    detector,
+    pipeline,
+    pool: ExecutorPool,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[bytes]:
+    """
+    Score an NDJSON stream of transactions chunk by chunk.
+
+    Each chunk is scored on the anomaly executor pool and its anomalies are
+    written out before the next chunk is read, so at most one chunk of
+    transactions and results is held in memory at a time. Transactions
+    are featurized with the pipeline's fitted statistics rather than per
+    chunk, so the anomalies equal those of `score_anomalies` over the
+    whole stream whatever `chunk_size` is.
+
+    Args:
+        byte_stream: Async iterator of raw NDJSON body chunks
+        detector: Fitted AnomalyDetector
+        pipeline: Fitted PreprocessingPipeline
+        pool: Executor pool to score on
+        chunk_size: Number of transactions scored per chunk
+
+    Yields:
+        bytes: NDJSON lines of {index, score, reason}, or a final
+            {error} line if the stream could not be processed
+    """
+    offset = 0
+    try:
+        async for chunk in iter_chunks(iter_ndjson(byte_stream), chunk_size):
+            anomalies = await pool.run(
+                inference.score_anomalies, detector, pipeline, chunk, offset
+            )
+            offset += len(chunk)
+            if anomalies:
+                yield ''.join(json.dumps(a) + '\n' for a in anomalies).encode()
+    except Exception as e:
+        # Headers are already sent, so errors are reported in-band
+        logger.error(f"Error streaming anomaly scores at index {offset}: {str(e)}")
+        yield (json.dumps({'error': str(e), 'index': offset}) + '\n').encode()
@@ -1,15 +1,69 @@
-from .train_categorizer import train_categorization_model
-from .train_anomaly import train_anomaly_model
-from .train_forecaster import train_forecasting_model
-from .train_patterns import train_pattern_model
-from .evaluate import evaluate_models
-from .hyperparameters import get_default_params
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .train_categorizer import train_categorization_model
+    from .train_first_tier import train_first_tier_model
+    from .train_anomaly import train_anomaly_model
+    from .train_forecaster import train_forecasting_model
+    from .train_patterns import train_pattern_model
+    from .evaluate import (
+        PlotRenderer,
+        evaluate_models,
+        evaluate_categorizer_stream,
+        evaluate_anomaly_detector_stream,
+        evaluate_forecaster_stream,
+        tune_cascade_threshold
+    )
+    from .hyperparameters import get_default_params
+    from .orchestrator import TrainingDAG, retrain_all
+    from .tracking import AsyncRunLogger
+
+# Trainers are imported on first access, so importing the package doesn't
+# load mlflow and every model framework
+_LAZY_ATTRIBUTES = {
+    'train_categorization_model': '.train_categorizer',
+    'train_first_tier_model': '.train_first_tier',
+    'train_anomaly_model': '.train_anomaly',
+    'train_forecasting_model': '.train_forecaster',
+    'train_pattern_model': '.train_patterns',
+    'evaluate_models': '.evaluate',
+    'PlotRenderer': '.evaluate',
+    'evaluate_categorizer_stream': '.evaluate',
+    'evaluate_anomaly_detector_stream': '.evaluate',
+    'evaluate_forecaster_stream': '.evaluate',
+    'tune_cascade_threshold': '.evaluate',
+    'get_default_params': '.hyperparameters',
+    'TrainingDAG': '.orchestrator',
+    'retrain_all': '.orchestrator',
+    'AsyncRunLogger': '.tracking'
+}
+
+def __getattr__(name: str):
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
 
 __all__ = [
     'train_categorization_model',
+    'train_first_tier_model',
     'train_anomaly_model',
     'train_forecasting_model',
     'train_pattern_model',
     'evaluate_models',
-    'get_default_params'
+    'PlotRenderer',
+    'evaluate_categorizer_stream',
+    'evaluate_anomaly_detector_stream',
+    'evaluate_forecaster_stream',
+    'tune_cascade_threshold',
+    'get_default_params',
+    'TrainingDAG',
+    'retrain_all',
+    'AsyncRunLogger'
 ]
\ No newline at end of file
@@ -1,80 +1,279 @@
+import os
+import logging
+import threading
+import contextvars
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional
 import pandas as pd
 import numpy as np
 from sklearn.metrics import classification_report, confusion_matrix
-import matplotlib.pyplot as plt
-import seaborn as sns
-import logging
-from typing import Dict, Any
+from ..instrumentation import span
+from .streaming_metrics import ConfusionMatrix, ErrorSums, ScoreSketch, SequenceWindows, sequence_windows
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def evaluate_models(models: Dict[str, Any], test_data: pd.DataFrame) -> Dict[str, Dict]:
+class PlotRenderer:
+    """
+    Render evaluation plots in a background process.
+
+    Evaluators hand over the data of each figure and carry on; matplotlib
+    only runs in one worker process, which writes `<plot>.png` files to
+    `output_dir`. Nothing waits for a figure until `wait` is called, or
+    the renderer is used as a context manager and exits.
+
+        with PlotRenderer('reports/plots') as plots:
+            results = evaluate_models(models, test_data, plots=plots)
+            generate_evaluation_report(results, 'reports/evaluation.md')
+    """
+
+    def __init__(self, output_dir: str = '.'):
+        """
+        Args:
+            output_dir: Directory the PNG files are written to
+        """
+        self.output_dir = output_dir
+        self._executor = None
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'PlotRenderer':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.wait()
+        self.shutdown()
+
+    def submit(self, name: str, *data) -> Future:
+        """
+        Queue a plot for rendering.
+
+        Args:
+            name: Plot name, also the file name without extension
+            *data: Arrays the plot is drawn from
+
+        Returns:
+            Future: Resolves to the written path
+        """
+        if name not in _PLOTS:
+            raise ValueError(f"Unknown plot: {name}")
+        path = os.path.join(self.output_dir, f"{name}.png")
+        with self._lock:
+            if self._executor is None:
+                os.makedirs(self.output_dir, exist_ok=True)
+                # Spawned, so the worker doesn't inherit model runtime threads
+                self._executor = ProcessPoolExecutor(
+                    max_workers=1, mp_context=multiprocessing.get_context('spawn')
+                )
+            future = self._executor.submit(_render_plot, name, path, *data)
+            self._futures[path] = future
+        return future
+
+    def wait(self) -> List[str]:
+        """
+        Wait for every queued plot.
+
+        A plot that fails to render is logged rather than raised, since
+        figures never change evaluation results.
+
+        Returns:
+            List of written paths
+        """
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        written = []
+        for path, future in futures.items():
+            try:
+                written.append(future.result())
+            except Exception as e:
+                logger.error(f"Error rendering {path}: {str(e)}")
+        return written
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+def _render_plot(name: str, path: str, *data) -> str:
+    import matplotlib
+    matplotlib.use('Agg')
+    _PLOTS[name](path, *data)
+    return path
+
+
+def _plot_confusion_matrix(path, conf_matrix):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 8))
+    sns.heatmap(conf_matrix, annot=True, fmt='d')
+    plt.title('Transaction Categorizer Confusion Matrix')
+    plt.ylabel('True Category')
+    plt.xlabel('Predicted Category')
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_anomaly_scores(path, scores):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.histplot(scores, bins=50)
+    plt.title('Anomaly Score Distribution')
+    plt.xlabel('Anomaly Score')
+    plt.ylabel('Count')
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_score_histogram(path, edges, counts):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 6))
+    plt.stairs(counts, edges, fill=True)
+    plt.title('Anomaly Score Distribution')
+    plt.xlabel('Anomaly Score')
+    plt.ylabel('Count')
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_forecast(path, y_test, y_pred):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 6))
+    plt.plot(y_test, label='Actual')
+    plt.plot(y_pred, label='Predicted')
+    plt.title('Expense Forecasting: Predicted vs Actual')
+    plt.xlabel('Time')
+    plt.ylabel('Amount')
+    plt.legend()
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_pattern_sizes(path, pattern_sizes):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.histplot(pattern_sizes, bins=30)
+    plt.title('Pattern Size Distribution')
+    plt.xlabel('Pattern Size')
+    plt.ylabel('Count')
+    plt.savefig(path)
+    plt.close()
+
+
+def _plot_pattern_frequencies(path, frequency_days):
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    plt.figure(figsize=(10, 6))
+    sns.histplot(frequency_days, bins=30)
+    plt.title('Pattern Frequency Distribution')
+    plt.xlabel('Frequency (days)')
+    plt.ylabel('Count')
+    plt.savefig(path)
+    plt.close()
+
+
+_PLOTS = {
+    'categorizer_confusion_matrix': _plot_confusion_matrix,
+    'anomaly_score_distribution': _plot_anomaly_scores,
+    'anomaly_score_histogram': _plot_score_histogram,
+    'forecaster_predictions': _plot_forecast,
+    'pattern_size_distribution': _plot_pattern_sizes,
+    'pattern_frequency_distribution': _plot_pattern_frequencies
+}
+
+def evaluate_models(
+    models: Dict[str, Any],
+    test_data: pd.DataFrame,
+    plots: Optional[PlotRenderer] = None,
+    max_workers: Optional[int] = None
+) -> Dict[str, Dict]:
     """
     Evaluate all trained models on test data.
     
+    Models are evaluated concurrently in a thread pool; the model runtimes
+    release the GIL while predicting. Returns as soon as every model's
+    metrics are in, while any plots are still rendering in `plots`.
+    
     Args:
         models: Dictionary of trained models
         test_data: Test dataset
+        plots: Renderer to queue plots on, no plots without one
+        max_workers: Models evaluated at once, defaults to all of them
         
     Returns:
         Dictionary containing evaluation metrics for each model
     """
     try:
-        results = {}
-        
-        # Evaluate transaction categorizer
-        if 'transaction_categorizer' in models:
-            results['categorizer'] = evaluate_categorizer(
-                models['transaction_categorizer'],
-                test_data
-            )
-        
-        # Evaluate anomaly detector
-        if 'anomaly_detector' in models:
-            results['anomaly_detector'] = evaluate_anomaly_detector(
-                models['anomaly_detector'],
-                test_data
-            )
-        
-        # Evaluate expense forecaster
-        if 'expense_forecaster' in models:
-            results['forecaster'] = evaluate_forecaster(
-                models['expense_forecaster'],
-                test_data
-            )
-        
-        # Evaluate pattern analyzer
-        if 'pattern_analyzer' in models:
-            results['pattern_analyzer'] = evaluate_pattern_analyzer(
-                models['pattern_analyzer'],
-                test_data
-            )
-        
-        return results
+        # Result key, evaluated model and evaluator, in report order
+        evaluators = [
+            ('categorizer', 'transaction_categorizer', evaluate_categorizer),
+            ('anomaly_detector', 'anomaly_detector', evaluate_anomaly_detector),
+            ('forecaster', 'expense_forecaster', evaluate_forecaster),
+            ('pattern_analyzer', 'pattern_analyzer', evaluate_pattern_analyzer)
+        ]
+        evaluations = [
+            (key, evaluator, models[model_name])
+            for key, model_name, evaluator in evaluators
+            if model_name in models
+        ]
+        if not evaluations:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=max_workers or len(evaluations)) as pool:
+            # Each evaluation runs in a copy of the caller's context, so its
+            # spans nest under the caller's
+            futures = {
+                key: pool.submit(
+                    contextvars.copy_context().run, _timed, key, evaluator, model, test_data, plots
+                )
+                for key, evaluator, model in evaluations
+            }
+            return {key: future.result() for key, future in futures.items()}
         
     except Exception as e:
         logger.error(f"Error during model evaluation: {str(e)}")
         raise
 
-def evaluate_categorizer(model, test_data: pd.DataFrame) -> Dict:
+def _timed(key, evaluator, model, test_data, plots):
+    with span(f'evaluate.{key}', rows=len(test_data)):
+        return evaluator(model, test_data, plots)
+
+def predict_categories(model, texts) -> np.ndarray:
+    """
+    Predict category names.
+
+    Transformer categorizers predict class indices; they are mapped to
+    names through the model's `categories` so they compare with the
+    `category` column.
+    """
+    predictions = np.asarray(model.predict(texts))
+    categories = getattr(model, 'categories', None)
+    if categories is not None and predictions.dtype.kind in 'iu':
+        return np.asarray(categories)[predictions]
+    return predictions
+
+def evaluate_categorizer(model, test_data: pd.DataFrame, plots: Optional[PlotRenderer] = None) -> Dict:
     """Evaluate transaction categorization model."""
     try:
         y_true = test_data['category']
-        y_pred = model.predict(test_data['description'])
+        y_pred = predict_categories(model, test_data['description'])
         
         report = classification_report(y_true, y_pred, output_dict=True)
         conf_matrix = confusion_matrix(y_true, y_pred)
         
-        # Plot confusion matrix
-        plt.figure(figsize=(10, 8))
-        sns.heatmap(conf_matrix, annot=True, fmt='d')
-        plt.title('Transaction Categorizer Confusion Matrix')
-        plt.ylabel('True Category')
-        plt.xlabel('Predicted Category')
-        plt.savefig('categorizer_confusion_matrix.png')
-        plt.close()
+        if plots is not None:
+            plots.submit('categorizer_confusion_matrix', conf_matrix)
         
         return {
             'classification_report': report,
@@ -85,7 +284,132 @@ def evaluate_categorizer(model, test_data: pd.DataFrame) -> Dict:
         logger.error(f"Error evaluating categorizer: {str(e)}")
         raise
 
-def evaluate_anomaly_detector(model, test_data: pd.DataFrame) -> Dict:
+def evaluate_categorizer_parity(
+    reference_model,
+    candidate_model,
+    test_data: pd.DataFrame,
+    max_accuracy_drop: float = 0.01
+) -> Dict:
+    """
+    Check that an optimized categorizer (e.g. int8 or ONNX) keeps the
+    accuracy of the fp32 reference model.
+
+    Args:
+        reference_model: Reference categorizer
+        candidate_model: Optimized categorizer
+        test_data: Test dataset
+        max_accuracy_drop: Largest accepted drop in accuracy
+
+    Returns:
+        Dictionary with both accuracies, prediction agreement and whether
+        the candidate passed
+    """
+    try:
+        reference = evaluate_categorizer(reference_model, test_data)
+        candidate = evaluate_categorizer(candidate_model, test_data)
+
+        reference_accuracy = reference['classification_report']['accuracy']
+        candidate_accuracy = candidate['classification_report']['accuracy']
+        descriptions = test_data['description']
+        agreement = np.mean(
+            predict_categories(reference_model, descriptions) ==
+            predict_categories(candidate_model, descriptions)
+        )
+
+        result = {
+            'reference_accuracy': reference_accuracy,
+            'candidate_accuracy': candidate_accuracy,
+            'accuracy_drop': reference_accuracy - candidate_accuracy,
+            'prediction_agreement': float(agreement),
+            'passed': reference_accuracy - candidate_accuracy <= max_accuracy_drop
+        }
+        logger.info(f"Categorizer parity check: {result}")
+        return result
+
+    except Exception as e:
+        logger.error(f"Error checking categorizer parity: {str(e)}")
+        raise
+
+class _PrecomputedPredictions:
+    """Model stand-in that returns fixed predictions to evaluate_categorizer."""
+
+    def __init__(self, predictions):
+        self.predictions = predictions
+
+    def predict(self, texts):
+        return self.predictions
+
+def tune_cascade_threshold(
+    cascade,
+    test_data: pd.DataFrame,
+    thresholds=None,
+    max_accuracy_drop: float = 0.01
+) -> Dict:
+    """
+    Pick the confidence threshold of a CascadeCategorizer.
+    
+    Each threshold is scored with evaluate_categorizer. The chosen threshold
+    is the lowest one (i.e. the one answering most traffic from the first
+    tier) whose accuracy is within `max_accuracy_drop` of sending every
+    transaction to the fallback model.
+    
+    Args:
+        cascade: CascadeCategorizer to tune; its threshold is updated
+        test_data: Test dataset with description and category columns
+        thresholds: Candidate thresholds
+        max_accuracy_drop: Largest accepted drop against fallback-only accuracy
+        
+    Returns:
+        Dictionary with the chosen threshold and per-threshold results
+    """
+    if thresholds is None:
+        thresholds = [0.5, 0.6, 0.7, 0.8, 0.85, 0.9, 0.95, 0.99]
+
+    try:
+        texts = list(test_data['description'])
+        labels = np.asarray(cascade.categories)
+
+        # Both tiers are run once over the whole set; each threshold then
+        # only decides which tier's answer is used
+        first_tier_proba, fallback_proba = cascade.tier_probabilities(texts)
+        first_tier_pred = labels[first_tier_proba.argmax(axis=1)]
+        fallback_pred = labels[fallback_proba.argmax(axis=1)]
+        confidence = first_tier_proba.max(axis=1)
+
+        fallback_accuracy = evaluate_categorizer(
+            _PrecomputedPredictions(fallback_pred), test_data
+        )['classification_report']['accuracy']
+
+        results = []
+        for threshold in sorted(thresholds):
+            answered = confidence >= threshold
+            predictions = np.where(answered, first_tier_pred, fallback_pred)
+            evaluation = evaluate_categorizer(_PrecomputedPredictions(predictions), test_data)
+            results.append({
+                'threshold': threshold,
+                'accuracy': evaluation['classification_report']['accuracy'],
+                'first_tier_rate': float(answered.mean())
+            })
+
+        accepted = [
+            r for r in results
+            if r['accuracy'] >= fallback_accuracy - max_accuracy_drop
+        ]
+        chosen = accepted[0]['threshold'] if accepted else max(thresholds)
+        cascade.threshold = chosen
+
+        logger.info(f"Cascade threshold set to {chosen}")
+        return {
+            'threshold': chosen,
+            'fallback_accuracy': fallback_accuracy,
+            'results': results
+        }
+
+    except Exception as e:
+        logger.error(f"Error tuning cascade threshold: {str(e)}")
+        raise
+
+def evaluate_anomaly_detector(model, test_data: pd.DataFrame, plots: Optional[PlotRenderer] = None) -> Dict:
     """Evaluate anomaly detection model."""
     try:
         scores = model.score_samples(test_data)
@@ -100,14 +424,8 @@ def evaluate_anomaly_detector(model, test_data: pd.DataFrame) -> Dict:
             'max': scores.max()
         }
         
-        # Plot score distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(scores, bins=50)
-        plt.title('Anomaly Score Distribution')
-        plt.xlabel('Anomaly Score')
-        plt.ylabel('Count')
-        plt.savefig('anomaly_score_distribution.png')
-        plt.close()
+        if plots is not None:
+            plots.submit('anomaly_score_distribution', scores)
         
         return {
             'anomaly_ratio': anomaly_ratio,
@@ -118,17 +436,17 @@ def evaluate_anomaly_detector(model, test_data: pd.DataFrame) -> Dict:
         logger.error(f"Error evaluating anomaly detector: {str(e)}")
         raise
 
-def evaluate_forecaster(model, test_data: pd.DataFrame) -> Dict:
+def evaluate_forecaster(model, test_data: pd.DataFrame, plots: Optional[PlotRenderer] = None) -> Dict:
     """Evaluate expense forecasting model."""
     try:
         # Prepare sequences
-        X_test, y_test = create_sequences(
+        X_test, y_test = sequence_windows(
             test_data['amount'].values,
             model.sequence_length
         )
         
         # Make predictions
-        y_pred = model.predict(X_test)
+        y_pred = np.asarray(model.predict(X_test[..., np.newaxis].astype(np.float32))).ravel()
         
         # Calculate metrics
         mse = np.mean((y_test - y_pred) ** 2)
@@ -138,16 +456,8 @@ def evaluate_forecaster(model, test_data: pd.DataFrame) -> Dict:
         # Calculate relative errors
         mape = np.mean(np.abs((y_test - y_pred) / y_test)) * 100
         
-        # Plot predictions vs actual
-        plt.figure(figsize=(12, 6))
-        plt.plot(y_test, label='Actual')
-        plt.plot(y_pred, label='Predicted')
-        plt.title('Expense Forecasting: Predicted vs Actual')
-        plt.xlabel('Time')
-        plt.ylabel('Amount')
-        plt.legend()
-        plt.savefig('forecaster_predictions.png')
-        plt.close()
+        if plots is not None:
+            plots.submit('forecaster_predictions', y_test, y_pred)
         
         return {
             'mse': mse,
@@ -160,7 +470,7 @@ def evaluate_forecaster(model, test_data: pd.DataFrame) -> Dict:
         logger.error(f"Error evaluating forecaster: {str(e)}")
         raise
 
-def evaluate_pattern_analyzer(model, test_data: pd.DataFrame) -> Dict:
+def evaluate_pattern_analyzer(model, test_data: pd.DataFrame, plots: Optional[PlotRenderer] = None) -> Dict:
     """Evaluate pattern analysis model."""
     try:
         # Find patterns
@@ -178,23 +488,12 @@ def evaluate_pattern_analyzer(model, test_data: pd.DataFrame) -> Dict:
             'coverage_ratio': sum(pattern_sizes) / len(test_data)
         }
         
-        # Plot pattern size distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot(pattern_sizes, bins=30)
-        plt.title('Pattern Size Distribution')
-        plt.xlabel('Pattern Size')
-        plt.ylabel('Count')
-        plt.savefig('pattern_size_distribution.png')
-        plt.close()
-        
-        # Plot pattern frequency distribution
-        plt.figure(figsize=(10, 6))
-        sns.histplot([f / (24 * 3600) for f in pattern_frequencies], bins=30)
-        plt.title('Pattern Frequency Distribution')
-        plt.xlabel('Frequency (days)')
-        plt.ylabel('Count')
-        plt.savefig('pattern_frequency_distribution.png')
-        plt.close()
+        if plots is not None:
+            plots.submit('pattern_size_distribution', pattern_sizes)
+            plots.submit(
+                'pattern_frequency_distribution',
+                [f / (24 * 3600) for f in pattern_frequencies]
+            )
         
         return {
             'pattern_stats': pattern_stats,
@@ -205,6 +504,116 @@ def evaluate_pattern_analyzer(model, test_data: pd.DataFrame) -> Dict:
         logger.error(f"Error evaluating pattern analyzer: {str(e)}")
         raise
 
+def evaluate_categorizer_stream(
+    model,
+    chunks: Iterable[pd.DataFrame],
+    plots: Optional[PlotRenderer] = None
+) -> Dict:
+    """
+    Evaluate the categorizer over test data that arrives in chunks.
+    
+    Only a confusion matrix is kept between chunks, so memory doesn't grow
+    with the test set. Results equal evaluate_categorizer's on the
+    concatenated chunks.
+    
+    Args:
+        model: Categorizer to evaluate
+        chunks: DataFrames with description and category columns, e.g.
+            from TransactionSource.iter_chunks
+        plots: Renderer to queue plots on, no plots without one
+    
+    Returns:
+        Dictionary with the classification report and confusion matrix
+    """
+    try:
+        matrix = ConfusionMatrix()
+        for chunk in chunks:
+            matrix.update(chunk['category'], predict_categories(model, chunk['description']))
+        
+        _, conf_matrix = matrix.matrix()
+        if plots is not None:
+            plots.submit('categorizer_confusion_matrix', conf_matrix)
+        
+        return {
+            'classification_report': matrix.classification_report(),
+            'confusion_matrix': conf_matrix.tolist()
+        }
+        
+    except Exception as e:
+        logger.error(f"Error evaluating categorizer: {str(e)}")
+        raise
+
+def evaluate_anomaly_detector_stream(
+    model,
+    chunks: Iterable[pd.DataFrame],
+    plots: Optional[PlotRenderer] = None,
+    quantiles=(0.01, 0.05, 0.5, 0.95, 0.99)
+) -> Dict:
+    """
+    Evaluate the anomaly detector over test data that arrives in chunks.
+    
+    The anomaly ratio and score distribution equal
+    evaluate_anomaly_detector's on the concatenated chunks. Score
+    quantiles come from a histogram and are accurate to its bin width.
+    
+    Args:
+        model: Anomaly detector to evaluate
+        chunks: Feature DataFrames
+        plots: Renderer to queue plots on, no plots without one
+        quantiles: Score quantiles to report
+    
+    Returns:
+        Dictionary with the anomaly ratio, score distribution and quantiles
+    """
+    try:
+        sketch = ScoreSketch()
+        anomalies = 0
+        for chunk in chunks:
+            sketch.update(model.score_samples(chunk))
+            anomalies += int((np.asarray(model.predict(chunk)) == -1).sum())
+        
+        if plots is not None:
+            plots.submit('anomaly_score_histogram', sketch.edges, sketch.counts)
+        
+        return {
+            'anomaly_ratio': anomalies / sketch.count if sketch.count else np.nan,
+            'score_distribution': sketch.to_dict(),
+            'score_quantiles': {q: sketch.quantile(q) for q in quantiles}
+        }
+        
+    except Exception as e:
+        logger.error(f"Error evaluating anomaly detector: {str(e)}")
+        raise
+
+def evaluate_forecaster_stream(model, chunks: Iterable[pd.DataFrame]) -> Dict:
+    """
+    Evaluate the forecaster over test data that arrives in chunks.
+    
+    Windows spanning chunk boundaries are built from the previous chunk's
+    tail, so the metrics equal evaluate_forecaster's on the concatenated
+    chunks. Predictions aren't kept, so nothing is plotted.
+    
+    Args:
+        model: Forecaster to evaluate
+        chunks: DataFrames with an amount column, in time order
+    
+    Returns:
+        Dictionary with MSE, MAE, RMSE and MAPE
+    """
+    try:
+        windows = SequenceWindows(model.sequence_length)
+        errors = ErrorSums()
+        for chunk in chunks:
+            X_chunk, y_chunk = windows.update(chunk['amount'].values)
+            if len(X_chunk):
+                y_pred = model.predict(X_chunk[..., np.newaxis].astype(np.float32))
+                errors.update(y_chunk, y_pred)
+        return errors.to_dict()
+        
+    except Exception as e:
+        logger.error(f"Error evaluating forecaster: {str(e)}")
+        raise
+
 def generate_evaluation_report(results: Dict[str, Dict], output_path: str) -> None:
     """
     Generate a comprehensive evaluation report.
@@ -268,6 +677,9 @@ def plot_model_comparison(results: Dict[str, Dict], output_path: str) -> None:
         results: Dictionary containing evaluation results
         output_path: Path to save the plots
     """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
     try:
         # Create comparison plots
         plt.style.use('seaborn')
@@ -15,14 +15,35 @@ def get_default_params() -> Dict[str, Dict[str, Any]]:
             'max_length': 128,
             'train_size': 0.8,
             'num_labels': None,  # Set dynamically based on data
-            'dropout_rate': 0.1
+            'dropout_rate': 0.1,
+            'gradient_accumulation_steps': 1,
+            'num_workers': 2,
+            'num_threads': None,  # Torch intra-op threads, None keeps the default
+            'bucket_batches': 50,  # Batches per length-sorted bucket
+            'token_cache_dir': '.cache/tokens',
+            'random_state': 42
+        },
+        'first_tier_categorizer': {
+            'n_features': 2**18,
+            'ngram_min': 3,
+            'ngram_max': 5,
+            'alpha': 1e-5,
+            'train_size': 0.8,
+            'random_state': 42,
+            'threshold': 0.9
         },
         'anomaly_detector': {
             'contamination': 0.1,
             'n_estimators': 100,
             'max_samples': 'auto',
             'train_size': 0.8,
-            'random_state': 42
+            'random_state': 42,
+            'incremental': False,  # Warm-start the saved model on the newest window
+            'window_days': 1,
+            'trees_per_window': 10,
+            'max_estimators': None,  # Ensemble size kept by retiring old trees, defaults to n_estimators
+            'memory_budget_mb': None,  # RSS above which features are spilled to disk
+            'spill_dir': None  # Defaults to a temporary directory
         },
         'forecaster': {
             'sequence_length': 30,
@@ -31,14 +52,25 @@ def get_default_params() -> Dict[str, Dict[str, Any]]:
             'epochs': 100,
             'learning_rate': 0.001,
             'lstm_units': 64,
-            'dropout_rate': 0.2
+            'dropout_rate': 0.2,
+            'fine_tune': False,  # Continue from the last checkpoint on new data
+            'fine_tune_epochs': 5,
+            'fine_tune_patience': 1,
+            'replay_windows': 256,  # Older windows mixed into each fine-tune
+            'validation_windows': 64,
+            'drift_threshold': 2.0,  # New-data loss ratio that forces a full retrain
+            'random_state': 42,
+            'memory_budget_mb': None,
+            'spill_dir': None
         },
         'pattern_analyzer': {
             'eps': 0.5,
             'min_samples': 5,
             'algorithm': 'auto',
             'leaf_size': 30,
-            'n_jobs': -1
+            'n_jobs': -1,
+            'memory_budget_mb': None,
+            'spill_dir': None
         }
     }
 
@@ -86,6 +118,10 @@ def get_param_grid(model_type: str) -> Dict[str, list]:
             'learning_rate': [1e-5, 2e-5, 3e-5],
             'dropout_rate': [0.1, 0.2, 0.3]
         },
+        'first_tier_categorizer': {
+            'alpha': [1e-6, 1e-5, 1e-4],
+            'ngram_max': [4, 5, 6]
+        },
         'anomaly_detector': {
             'contamination': [0.05, 0.1, 0.15],
             'n_estimators': [50, 100, 200]
@@ -0,0 +1,205 @@
+import os
+import gc
+import time
+import shutil
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Frames smaller than this are never worth spilling
+MIN_SPILL_BYTES = 64 * 1024 * 1024
+
+
+def current_rss_bytes() -> int:
+    """Get the current resident set size of this process (Linux)."""
+    with open('/proc/self/statm') as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+
+class MemoryBudget:
+    """
+    Peak-RSS accounting and spill-to-disk for one training run.
+
+    Each `stage` samples RSS from a background thread and records the
+    peak reached while it ran. Once RSS is over the budget, `spill`
+    writes a frame's numeric columns to one .npy file each and hands
+    back a frame backed by read-only memory maps of them, so the pages
+    are file-backed and the kernel can drop them under pressure.
+
+        budget = MemoryBudget(budget_mb=4096)
+        with budget.stage('preprocess'):
+            features = pipeline.fit_transform(df)
+        features = budget.spill('features', features)
+        budget.log_report()
+
+    Without a budget the stages are still accounted but nothing is
+    spilled.
+    """
+
+    def __init__(
+        self,
+        budget_mb: Optional[float] = None,
+        spill_dir: Optional[str] = None,
+        interval: float = 0.05
+    ):
+        """
+        Args:
+            budget_mb: RSS above which frames are spilled, None to never spill
+            spill_dir: Directory for spill files, defaults to a temporary one
+                removed by `cleanup`
+            interval: Seconds between RSS samples
+        """
+        self.budget_bytes = int(budget_mb * 1024 * 1024) if budget_mb else None
+        self.interval = interval
+        self._spill_root = spill_dir
+        self._owns_spill_dir = spill_dir is None
+        self._stages = []
+        self.spilled = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget_bytes is not None
+
+    def over_budget(self) -> bool:
+        return self.enabled and current_rss_bytes() > self.budget_bytes
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Record the RSS at entry and exit of a block and its peak in between.
+
+        Args:
+            name: Stage name used in the report
+        """
+        gc.collect()
+        start_bytes = peak_bytes = current_rss_bytes()
+        stop = threading.Event()
+
+        def sample():
+            nonlocal peak_bytes
+            while not stop.wait(self.interval):
+                peak_bytes = max(peak_bytes, current_rss_bytes())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stop.set()
+            sampler.join()
+            end_bytes = current_rss_bytes()
+            self._stages.append({
+                'stage': name,
+                'seconds': time.perf_counter() - start,
+                'rss_start_mb': start_bytes / 2**20,
+                'rss_end_mb': end_bytes / 2**20,
+                'peak_rss_mb': max(peak_bytes, end_bytes) / 2**20
+            })
+
+    def spill(self, name: str, frame: pd.DataFrame, force: bool = False) -> pd.DataFrame:
+        """
+        Move a frame's numeric columns to memory-mapped files if over budget.
+
+        Object and string columns stay in memory. The caller should drop
+        its own reference to `frame` so the in-memory copy can be freed.
+
+        Args:
+            name: Name of the frame, used for the spill directory
+            frame: Frame to spill
+            force: Spill even when under budget
+
+        Returns:
+            pd.DataFrame: The spilled frame, or `frame` itself if not spilled
+        """
+        if not force and not self.over_budget():
+            return frame
+        size = int(frame.memory_usage(index=True, deep=False).sum())
+        if size < MIN_SPILL_BYTES and not force:
+            return frame
+
+        directory = os.path.join(self._spill_directory(), name)
+        os.makedirs(directory, exist_ok=True)
+        columns = {}
+        spilled_bytes = 0
+        for i, column in enumerate(frame.columns):
+            values = frame[column].to_numpy()
+            if values.dtype.kind not in 'biufcmM' or values.dtype != frame[column].dtype:
+                columns[column] = frame[column]
+                continue
+            path = os.path.join(directory, f"{i}.npy")
+            np.save(path, values)
+            spilled_bytes += values.nbytes
+            columns[column] = np.load(path, mmap_mode='r')
+
+        # copy=False keeps one block per memmap instead of consolidating
+        spilled = pd.DataFrame(columns, index=frame.index, copy=False)
+        self.spilled[name] = spilled_bytes / 2**20
+        logger.info(
+            f"Spilled {spilled_bytes / 2**20:.0f} MB of '{name}' to {directory} "
+            f"(RSS {current_rss_bytes() / 2**20:.0f} MB)"
+        )
+        return spilled
+
+    def report(self) -> List[Dict]:
+        """
+        Get the accounting of every finished stage, in order.
+
+        Returns:
+            List of dicts with stage, seconds, rss_start_mb, rss_end_mb
+            and peak_rss_mb
+        """
+        return [dict(stage) for stage in self._stages]
+
+    def log_report(self) -> None:
+        """Log the per-stage report, flagging stages that went over budget."""
+        for stage in self._stages:
+            over = (
+                self.enabled and stage['peak_rss_mb'] * 2**20 > self.budget_bytes
+            )
+            logger.info(
+                f"{stage['stage']:<16} peak RSS {stage['peak_rss_mb']:8.0f} MB "
+                f"({stage['rss_start_mb']:.0f} -> {stage['rss_end_mb']:.0f} MB, "
+                f"{stage['seconds']:.1f}s)" + (" over budget" if over else "")
+            )
+
+    def log_to_mlflow(self, prefix: str = 'memory', tracker=None) -> None:
+        """
+        Log peak RSS per stage and spilled sizes as MLflow metrics.
+
+        Args:
+            prefix: Metric name prefix
+            tracker: Logger with `log_metrics`, e.g. an AsyncRunLogger,
+                defaults to logging with mlflow directly
+        """
+        metrics = {
+            f"{prefix}/{stage['stage']}/peak_rss_mb": stage['peak_rss_mb']
+            for stage in self._stages
+        }
+        metrics.update({
+            f"{prefix}/{name}/spilled_mb": size for name, size in self.spilled.items()
+        })
+        if metrics:
+            if tracker is None:
+                import mlflow as tracker
+            tracker.log_metrics(metrics)
+
+    def cleanup(self) -> None:
+        """Remove spill files. Spilled frames must not be used afterwards."""
+        if self._owns_spill_dir and self._spill_root is not None:
+            shutil.rmtree(self._spill_root, ignore_errors=True)
+            self._spill_root = None
+
+    def _spill_directory(self) -> str:
+        if self._spill_root is None:
+            self._spill_root = tempfile.mkdtemp(prefix='ml-spill-')
+        return self._spill_root
@@ -0,0 +1,493 @@
+"""
+Retrain every model from one load and one preprocessing pass.
+
+A retrain is a dependency graph of nodes. Loading and preprocessing run
+once and their outputs are written to the work directory; each model's
+training then runs in its own process as soon as its inputs are ready, so
+independent fits run concurrently:
+
+    load ──> preprocess ──> anomaly_detector
+     │            └───────> pattern_analyzer
+     ├────> expense_forecaster
+     └────> transaction_categorizer
+
+Each finished node leaves a checkpoint with its outputs, timing and a
+fingerprint of its configuration and inputs. A rerun skips every node
+whose checkpoint still matches, so a retrain that failed in one model
+resumes from there.
+
+    python -m src.training.orchestrator data/transactions.csv --model-dir models
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import inspect
+import importlib
+import importlib.util
+import logging
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Callable, Dict, Iterable, List, Optional, Union
+import pandas as pd
+from ..data import TransactionSource, load_transactions
+from ..instrumentation import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_FILE = 'checkpoint.json'
+REPORT_FILE = 'report.json'
+
+
+class Node:
+    """
+    One step of a TrainingDAG.
+
+    `fn(node_dir, inputs, **kwargs)` gets its own directory to write to and
+    the outputs of its dependencies by name, and returns its outputs as a
+    JSON-serializable dict. Output values that are paths are checked to
+    still exist before a checkpoint is reused.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fn: Callable,
+        deps: Iterable[str] = (),
+        kwargs: Optional[Dict] = None,
+        in_process: bool = False,
+        fingerprint: Optional[str] = None
+    ):
+        """
+        Args:
+            name: Node name, also its directory name
+            fn: Module-level function running the node
+            deps: Names of the nodes it depends on
+            kwargs: Keyword arguments for `fn`, part of the fingerprint
+            in_process: Run in the orchestrating process instead of a worker
+            fingerprint: Extra input identity, e.g. of the source data. A
+                node with an empty string is never considered up to date
+        """
+        self.name = name
+        self.fn = fn
+        self.deps = list(deps)
+        self.kwargs = kwargs or {}
+        self.in_process = in_process
+        self.fingerprint = fingerprint
+
+
+class TrainingDAG:
+    """
+    Run nodes in dependency order, concurrently where they're independent.
+
+    Worker nodes run in a spawned process pool, so each trainer's framework
+    (TensorFlow, torch) is loaded only in its own process. A failed node
+    stops its dependents only; every other branch still runs.
+    """
+
+    def __init__(self, work_dir: str, max_workers: Optional[int] = None):
+        """
+        Args:
+            work_dir: Directory for node outputs, checkpoints and the report
+            max_workers: Worker processes, defaults to one per worker node
+        """
+        self.work_dir = work_dir
+        self.max_workers = max_workers
+        self.nodes = {}
+
+    def add(self, node: Node) -> 'TrainingDAG':
+        missing = [dep for dep in node.deps if dep not in self.nodes]
+        if missing:
+            raise ValueError(f"Node {node.name} depends on unknown nodes: {missing}")
+        self.nodes[node.name] = node
+        return self
+
+    def run(self, resume: bool = True) -> Dict[str, Dict]:
+        """
+        Run every node that isn't up to date.
+
+        Args:
+            resume: Reuse checkpoints of nodes whose fingerprint matches
+
+        Returns:
+            Report by node with status ('done', 'cached', 'failed' or
+            'skipped'), seconds and outputs. Also written to report.json
+
+        Raises:
+            RuntimeError: If any node failed, after all others have run
+        """
+        os.makedirs(self.work_dir, exist_ok=True)
+        report = {name: {'status': 'pending'} for name in self.nodes}
+        outputs, fingerprints = {}, {}
+        pending = dict(self.nodes)
+        running = {}
+        started = time.perf_counter()
+
+        workers = self.max_workers or max(1, sum(not n.in_process for n in self.nodes.values()))
+        executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context('spawn')
+        )
+        try:
+            with span('orchestrator.run', rows=len(self.nodes)):
+                while pending or running:
+                    for name, node in list(pending.items()):
+                        states = [report[dep]['status'] for dep in node.deps]
+                        if any(state in ('failed', 'skipped') for state in states):
+                            report[name] = {'status': 'skipped'}
+                            del pending[name]
+                            logger.warning(f"Skipping {name}: a dependency failed")
+                            continue
+                        if not all(state in ('done', 'cached') for state in states):
+                            continue
+                        del pending[name]
+
+                        fingerprints[name] = self._fingerprint(node, fingerprints, outputs)
+                        inputs = {dep: outputs[dep] for dep in node.deps}
+                        checkpoint = self._checkpoint(node, fingerprints[name]) if resume else None
+                        if checkpoint is not None:
+                            outputs[name] = checkpoint['outputs']
+                            report[name] = {
+                                'status': 'cached',
+                                'seconds': 0.0,
+                                'trained_seconds': checkpoint['seconds'],
+                                'outputs': checkpoint['outputs']
+                            }
+                            logger.info(f"{name} is up to date, reusing its checkpoint")
+                            continue
+
+                        node_dir = self._node_dir(name)
+                        os.makedirs(node_dir, exist_ok=True)
+                        logger.info(f"Running {name}...")
+                        if node.in_process:
+                            result = _run_node(node.fn, node_dir, inputs, node.kwargs)
+                            self._finish(node, fingerprints[name], result, report, outputs)
+                        else:
+                            future = executor.submit(_run_node, node.fn, node_dir, inputs, node.kwargs)
+                            running[future] = node
+
+                    if running:
+                        done, _ = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            node = running.pop(future)
+                            try:
+                                result = future.result()
+                            except Exception as e:
+                                # The pool itself failed, e.g. a worker was killed
+                                result = {'error': f"{type(e).__name__}: {e}", 'seconds': None}
+                            self._finish(node, fingerprints[node.name], result, report, outputs)
+                    elif pending:
+                        # Nodes are added after their dependencies, so this can't happen
+                        raise RuntimeError(f"Nodes can never run: {sorted(pending)}")
+        finally:
+            executor.shutdown()
+
+        total = time.perf_counter() - started
+        self._write_report(report, total)
+        failed = sorted(name for name, entry in report.items() if entry['status'] == 'failed')
+        if failed:
+            raise RuntimeError(f"Retrain failed in: {', '.join(failed)}")
+        return report
+
+    def _finish(self, node: Node, fingerprint: str, result: Dict, report: Dict, outputs: Dict) -> None:
+        if result.get('error'):
+            report[node.name] = {'status': 'failed', 'seconds': result['seconds'], 'error': result['error']}
+            logger.error(f"{node.name} failed: {result['error']}")
+            return
+        outputs[node.name] = result['outputs']
+        report[node.name] = {'status': 'done', 'seconds': result['seconds'], 'outputs': result['outputs']}
+        checkpoint = {
+            'fingerprint': fingerprint,
+            'outputs': result['outputs'],
+            'seconds': result['seconds'],
+            'finished': pd.Timestamp.now().isoformat()
+        }
+        path = os.path.join(self._node_dir(node.name), CHECKPOINT_FILE)
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(checkpoint, f, indent=2, default=str)
+        os.replace(f"{path}.tmp", path)
+        logger.info(f"{node.name} finished in {result['seconds']:.1f}s")
+
+    def _checkpoint(self, node: Node, fingerprint: str) -> Optional[Dict]:
+        if node.fingerprint == '':
+            return None
+        path = os.path.join(self._node_dir(node.name), CHECKPOINT_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            checkpoint = json.load(f)
+        if checkpoint['fingerprint'] != fingerprint:
+            return None
+        paths = [
+            value for value in checkpoint['outputs'].values()
+            if isinstance(value, str) and os.sep in value
+        ]
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        return checkpoint
+
+    def _fingerprint(self, node: Node, fingerprints: Dict[str, str], outputs: Dict[str, Dict]) -> str:
+        identity = {
+            'name': node.name,
+            'fn': node.fn.__qualname__,
+            # Editing the node's module or its trainer reruns the node
+            'code': _code_fingerprint(node),
+            'kwargs': node.kwargs,
+            # A dependency that reran has written new files, so its
+            # dependents rerun too
+            'deps': {dep: [fingerprints[dep], _file_identity(outputs[dep])] for dep in node.deps},
+            'inputs': node.fingerprint
+        }
+        encoded = json.dumps(identity, sort_keys=True, default=str).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    def _node_dir(self, name: str) -> str:
+        return os.path.join(self.work_dir, name)
+
+    def _write_report(self, report: Dict, total: float) -> None:
+        path = os.path.join(self.work_dir, REPORT_FILE)
+        with open(path, 'w') as f:
+            json.dump({'seconds': total, 'nodes': report}, f, indent=2, default=str)
+        for name, entry in report.items():
+            seconds = entry.get('seconds')
+            timing = f"{seconds:8.1f}s" if seconds is not None else '        -'
+            logger.info(f"{name:<24} {entry['status']:<8} {timing}")
+        logger.info(f"Retrain finished in {total:.1f}s, report at {path}")
+
+
+def _run_node(fn: Callable, node_dir: str, inputs: Dict, kwargs: Dict) -> Dict:
+    # Errors come back as values, so the orchestrator can keep other branches going
+    start = time.perf_counter()
+    try:
+        outputs = fn(node_dir, inputs, **kwargs)
+        return {'outputs': outputs, 'seconds': time.perf_counter() - start}
+    except Exception as e:
+        logger.error(f"Error in {fn.__name__}: {str(e)}")
+        return {'error': f"{type(e).__name__}: {e}", 'seconds': time.perf_counter() - start}
+
+
+def load_node(node_dir: str, inputs: Dict, data_path: Union[str, TransactionSource]) -> Dict:
+    """Load the transactions once and store them as Parquet."""
+    df = load_transactions(data_path)
+    path = os.path.join(node_dir, 'transactions.parquet')
+    df.to_parquet(path, index=False)
+    return {'transactions': path, 'rows': len(df)}
+
+
+def preprocess_node(node_dir: str, inputs: Dict) -> Dict:
+    """Fit the preprocessing pipeline once and store its features and statistics."""
+    from ..preprocessing import PreprocessingPipeline
+
+    df = pd.read_parquet(inputs['load']['transactions'])
+    pipeline = PreprocessingPipeline()
+    features = pipeline.fit_transform(df)
+    features_path = os.path.join(node_dir, 'features.parquet')
+    stats_path = os.path.join(node_dir, 'pipeline.pkl')
+    # Feature rows keep the index of the transactions they came from
+    features.to_parquet(features_path, index=True)
+    pipeline.save_feature_stats(stats_path)
+    return {'features': features_path, 'pipeline': stats_path, 'rows': len(features)}
+
+
+def train_node(
+    node_dir: str,
+    inputs: Dict,
+    trainer: str,
+    model_save_path: str,
+    params: Optional[Dict] = None
+) -> Dict:
+    """
+    Train one model from the shared load and, if given, preprocess outputs.
+
+    Args:
+        node_dir: Directory of this node
+        inputs: Outputs of the load and preprocess nodes
+        trainer: Name of a `src.training` training function
+        model_save_path: Path to save the trained model
+        params: Training parameters, defaults to the trainer's own
+    """
+    train = getattr(importlib.import_module(__package__), trainer)
+    df = pd.read_parquet(inputs['load']['transactions'])
+    kwargs = {}
+    if 'preprocess' in inputs:
+        from ..preprocessing import PreprocessingPipeline
+
+        pipeline = PreprocessingPipeline()
+        pipeline.load_feature_stats(inputs['preprocess']['pipeline'])
+        features = pd.read_parquet(inputs['preprocess']['features'])
+        kwargs['preprocessed'] = (pipeline, features)
+    train(df, model_save_path, params, **kwargs)
+    return {'model': model_save_path}
+
+
+# Trainer, model file name and whether it uses the shared features, by model
+RETRAIN_MODELS = {
+    'anomaly_detector': ('train_anomaly_model', 'anomaly_detector.joblib', True),
+    'pattern_analyzer': ('train_pattern_model', 'pattern_analyzer.joblib', True),
+    'expense_forecaster': ('train_forecasting_model', 'expense_forecaster.h5', False),
+    'transaction_categorizer': ('train_categorization_model', 'transaction_categorizer', False)
+}
+
+# Parameter sets of get_default_params by model
+_PARAM_KEYS = {
+    'anomaly_detector': 'anomaly_detector',
+    'pattern_analyzer': 'pattern_analyzer',
+    'expense_forecaster': 'forecaster',
+    'transaction_categorizer': 'categorizer'
+}
+
+
+def build_retrain_dag(
+    data_path: Union[str, TransactionSource],
+    model_dir: str = 'models',
+    work_dir: str = '.cache/retrain',
+    params: Optional[Dict[str, Dict]] = None,
+    models: Optional[List[str]] = None,
+    max_workers: Optional[int] = None
+) -> TrainingDAG:
+    """
+    Build the retrain graph for the given models.
+
+    Args:
+        data_path: Path to training data CSV, or a TransactionSource
+        model_dir: Directory the models are saved to
+        work_dir: Directory for node outputs and checkpoints
+        params: Training parameters by model, keyed as get_default_params;
+            missing models use their trainer's defaults
+        models: Models to retrain, defaults to all of RETRAIN_MODELS
+        max_workers: Model fits run at once, defaults to all of them
+
+    Returns:
+        TrainingDAG: The graph, ready to run
+    """
+    models = models or list(RETRAIN_MODELS)
+    unknown = sorted(set(models) - set(RETRAIN_MODELS))
+    if unknown:
+        raise ValueError(f"Unknown models: {unknown}")
+    params = params or {}
+
+    dag = TrainingDAG(work_dir, max_workers=max_workers)
+    dag.add(Node(
+        'load', load_node,
+        kwargs={'data_path': data_path},
+        in_process=True,
+        fingerprint=_source_fingerprint(data_path)
+    ))
+    if any(RETRAIN_MODELS[model][2] for model in models):
+        dag.add(Node('preprocess', preprocess_node, deps=['load'], in_process=True))
+    for model in models:
+        trainer, file_name, shares_features = RETRAIN_MODELS[model]
+        dag.add(Node(
+            model, train_node,
+            deps=['load', 'preprocess'] if shares_features else ['load'],
+            kwargs={
+                'trainer': trainer,
+                'model_save_path': os.path.join(model_dir, file_name),
+                'params': params.get(_PARAM_KEYS[model])
+            }
+        ))
+    return dag
+
+
+def retrain_all(
+    data_path: Union[str, TransactionSource],
+    model_dir: str = 'models',
+    work_dir: str = '.cache/retrain',
+    params: Optional[Dict[str, Dict]] = None,
+    models: Optional[List[str]] = None,
+    max_workers: Optional[int] = None,
+    resume: bool = True
+) -> Dict[str, Dict]:
+    """
+    Retrain models with one shared load and preprocessing pass.
+
+    Args:
+        data_path: Path to training data CSV, or a TransactionSource
+        model_dir: Directory the models are saved to
+        work_dir: Directory for node outputs and checkpoints
+        params: Training parameters by model, keyed as get_default_params
+        models: Models to retrain, defaults to all of RETRAIN_MODELS
+        max_workers: Model fits run at once, defaults to all of them
+        resume: Skip nodes whose checkpoint is still up to date
+
+    Returns:
+        Report by node, see TrainingDAG.run
+    """
+    try:
+        dag = build_retrain_dag(data_path, model_dir, work_dir, params, models, max_workers)
+        return dag.run(resume=resume)
+    except Exception as e:
+        logger.error(f"Error during retrain: {str(e)}")
+        raise
+
+
+def _file_identity(outputs: Dict) -> Dict[str, str]:
+    identity = {}
+    for key, value in outputs.items():
+        if isinstance(value, str) and os.path.isfile(value):
+            stat = os.stat(value)
+            identity[key] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return identity
+
+
+def _code_fingerprint(node: Node) -> Dict[str, str]:
+    sources = {node.fn.__module__: inspect.getsourcefile(node.fn)}
+    trainer = node.kwargs.get('trainer')
+    if trainer is not None:
+        sources.update(_trainer_source(trainer))
+    identity = {}
+    for module, path in sources.items():
+        with open(path, 'rb') as f:
+            identity[module] = hashlib.sha256(f.read()).hexdigest()
+    return identity
+
+
+def _trainer_source(trainer: str) -> Dict[str, str]:
+    # Located without importing, which would load the trainer's framework
+    from . import _LAZY_ATTRIBUTES
+
+    module = _LAZY_ATTRIBUTES.get(trainer)
+    if module is None:
+        raise ValueError(f"Unknown trainer: {trainer}")
+    spec = importlib.util.find_spec(module, __package__)
+    return {spec.name: spec.origin}
+
+
+def _source_fingerprint(data_path) -> str:
+    # Database contents can't be fingerprinted cheaply, so they always reload
+    if isinstance(data_path, TransactionSource) or not os.path.exists(data_path):
+        return ''
+    stat = os.stat(data_path)
+    return f"{os.path.abspath(data_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('data_path', help='Training data CSV')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--work-dir', default='.cache/retrain')
+    parser.add_argument('--models', help='Comma-separated models, defaults to all')
+    parser.add_argument('--params', help='JSON file of parameters by model')
+    parser.add_argument('--max-workers', type=int)
+    parser.add_argument('--no-resume', action='store_true', help='Rerun every node')
+    args = parser.parse_args()
+
+    params = None
+    if args.params:
+        with open(args.params) as f:
+            params = json.load(f)
+    retrain_all(
+        args.data_path,
+        model_dir=args.model_dir,
+        work_dir=args.work_dir,
+        params=params,
+        models=args.models.split(',') if args.models else None,
+        max_workers=args.max_workers,
+        resume=not args.no_resume
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+from typing import Dict, List, Tuple
+import numpy as np
+from ..preprocessing.feature_stats import RunningMoments
+
+
+class ConfusionMatrix:
+    """
+    Confusion matrix counted chunk by chunk.
+
+    Labels are added as they are seen and the matrix is ordered by sorted
+    label, as sklearn's `confusion_matrix` orders it, so a matrix built
+    over chunks equals the one built over the concatenated vectors. Memory
+    depends on the number of labels only.
+    """
+
+    def __init__(self):
+        self.labels = []
+        self._index = {}
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+
+    def update(self, y_true, y_pred) -> 'ConfusionMatrix':
+        y_true = np.asarray(y_true)
+        y_pred = np.asarray(y_pred)
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"Got {len(y_true)} labels and {len(y_pred)} predictions")
+        for label in np.unique(np.concatenate([y_true, y_pred])):
+            self._add_label(_scalar(label))
+        n_labels = len(self.labels)
+        true_index = self._indices(y_true)
+        pred_index = self._indices(y_pred)
+        self.counts += np.bincount(
+            true_index * n_labels + pred_index, minlength=n_labels * n_labels
+        ).reshape(n_labels, n_labels)
+        return self
+
+    def merge(self, other: 'ConfusionMatrix') -> 'ConfusionMatrix':
+        for label in other.labels:
+            self._add_label(label)
+        index = np.array([self._index[label] for label in other.labels], dtype=np.int64)
+        self.counts[np.ix_(index, index)] += other.counts
+        return self
+
+    def matrix(self) -> Tuple[List, np.ndarray]:
+        """Sorted labels and the matrix in that order, rows being true labels."""
+        order = sorted(range(len(self.labels)), key=lambda i: self.labels[i])
+        return [self.labels[i] for i in order], self.counts[np.ix_(order, order)]
+
+    def classification_report(self) -> Dict:
+        """
+        Per-label precision, recall, F1 and support with accuracy and
+        averages, in the layout of sklearn's `classification_report` with
+        `output_dict=True`. Undefined ratios are 0.
+        """
+        labels, counts = self.matrix()
+        tp = np.diag(counts).astype(np.float64)
+        support = counts.sum(axis=1).astype(np.float64)
+        predicted = counts.sum(axis=0).astype(np.float64)
+        precision = _ratio(tp, predicted)
+        recall = _ratio(tp, support)
+        f1 = _ratio(2 * tp, support + predicted)
+
+        report = {
+            str(label): {
+                'precision': float(precision[i]),
+                'recall': float(recall[i]),
+                'f1-score': float(f1[i]),
+                'support': float(support[i])
+            }
+            for i, label in enumerate(labels)
+        }
+        total = support.sum()
+        report['accuracy'] = float(tp.sum() / total) if total else 0.0
+        report['macro avg'] = {
+            'precision': float(precision.mean()),
+            'recall': float(recall.mean()),
+            'f1-score': float(f1.mean()),
+            'support': float(total)
+        }
+        weights = support if total else None
+        report['weighted avg'] = {
+            'precision': float(np.average(precision, weights=weights)),
+            'recall': float(np.average(recall, weights=weights)),
+            'f1-score': float(np.average(f1, weights=weights)),
+            'support': float(total)
+        }
+        return report
+
+    def _add_label(self, label) -> None:
+        if label in self._index:
+            return
+        self._index[label] = len(self.labels)
+        self.labels.append(label)
+        counts = np.zeros((len(self.labels), len(self.labels)), dtype=np.int64)
+        counts[:-1, :-1] = self.counts
+        self.counts = counts
+
+    def _indices(self, values: np.ndarray) -> np.ndarray:
+        uniques, inverse = np.unique(values, return_inverse=True)
+        mapping = np.array([self._index[_scalar(label)] for label in uniques], dtype=np.int64)
+        return mapping[inverse.ravel()]
+
+
+class ErrorSums:
+    """
+    Running sums of squared, absolute and percentage errors.
+
+    MSE, MAE, RMSE and MAPE are derived from the sums at the end, so the
+    result equals the mean over the concatenated vectors up to float
+    rounding. As in the in-memory path, a zero target makes MAPE infinite.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.squared = 0.0
+        self.absolute = 0.0
+        self.percentage = 0.0
+
+    def update(self, y_true, y_pred) -> 'ErrorSums':
+        y_true = np.asarray(y_true, dtype=np.float64).ravel()
+        y_pred = np.asarray(y_pred, dtype=np.float64).ravel()
+        if len(y_true) != len(y_pred):
+            raise ValueError(f"Got {len(y_true)} targets and {len(y_pred)} predictions")
+        errors = y_true - y_pred
+        self.count += len(errors)
+        self.squared += float(np.sum(errors ** 2))
+        self.absolute += float(np.sum(np.abs(errors)))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.percentage += float(np.sum(np.abs(errors / y_true)))
+        return self
+
+    def merge(self, other: 'ErrorSums') -> 'ErrorSums':
+        self.count += other.count
+        self.squared += other.squared
+        self.absolute += other.absolute
+        self.percentage += other.percentage
+        return self
+
+    def to_dict(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {'mse': np.nan, 'mae': np.nan, 'rmse': np.nan, 'mape': np.nan}
+        mse = self.squared / self.count
+        return {
+            'mse': mse,
+            'mae': self.absolute / self.count,
+            'rmse': float(np.sqrt(mse)),
+            'mape': self.percentage / self.count * 100
+        }
+
+
+class ScoreSketch:
+    """
+    Moments and a fixed-bin histogram of anomaly scores.
+
+    Mean, standard deviation (population, as `np.std`), min and max are
+    exact, kept by RunningMoments. Quantiles are read off the histogram and are accurate to one bin
+    width. IsolationForest scores lie in [-1, 0], the default range; scores
+    outside the range are counted in the edge bins.
+    """
+
+    def __init__(self, bins: int = 1000, value_range: Tuple[float, float] = (-1.0, 0.0)):
+        self.edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.moments = RunningMoments()
+
+    def update(self, scores) -> 'ScoreSketch':
+        scores = np.asarray(scores, dtype=np.float64).ravel()
+        if len(scores) == 0:
+            return self
+        bins = np.searchsorted(self.edges, scores, side='right') - 1
+        self.counts += np.bincount(
+            np.clip(bins, 0, len(self.counts) - 1), minlength=len(self.counts)
+        )
+        self.moments.update(scores)
+        return self
+
+    def merge(self, other: 'ScoreSketch') -> 'ScoreSketch':
+        if not np.array_equal(self.edges, other.edges):
+            raise ValueError("Can't merge sketches with different bins")
+        self.counts += other.counts
+        self.moments.merge(other.moments)
+        return self
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def quantile(self, q: float) -> float:
+        """Quantile `q` in [0, 1], interpolated within its histogram bin."""
+        if self.count == 0:
+            return np.nan
+        cumulative = np.cumsum(self.counts)
+        target = q * self.count
+        i = min(int(np.searchsorted(cumulative, target, side='left')), len(self.counts) - 1)
+        below = cumulative[i - 1] if i > 0 else 0
+        fraction = (target - below) / self.counts[i] if self.counts[i] else 0.0
+        value = self.edges[i] + fraction * (self.edges[i + 1] - self.edges[i])
+        return float(np.clip(value, self.moments.min, self.moments.max))
+
+    def to_dict(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {'mean': np.nan, 'std': np.nan, 'min': np.nan, 'max': np.nan}
+        moments = self.moments
+        return {
+            'mean': moments.mean,
+            'std': float(np.sqrt(moments.m2 / moments.count)),
+            'min': moments.min,
+            'max': moments.max
+        }
+
+
+class SequenceWindows:
+    """
+    Forecasting windows over a series that arrives in chunks.
+
+    The last `sequence_length` values of each chunk are carried into the
+    next, so windows spanning chunk boundaries are produced exactly once
+    and the windows over all chunks equal `create_sequences` over the
+    whole series.
+    """
+
+    def __init__(self, sequence_length: int):
+        self.sequence_length = sequence_length
+        self._tail = np.empty(0, dtype=np.float64)
+
+    def update(self, values) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Args:
+            values: Next values of the series
+
+        Returns:
+            Windows of shape (n, sequence_length) and their targets
+        """
+        series = np.concatenate([self._tail, np.asarray(values, dtype=np.float64)])
+        self._tail = series[-self.sequence_length:] if self.sequence_length else series[:0]
+        return sequence_windows(series, self.sequence_length)
+
+
+def sequence_windows(series: np.ndarray, sequence_length: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Windows of `sequence_length` values, each with the value following it."""
+    series = np.asarray(series, dtype=np.float64)
+    n = max(len(series) - sequence_length, 0)
+    if n == 0:
+        return np.empty((0, sequence_length)), np.empty(0)
+    windows = np.lib.stride_tricks.sliding_window_view(series, sequence_length)[:n]
+    return windows, series[sequence_length:]
+
+
+def _scalar(value):
+    # Labels are kept as Python values, so numpy and object arrays agree
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator != 0)
@@ -0,0 +1,248 @@
+import os
+import time
+import queue
+import atexit
+import shutil
+import logging
+import tempfile
+import threading
+import weakref
+from typing import Dict, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# MLflow's limits on a single log_batch request
+MAX_PARAMS_PER_BATCH = 100
+MAX_ENTITIES_PER_BATCH = 1000
+
+# Loggers still open, closed at interpreter exit
+_open_loggers = weakref.WeakSet()
+
+
+class AsyncRunLogger:
+    """
+    Log params, metrics, artifacts and models of an MLflow run from a
+    background thread.
+
+    Calls only put an entry on an unbounded queue and return, so training
+    never waits on the tracking server. A worker thread drains the queue
+    every `flush_interval` seconds and sends params and metrics in
+    `log_batch` requests of up to MLflow's batch limits; artifacts and
+    models are uploaded in the order they were queued. Leaving the context,
+    also on an exception, and interpreter exit flush everything that is
+    queued. Time spent in MLflow calls is logged as `<prefix>/seconds`, and
+    time spent queueing as `<prefix>/enqueue_seconds`.
+
+    Only the MlflowClient API is used, so any tracking store works,
+    including a local `file:` store:
+
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker:
+            tracker.log_params(params)
+            tracker.log_metrics({'loss': loss}, step=epoch)
+            tracker.log_model(mlflow.sklearn, model, 'model')
+
+    Errors raised by MLflow are logged and counted in `errors` rather than
+    raised into the training code.
+    """
+
+    def __init__(
+        self,
+        run_id: Optional[str] = None,
+        client=None,
+        flush_interval: float = 1.0,
+        prefix: str = 'logging'
+    ):
+        """
+        Args:
+            run_id: Run to log to, defaults to the active run
+            client: MlflowClient to log with, defaults to one for the
+                current tracking URI
+            flush_interval: Seconds between batches
+            prefix: Name prefix of the logging time metrics
+        """
+        if run_id is None or client is None:
+            import mlflow
+            from mlflow.tracking import MlflowClient
+
+            if run_id is None:
+                run = mlflow.active_run()
+                if run is None:
+                    raise ValueError("No run_id given and no active MLflow run")
+                run_id = run.info.run_id
+            client = client or MlflowClient()
+        self.run_id = run_id
+        self.client = client
+        self.flush_interval = flush_interval
+        self.prefix = prefix
+        self.logging_seconds = 0.0
+        self.enqueue_seconds = 0.0
+        self.errors = 0
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='mlflow-logger', daemon=True)
+        self._thread.start()
+        _open_loggers.add(self)
+
+    def __enter__(self) -> 'AsyncRunLogger':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def log_params(self, params: Dict) -> None:
+        start = time.perf_counter()
+        for key, value in params.items():
+            self._queue.put(('param', key, str(value)))
+        self.enqueue_seconds += time.perf_counter() - start
+
+    def log_metrics(self, metrics: Dict, step: Optional[int] = None) -> None:
+        start = time.perf_counter()
+        timestamp = int(time.time() * 1000)
+        for key, value in metrics.items():
+            self._queue.put(('metric', key, float(value), timestamp, step or 0))
+        self.enqueue_seconds += time.perf_counter() - start
+
+    def log_metric(self, key: str, value: float, step: Optional[int] = None) -> None:
+        self.log_metrics({key: value}, step=step)
+
+    def log_artifact(self, local_path: str, artifact_path: Optional[str] = None) -> None:
+        """Queue a file for upload. It must not change until it's uploaded."""
+        self._call(self.client.log_artifact, self.run_id, local_path, artifact_path)
+
+    def log_artifacts(self, local_dir: str, artifact_path: Optional[str] = None) -> None:
+        """Queue a directory for upload. It must not change until it's uploaded."""
+        self._call(self.client.log_artifacts, self.run_id, local_dir, artifact_path)
+
+    def log_model(self, flavor, model, artifact_path: str, **kwargs) -> None:
+        """
+        Queue a model for saving with an MLflow flavor and uploading.
+
+        The model is saved with `flavor.save_model` in the worker thread and
+        its directory uploaded to `artifact_path`, the layout
+        `flavor.log_model` produces, so it loads with
+        `flavor.load_model('runs:/<run_id>/<artifact_path>')`. The model is
+        saved as it is when the worker reaches it.
+
+        Args:
+            flavor: MLflow flavor module, e.g. mlflow.sklearn
+            model: Model to save
+            artifact_path: Run-relative path of the model
+            **kwargs: Passed to `flavor.save_model`
+        """
+        self._call(self._save_and_upload_model, flavor, model, artifact_path, kwargs)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything queued so far is logged.
+
+        Returns:
+            bool: Whether the queue was flushed within `timeout`
+        """
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def close(self) -> None:
+        """Flush the queue, log the logging time metrics and stop the worker."""
+        if self._closed:
+            return
+        self.flush()
+        # Logging time is only final once the queue is drained
+        self.log_metrics({
+            f"{self.prefix}/seconds": self.logging_seconds,
+            f"{self.prefix}/enqueue_seconds": self.enqueue_seconds
+        })
+        self._queue.put(('stop',))
+        self._thread.join()
+        self._closed = True
+        _open_loggers.discard(self)
+        if self.errors:
+            logger.warning(f"{self.errors} MLflow logging calls failed for run {self.run_id}")
+
+    def _call(self, fn, *args) -> None:
+        start = time.perf_counter()
+        self._queue.put(('call', fn, args))
+        self.enqueue_seconds += time.perf_counter() - start
+
+    def _run(self) -> None:
+        while True:
+            entries = [self._queue.get()]
+            # Collect for up to `flush_interval` so entries go out in few
+            # batches, unless a flush or stop asks for them now
+            deadline = time.monotonic() + self.flush_interval
+            while entries[-1][0] not in ('flush', 'stop'):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    entries.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            if not self._process(entries):
+                return
+
+    def _process(self, entries) -> bool:
+        params, metrics = [], []
+        for entry in entries:
+            kind = entry[0]
+            if kind == 'param':
+                params.append(entry[1:])
+                continue
+            if kind == 'metric':
+                metrics.append(entry[1:])
+                continue
+            # Everything queued before a call, flush or stop is sent first
+            self._send(params, metrics)
+            params, metrics = [], []
+            if kind == 'call':
+                self._timed(entry[1], *entry[2])
+            elif kind == 'flush':
+                entry[1].set()
+            elif kind == 'stop':
+                return False
+        self._send(params, metrics)
+        return True
+
+    def _send(self, params, metrics) -> None:
+        from mlflow.entities import Metric, Param
+
+        while params or metrics:
+            batch_params = params[:MAX_PARAMS_PER_BATCH]
+            batch_metrics = metrics[:MAX_ENTITIES_PER_BATCH - len(batch_params)]
+            params = params[len(batch_params):]
+            metrics = metrics[len(batch_metrics):]
+            self._timed(
+                self.client.log_batch,
+                self.run_id,
+                metrics=[Metric(key, value, timestamp, step) for key, value, timestamp, step in batch_metrics],
+                params=[Param(key, value) for key, value in batch_params]
+            )
+
+    def _timed(self, fn, *args, **kwargs) -> None:
+        start = time.perf_counter()
+        try:
+            fn(*args, **kwargs)
+        except Exception as e:
+            self.errors += 1
+            logger.error(f"Error logging to MLflow run {self.run_id}: {str(e)}")
+        finally:
+            self.logging_seconds += time.perf_counter() - start
+
+    def _save_and_upload_model(self, flavor, model, artifact_path: str, kwargs: Dict) -> None:
+        local_dir = tempfile.mkdtemp(prefix='mlflow-model-')
+        try:
+            model_dir = os.path.join(local_dir, os.path.basename(artifact_path.rstrip('/')))
+            flavor.save_model(model, model_dir, **kwargs)
+            self.client.log_artifacts(self.run_id, model_dir, artifact_path)
+        finally:
+            shutil.rmtree(local_dir, ignore_errors=True)
+
+
+@atexit.register
+def _close_open_loggers() -> None:
+    for run_logger in list(_open_loggers):
+        run_logger.close()
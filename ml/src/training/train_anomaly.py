@@ -5,25 +5,41 @@ from sklearn.model_selection import train_test_split
 import mlflow
 import mlflow.sklearn
 import logging
-from ..models import AnomalyDetector
+from typing import Optional, Tuple, Union
+from ..models import AnomalyDetector, save_bundle
 from ..preprocessing import PreprocessingPipeline
+from ..data import TransactionSource, load_transactions
+from ..instrumentation import collect_spans, log_spans_to_mlflow, span
+from .tracking import AsyncRunLogger
+from .memory import MemoryBudget
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def train_anomaly_model(
-    data_path: str,
+    data_path: Union[str, TransactionSource],
     model_save_path: str,
-    params: dict = None
+    params: dict = None,
+    preprocessed: Optional[Tuple[PreprocessingPipeline, pd.DataFrame]] = None
 ) -> AnomalyDetector:
     """
     Train an anomaly detection model for transaction monitoring.
     
+    With `incremental` set and a model already at `model_save_path`, only
+    the last `window_days` of data are used: the saved forest gains
+    `trees_per_window` trees fitted on that window and retires its oldest
+    trees beyond `max_estimators`, and the saved feature statistics are
+    merged with the window's.
+    
     Args:
-        data_path: Path to training data
+        data_path: Path to training data CSV, a TransactionSource, or the
+            loaded transactions
         model_save_path: Path to save trained model
         params: Training parameters
+        preprocessed: Pipeline already fitted on the data and its
+            features, as shared by the retrain orchestrator; incremental
+            retrains preprocess their window themselves
     
     Returns:
         Trained AnomalyDetector model
@@ -34,40 +50,81 @@ def train_anomaly_model(
             'random_state': 42,
             'train_size': 0.8,
             'n_estimators': 100,
-            'max_samples': 'auto'
+            'max_samples': 'auto',
+            'incremental': False,
+            'window_days': 1,
+            'trees_per_window': 10,
+            'max_estimators': None,
+            'memory_budget_mb': None,
+            'spill_dir': None
         }
 
+    budget = MemoryBudget(params.get('memory_budget_mb'), params.get('spill_dir'))
+    incremental = params.get('incremental') and os.path.exists(model_save_path)
+    stats_path = f"{model_save_path}_pipeline.pkl"
     try:
-        with mlflow.start_run():
-            mlflow.log_params(params)
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker, collect_spans() as spans:
+            tracker.log_params(params)
             
             # Load and preprocess data
             logger.info("Loading and preprocessing data...")
-            df = pd.read_csv(data_path)
-            pipeline = PreprocessingPipeline()
-            features = pipeline.fit_transform(df)
+            with span('train_anomaly.load'), budget.stage('load'):
+                df = load_transactions(data_path)
+                timestamps = pd.to_datetime(df['timestamp'])
+                if incremental:
+                    # Only the newest window is trained on
+                    window_start = timestamps.max().normalize() - pd.Timedelta(days=params['window_days'] - 1)
+                    in_window = (timestamps >= window_start).to_numpy()
+                    df, timestamps = df[in_window], timestamps[in_window]
+                    logger.info(f"Incremental retrain on {len(df)} rows since {window_start.date()}")
+                start, end = timestamps.min(), timestamps.max()
+                del timestamps
+            with span('train_anomaly.preprocess', rows=len(df)), budget.stage('preprocess'):
+                if preprocessed is not None and not incremental:
+                    pipeline, features = preprocessed
+                else:
+                    pipeline = PreprocessingPipeline()
+                    features = pipeline.fit_transform(df)
+            # The raw frame is not needed past preprocessing
+            del df
+            features = budget.spill('features', features)
             
             # Split data
-            X_train, X_test = train_test_split(
-                features,
-                train_size=params['train_size'],
-                random_state=params['random_state']
-            )
+            with budget.stage('split'):
+                X_train, X_test = train_test_split(
+                    features,
+                    train_size=params['train_size'],
+                    random_state=params['random_state']
+                )
+                n_rows = len(features)
+                del features
             
             # Initialize and train model
-            logger.info("Training anomaly detection model...")
-            detector = AnomalyDetector(
-                contamination=params['contamination'],
-                n_estimators=params['n_estimators'],
-                max_samples=params['max_samples']
-            )
-            
-            detector.fit(X_train)
+            if incremental:
+                logger.info("Updating anomaly detection model...")
+                detector = AnomalyDetector.load(model_save_path)
+                if params.get('max_estimators'):
+                    detector.max_estimators = params['max_estimators']
+                with span('train_anomaly.update', rows=len(X_train)), budget.stage('fit'):
+                    detector.update(X_train, start, end, n_trees=params.get('trees_per_window'))
+            else:
+                logger.info("Training anomaly detection model...")
+                detector = AnomalyDetector(
+                    contamination=params['contamination'],
+                    n_estimators=params['n_estimators'],
+                    max_samples=params['max_samples'],
+                    random_state=params['random_state'],
+                    trees_per_window=params.get('trees_per_window', 10),
+                    max_estimators=params.get('max_estimators')
+                )
+                with span('train_anomaly.fit', rows=len(X_train)), budget.stage('fit'):
+                    detector.fit(X_train, start, end)
             
             # Evaluate model
             logger.info("Evaluating model...")
-            train_scores = detector.score_samples(X_train)
-            test_scores = detector.score_samples(X_test)
+            with span('train_anomaly.evaluate', rows=n_rows), budget.stage('evaluate'):
+                train_scores = detector.score_samples(X_train)
+                test_scores = detector.score_samples(X_test)
             
             # Calculate metrics
             train_anomalies = (train_scores < np.percentile(train_scores, 
@@ -83,19 +140,37 @@ def train_anomaly_model(
             }
             
             # Log metrics
-            mlflow.log_metrics(metrics)
+            metrics['n_estimators'] = len(detector.tree_windows)
+            metrics['n_windows'] = len(detector.windows)
+            tracker.log_metrics(metrics)
             
             # Save model and preprocessing pipeline
-            os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
-            detector.save(model_save_path)
-            pipeline.save_feature_stats(f"{model_save_path}_pipeline.pkl")
+            with span('train_anomaly.save'):
+                if incremental and os.path.exists(stats_path):
+                    previous = PreprocessingPipeline()
+                    previous.load_feature_stats(stats_path)
+                    if previous.stats is not None:
+                        pipeline = previous.merge(pipeline)
+                os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+                detector.save(model_save_path)
+                pipeline.save_feature_stats(stats_path)
+                save_bundle(
+                    f"{model_save_path}.bundle", detector, pipeline,
+                    metadata={'params': params, 'metrics': metrics}
+                )
             
             # Log model with MLflow
-            mlflow.sklearn.log_model(detector, "anomaly_detector")
+            with span('train_anomaly.log_model'):
+                tracker.log_model(mlflow.sklearn, detector, "anomaly_detector")
+            log_spans_to_mlflow(spans, tracker=tracker)
+            budget.log_report()
+            budget.log_to_mlflow(tracker=tracker)
             
             logger.info("Model training completed successfully")
             return detector
             
     except Exception as e:
         logger.error(f"Error during model training: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        budget.cleanup()
\ No newline at end of file
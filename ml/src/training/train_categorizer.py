@@ -0,0 +1,347 @@
+import os
+import time
+import hashlib
+import numpy as np
+import torch
+from torch.utils.data import DataLoader, Dataset, Sampler
+from sklearn.model_selection import train_test_split
+import mlflow
+import logging
+from typing import List, Tuple, Union
+from ..models import TransactionCategorizer
+from ..data import TransactionSource, load_transactions
+from ..instrumentation import collect_spans, log_spans_to_mlflow, span
+from .tracking import AsyncRunLogger
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+TOKENIZE_BATCH_SIZE = 10000
+
+def build_token_cache(
+    texts: List[str],
+    tokenizer,
+    max_length: int,
+    cache_dir: str
+) -> Tuple[str, str]:
+    """
+    Tokenize a corpus once into a memory-mappable token cache.
+
+    Token ids of all texts are stored back to back, unpadded, in one int32
+    file with a separate offsets file. The cache is keyed on the texts,
+    tokenizer vocabulary and max_length, so later runs reuse it.
+
+    Args:
+        texts: Texts to tokenize
+        tokenizer: Fast tokenizer
+        max_length: Truncation length
+        cache_dir: Directory for cache files
+
+    Returns:
+        Tuple of (tokens path, offsets path)
+    """
+    digest = hashlib.sha1()
+    digest.update(f"{tokenizer.name_or_path}|{len(tokenizer)}|{max_length}".encode())
+    for text in texts:
+        digest.update(text.encode())
+        digest.update(b'\0')
+    key = digest.hexdigest()[:16]
+
+    tokens_path = os.path.join(cache_dir, f"tokens_{key}.int32")
+    offsets_path = os.path.join(cache_dir, f"offsets_{key}.npy")
+    if os.path.exists(tokens_path) and os.path.exists(offsets_path):
+        logger.info(f"Reusing token cache {tokens_path}")
+        return tokens_path, offsets_path
+
+    os.makedirs(cache_dir, exist_ok=True)
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    position = 0
+    with open(f"{tokens_path}.tmp", 'wb') as f:
+        for start in range(0, len(texts), TOKENIZE_BATCH_SIZE):
+            batch = texts[start:start + TOKENIZE_BATCH_SIZE]
+            encoded = tokenizer(batch, truncation=True, max_length=max_length)['input_ids']
+            for i, ids in enumerate(encoded):
+                np.asarray(ids, dtype=np.int32).tofile(f)
+                position += len(ids)
+                offsets[start + i + 1] = position
+
+    np.save(offsets_path, offsets)
+    # Publish the token file last so an interrupted build is never reused
+    os.replace(f"{tokens_path}.tmp", tokens_path)
+    logger.info(f"Token cache written: {len(texts)} texts, {position} tokens")
+    return tokens_path, offsets_path
+
+class TokenCacheDataset(Dataset):
+    """Dataset over a token cache. The memmap is opened lazily per worker."""
+
+    def __init__(self, tokens_path: str, offsets: np.ndarray, indices: np.ndarray, labels: np.ndarray):
+        self.tokens_path = tokens_path
+        self.offsets = offsets
+        self.indices = indices
+        self.labels = labels
+        self._tokens = None
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, i):
+        if self._tokens is None:
+            self._tokens = np.memmap(self.tokens_path, dtype=np.int32, mode='r')
+        index = self.indices[i]
+        ids = self._tokens[self.offsets[index]:self.offsets[index + 1]]
+        return np.array(ids), self.labels[i]
+
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)[self.indices]
+
+class LengthBucketBatchSampler(Sampler):
+    """
+    Batches samples of similar length so dynamic padding adds few tokens.
+
+    Samples are shuffled, split into buckets of `bucket_batches` batches,
+    sorted by length inside each bucket and cut into batches, and the batch
+    order is shuffled again. Batches stay random across epochs while each
+    one holds samples of near-equal length.
+    """
+
+    def __init__(self, lengths: np.ndarray, batch_size: int, bucket_batches: int = 50, seed: int = 42):
+        self.lengths = lengths
+        self.batch_size = batch_size
+        self.bucket_size = batch_size * bucket_batches
+        self.seed = seed
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def __iter__(self):
+        rng = np.random.default_rng(self.seed + self.epoch)
+        order = rng.permutation(len(self.lengths))
+        batches = []
+        for start in range(0, len(order), self.bucket_size):
+            bucket = order[start:start + self.bucket_size]
+            bucket = bucket[np.argsort(self.lengths[bucket], kind='stable')]
+            batches.extend(
+                bucket[i:i + self.batch_size].tolist()
+                for i in range(0, len(bucket), self.batch_size)
+            )
+        for i in rng.permutation(len(batches)):
+            yield batches[i]
+
+    def __len__(self):
+        return (len(self.lengths) + self.batch_size - 1) // self.batch_size
+
+class DynamicPaddingCollator:
+    """Pads each batch only to its own longest sequence."""
+
+    def __init__(self, pad_token_id: int):
+        self.pad_token_id = pad_token_id
+
+    def __call__(self, batch):
+        max_length = max(len(ids) for ids, _ in batch)
+        input_ids = np.full((len(batch), max_length), self.pad_token_id, dtype=np.int64)
+        attention_mask = np.zeros((len(batch), max_length), dtype=np.int64)
+        for row, (ids, _) in enumerate(batch):
+            input_ids[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+        labels = np.array([label for _, label in batch], dtype=np.int64)
+        return (
+            torch.from_numpy(input_ids),
+            torch.from_numpy(attention_mask),
+            torch.from_numpy(labels)
+        )
+
+def accumulation_group_size(step: int, n_steps: int, accumulation_steps: int) -> int:
+    """
+    Number of micro-batches in the accumulation group holding `step`.
+    
+    Losses are divided by this, so every optimizer step applies the mean
+    gradient of its own micro-batches, including a shorter last group.
+    
+    Args:
+        step: Index of the micro-batch in the epoch
+        n_steps: Micro-batches in the epoch
+        accumulation_steps: Micro-batches per optimizer step
+    
+    Returns:
+        int: Size of the step's group
+    """
+    full_groups_end = n_steps - n_steps % accumulation_steps
+    return accumulation_steps if step < full_groups_end else n_steps - full_groups_end
+
+def train_categorization_model(
+    data_path: Union[str, TransactionSource],
+    model_save_path: str,
+    params: dict = None
+) -> TransactionCategorizer:
+    """
+    Train a transaction categorization model.
+
+    Args:
+        data_path: Path to training data CSV, a TransactionSource, or the
+            loaded transactions
+        model_save_path: Directory to save the trained model artifact
+        params: Training parameters
+
+    Returns:
+        Trained TransactionCategorizer model
+    """
+    if params is None:
+        params = {
+            'batch_size': 32,
+            'epochs': 10,
+            'learning_rate': 2e-5,
+            'max_length': 128,
+            'train_size': 0.8,
+            'num_labels': None,
+            'dropout_rate': 0.1,
+            'gradient_accumulation_steps': 1,
+            'num_workers': 2,
+            'num_threads': None,
+            'bucket_batches': 50,
+            'token_cache_dir': '.cache/tokens',
+            'random_state': 42
+        }
+
+    try:
+        if params.get('num_threads'):
+            # Bound intra-op threads so DataLoader workers aren't starved
+            torch.set_num_threads(params['num_threads'])
+
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker, collect_spans() as spans:
+            tracker.log_params(params)
+
+            # Load data
+            logger.info("Loading data...")
+            with span('train_categorizer.load'):
+                df = load_transactions(data_path).dropna(subset=['description', 'category'])
+            texts = df['description'].astype(str).tolist()
+            categories = sorted(df['category'].astype(str).unique())
+            label_index = {category: i for i, category in enumerate(categories)}
+            labels = df['category'].astype(str).map(label_index).to_numpy(dtype=np.int64)
+
+            # Initialize model
+            logger.info("Initializing model...")
+            model = TransactionCategorizer(
+                params.get('num_labels') or len(categories),
+                max_length=params['max_length']
+            )
+            model.categories = categories
+
+            # Tokenize once into the cache
+            logger.info("Building token cache...")
+            with span('train_categorizer.tokenize', rows=len(texts)):
+                tokens_path, offsets_path = build_token_cache(
+                    texts, model.tokenizer, params['max_length'], params['token_cache_dir']
+                )
+            offsets = np.load(offsets_path)
+
+            train_idx, test_idx = train_test_split(
+                np.arange(len(texts)),
+                train_size=params['train_size'],
+                random_state=params['random_state'],
+                stratify=labels if min(np.bincount(labels)) > 1 else None
+            )
+            train_set = TokenCacheDataset(tokens_path, offsets, train_idx, labels[train_idx])
+            test_set = TokenCacheDataset(tokens_path, offsets, test_idx, labels[test_idx])
+
+            collate = DynamicPaddingCollator(model.tokenizer.pad_token_id)
+            sampler = LengthBucketBatchSampler(
+                train_set.lengths(), params['batch_size'], params['bucket_batches'],
+                seed=params['random_state']
+            )
+            train_loader = DataLoader(
+                train_set,
+                batch_sampler=sampler,
+                collate_fn=collate,
+                num_workers=params['num_workers'],
+                persistent_workers=params['num_workers'] > 0
+            )
+            test_loader = DataLoader(
+                test_set,
+                batch_sampler=LengthBucketBatchSampler(
+                    test_set.lengths(), params['batch_size'], params['bucket_batches'],
+                    seed=params['random_state']
+                ),
+                collate_fn=collate,
+                num_workers=params['num_workers']
+            )
+
+            optimizer = torch.optim.AdamW(model.parameters(), lr=params['learning_rate'])
+            loss_fn = torch.nn.CrossEntropyLoss()
+            accumulation_steps = params['gradient_accumulation_steps']
+
+            # Train model
+            logger.info("Training model...")
+            with span('train_categorizer.fit', rows=len(train_set) * params['epochs']):
+                for epoch in range(params['epochs']):
+                    sampler.set_epoch(epoch)
+                    model.train()
+                    epoch_start = time.perf_counter()
+                    total_loss = 0.0
+                    real_tokens = 0
+                    padded_tokens = 0
+
+                    optimizer.zero_grad()
+                    for step, (input_ids, attention_mask, batch_labels) in enumerate(train_loader):
+                        logits = model.forward_tokens(
+                            input_ids, attention_mask, dropout=params['dropout_rate']
+                        )
+                        group_size = accumulation_group_size(
+                            step, len(train_loader), accumulation_steps
+                        )
+                        loss = loss_fn(logits, batch_labels) / group_size
+                        loss.backward()
+                        total_loss += loss.item() * group_size
+                        real_tokens += int(attention_mask.sum())
+                        padded_tokens += attention_mask.numel()
+
+                        if (step + 1) % accumulation_steps == 0 or step + 1 == len(train_loader):
+                            optimizer.step()
+                            optimizer.zero_grad()
+
+                    epoch_seconds = time.perf_counter() - epoch_start
+                    epoch_metrics = {
+                        'train_loss': total_loss / len(train_loader),
+                        'epoch_seconds': epoch_seconds,
+                        'train_samples_per_second': len(train_set) / epoch_seconds,
+                        'padding_efficiency': real_tokens / padded_tokens
+                    }
+                    tracker.log_metrics(epoch_metrics, step=epoch)
+                    logger.info(
+                        f"Epoch {epoch + 1}/{params['epochs']}: "
+                        f"loss={epoch_metrics['train_loss']:.4f}, "
+                        f"{epoch_seconds:.1f}s, "
+                        f"{epoch_metrics['train_samples_per_second']:.0f} samples/s, "
+                        f"padding efficiency {epoch_metrics['padding_efficiency']:.1%}"
+                    )
+
+            # Evaluate model
+            logger.info("Evaluating model...")
+            model.train(False)
+            correct = 0
+            with span('train_categorizer.evaluate', rows=len(test_set)), torch.no_grad():
+                for input_ids, attention_mask, batch_labels in test_loader:
+                    predicted = model.forward_tokens(input_ids, attention_mask).argmax(dim=1)
+                    correct += int((predicted == batch_labels).sum())
+            metrics = {'test_accuracy': correct / len(test_set)}
+
+            # Log metrics
+            tracker.log_metrics(metrics)
+
+            # Save model artifact
+            with span('train_categorizer.save'):
+                model.save(model_save_path)
+
+            # Log model artifact with MLflow
+            with span('train_categorizer.log_model'):
+                tracker.log_artifacts(model_save_path, "categorizer")
+            log_spans_to_mlflow(spans, tracker=tracker)
+
+            logger.info("Model training completed successfully")
+            return model
+
+    except Exception as e:
+        logger.error(f"Error during model training: {str(e)}")
+        raise
@@ -0,0 +1,110 @@
+import os
+import pandas as pd
+import numpy as np
+from sklearn.model_selection import train_test_split
+import mlflow
+import mlflow.sklearn
+import logging
+from typing import Union
+from ..models.cascade_categorizer import LinearTextCategorizer
+from ..preprocessing import TextProcessor
+from ..data import TransactionSource, load_transactions
+from ..instrumentation import collect_spans, log_spans_to_mlflow, span
+from .tracking import AsyncRunLogger
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def train_first_tier_model(
+    data_path: Union[str, TransactionSource],
+    model_save_path: str,
+    params: dict = None
+) -> LinearTextCategorizer:
+    """
+    Train the first-tier linear categorizer of the categorization cascade.
+    
+    Args:
+        data_path: Path to training data CSV, or a TransactionSource
+        model_save_path: Path to save trained model
+        params: Training parameters
+    
+    Returns:
+        Trained LinearTextCategorizer model
+    """
+    if params is None:
+        params = {
+            'n_features': 2**18,
+            'ngram_min': 3,
+            'ngram_max': 5,
+            'alpha': 1e-5,
+            'train_size': 0.8,
+            'random_state': 42
+        }
+
+    try:
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker, collect_spans() as spans:
+            tracker.log_params(params)
+            
+            # Load data and normalize descriptions the same way serving does
+            logger.info("Loading and preprocessing data...")
+            with span('train_first_tier.load'):
+                df = load_transactions(data_path).dropna(subset=['description', 'category'])
+            with span('train_first_tier.preprocess', rows=len(df)):
+                text_processor = TextProcessor()
+                texts = df['description'].astype(str).apply(text_processor.preprocess)
+            
+            X_train, X_test, y_train, y_test = train_test_split(
+                texts,
+                df['category'].astype(str),
+                train_size=params['train_size'],
+                random_state=params['random_state']
+            )
+            
+            # Train model
+            logger.info("Training first-tier categorizer...")
+            model = LinearTextCategorizer(
+                n_features=params['n_features'],
+                ngram_range=(params['ngram_min'], params['ngram_max']),
+                alpha=params['alpha']
+            )
+            with span('train_first_tier.fit', rows=len(X_train)):
+                model.fit(X_train, y_train)
+            
+            # Evaluate model
+            logger.info("Evaluating model...")
+            with span('train_first_tier.evaluate', rows=len(X_test)):
+                probabilities = model.predict_proba(X_test)
+            predictions = model.classes_[probabilities.argmax(axis=1)]
+            confidence = probabilities.max(axis=1)
+            metrics = {
+                'test_accuracy': float(np.mean(predictions == y_test.values)),
+                'mean_confidence': float(confidence.mean())
+            }
+            for threshold in (0.8, 0.9, 0.95):
+                confident = confidence >= threshold
+                metrics[f'coverage_at_{threshold}'] = float(confident.mean())
+                if confident.any():
+                    metrics[f'accuracy_at_{threshold}'] = float(
+                        np.mean(predictions[confident] == y_test.values[confident])
+                    )
+            
+            # Log metrics
+            tracker.log_metrics(metrics)
+            
+            # Save model
+            with span('train_first_tier.save'):
+                os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+                model.save(model_save_path)
+            
+            # Log model with MLflow
+            with span('train_first_tier.log_model'):
+                tracker.log_model(mlflow.sklearn, model.model, "first_tier_categorizer")
+            log_spans_to_mlflow(spans, tracker=tracker)
+            
+            logger.info("Model training completed successfully")
+            return model
+            
+    except Exception as e:
+        logger.error(f"Error during model training: {str(e)}")
+        raise
@@ -1,12 +1,18 @@
 import os
+import json
 import pandas as pd
 import numpy as np
 import tensorflow as tf
 import mlflow
 import mlflow.tensorflow
 import logging
+from typing import Optional, Union
 from ..models import ExpenseForecaster
 from ..preprocessing import PreprocessingPipeline
+from ..data import TransactionSource, daily_expense_totals
+from ..instrumentation import collect_spans, log_spans_to_mlflow, span
+from .tracking import AsyncRunLogger
+from .memory import MemoryBudget
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -20,16 +26,109 @@ def create_sequences(data: np.ndarray, seq_length: int):
         ys.append(data[i + seq_length])
     return np.array(xs), np.array(ys)
 
+def new_window_mask(
+    target_dates: pd.DatetimeIndex,
+    targets: np.ndarray,
+    last_date: str,
+    last_total: Optional[float] = None
+) -> np.ndarray:
+    """
+    Mark the windows a fine-tune has not trained on.
+    
+    The checkpoint's last day was often still partial when it was saved,
+    so the window predicting it is new again once its total has changed.
+    Checkpoints without the saved total always count it as new.
+    
+    Args:
+        target_dates: Date each window predicts
+        targets: Total each window predicts
+        last_date: Last day of the data the checkpoint was trained on
+        last_total: Expense total of that day when the checkpoint was saved
+    
+    Returns:
+        np.ndarray: Boolean mask of the new windows
+    """
+    target_dates = pd.DatetimeIndex(target_dates)
+    last_date = pd.Timestamp(last_date)
+    new = np.asarray(target_dates > last_date)
+    last_day = np.asarray(target_dates == last_date)
+    if last_total is None:
+        return new | last_day
+    changed = ~np.isclose(np.asarray(targets, dtype=np.float64), last_total)
+    return new | (last_day & changed)
+
+def _optimizer_variables(optimizer) -> list:
+    # `variables` is a method on older Keras optimizers and a property on newer ones
+    variables = optimizer.variables
+    return variables() if callable(variables) else variables
+
+def save_checkpoint(model, optimizer, directory: str, state: dict) -> None:
+    """
+    Save model weights, optimizer state and training state for fine-tuning.
+    
+    Args:
+        model: Trained ExpenseForecaster
+        optimizer: Optimizer the model was trained with
+        directory: Checkpoint directory
+        state: JSON-serializable training state
+    """
+    os.makedirs(directory, exist_ok=True)
+    model.save_weights(os.path.join(directory, 'model.weights.h5'))
+    np.savez(
+        os.path.join(directory, 'optimizer.npz'),
+        *[variable.numpy() for variable in _optimizer_variables(optimizer)]
+    )
+    with open(os.path.join(directory, 'state.json'), 'w') as f:
+        json.dump(state, f, indent=2)
+
+def load_checkpoint_state(directory: str) -> Optional[dict]:
+    """Get the training state of a checkpoint, or None if there is none."""
+    path = os.path.join(directory, 'state.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+def restore_checkpoint(model, optimizer, directory: str, sample: np.ndarray) -> None:
+    """
+    Restore model weights and optimizer state saved by `save_checkpoint`.
+    
+    Args:
+        model: ExpenseForecaster built with the checkpoint's parameters
+        optimizer: Optimizer of the same type the checkpoint was saved with
+        directory: Checkpoint directory
+        sample: One input batch, used to create the model's variables
+    """
+    model(sample)
+    model.load_weights(os.path.join(directory, 'model.weights.h5'))
+    optimizer.build(model.trainable_variables)
+    with np.load(os.path.join(directory, 'optimizer.npz')) as saved:
+        values = [saved[f'arr_{i}'] for i in range(len(saved.files))]
+    variables = _optimizer_variables(optimizer)
+    if len(values) != len(variables):
+        raise ValueError("Checkpoint optimizer state doesn't match the optimizer")
+    for variable, value in zip(variables, values):
+        variable.assign(value)
+
 def train_forecasting_model(
-    data_path: str,
+    data_path: Union[str, TransactionSource],
     model_save_path: str,
     params: dict = None
 ) -> ExpenseForecaster:
     """
     Train an expense forecasting model.
     
+    Every run leaves a checkpoint with weights, optimizer state and the
+    last day trained on. With `fine_tune` set, a later run restores it and
+    trains only on windows ending after that day plus `replay_windows`
+    older ones, for at most `fine_tune_epochs` epochs validated on
+    `validation_windows` other older windows. If the restored model's loss
+    on the new windows exceeds `drift_threshold` times its last
+    validation loss, the data has drifted and a full retrain runs instead.
+    
     Args:
-        data_path: Path to training data
+        data_path: Path to training data CSV, a TransactionSource, or the
+            loaded transactions
         model_save_path: Path to save trained model
         params: Training parameters
     
@@ -44,91 +143,182 @@ def train_forecasting_model(
             'epochs': 100,
             'learning_rate': 0.001,
             'lstm_units': 64,
-            'dropout_rate': 0.2
+            'dropout_rate': 0.2,
+            'fine_tune': False,
+            'fine_tune_epochs': 5,
+            'fine_tune_patience': 1,
+            'replay_windows': 256,
+            'validation_windows': 64,
+            'drift_threshold': 2.0,
+            'random_state': 42,
+            'memory_budget_mb': None,
+            'spill_dir': None
         }
 
+    budget = MemoryBudget(params.get('memory_budget_mb'), params.get('spill_dir'))
+    checkpoint_dir = f"{model_save_path}_checkpoint"
     try:
-        with mlflow.start_run():
-            mlflow.log_params(params)
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker, collect_spans() as spans:
+            tracker.log_params(params)
             
             # Load and preprocess data
             logger.info("Loading and preprocessing data...")
-            df = pd.read_csv(data_path)
-            
-            # Prepare time series data
-            df['date'] = pd.to_datetime(df['date'])
-            daily_expenses = df.groupby('date')['amount'].sum().resample('D').sum().fillna(0)
-            
-            # Create sequences
-            X, y = create_sequences(daily_expenses.values, params['sequence_length'])
-            
-            # Split data
-            train_size = int(len(X) * params['train_size'])
-            X_train, X_test = X[:train_size], X[train_size:]
-            y_train, y_test = y[:train_size], y[train_size:]
-            
-            # Initialize model
-            logger.info("Initializing model...")
-            model = ExpenseForecaster(
-                sequence_length=params['sequence_length'],
-                lstm_units=params['lstm_units'],
-                dropout_rate=params['dropout_rate']
-            )
-            
-            # Compile model
-            optimizer = tf.keras.optimizers.Adam(learning_rate=params['learning_rate'])
-            model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
-            
-            # Create callbacks
-            callbacks = [
-                tf.keras.callbacks.EarlyStopping(
-                    monitor='val_loss',
-                    patience=10,
-                    restore_best_weights=True
-                ),
-                tf.keras.callbacks.ReduceLROnPlateau(
-                    monitor='val_loss',
-                    factor=0.5,
-                    patience=5
+            with span('train_forecaster.load'), budget.stage('load'):
+                # Only the daily totals are needed, so database sources are
+                # aggregated chunk by chunk rather than loaded whole
+                daily_expenses = daily_expense_totals(data_path)
+            
+            with span('train_forecaster.preprocess', days=len(daily_expenses)), budget.stage('preprocess'):
+                # Create sequences, with the LSTM's feature axis
+                X, y = create_sequences(daily_expenses.values, params['sequence_length'])
+                X = X[..., np.newaxis].astype(np.float32)
+                y = y.astype(np.float32)
+                # Date each window predicts
+                target_dates = daily_expenses.index[params['sequence_length']:]
+            
+            model_params = {
+                'sequence_length': params['sequence_length'],
+                'lstm_units': params['lstm_units'],
+                'dropout_rate': params['dropout_rate']
+            }
+            
+            def build():
+                model = ExpenseForecaster(**model_params)
+                optimizer = tf.keras.optimizers.Adam(learning_rate=params['learning_rate'])
+                model.compile(optimizer=optimizer, loss='mse', metrics=['mae'])
+                return model, optimizer
+            
+            # Restore the last checkpoint when fine-tuning
+            fine_tune = False
+            drift_ratio = None
+            state = load_checkpoint_state(checkpoint_dir) if params.get('fine_tune') else None
+            if state is not None and state['model_params'] != model_params:
+                logger.info("Model parameters changed since the checkpoint, retraining from scratch")
+                state = None
+            if state is not None:
+                new = new_window_mask(
+                    target_dates, y, state['last_date'], state.get('last_total')
                 )
-            ]
+                model, optimizer = build()
+                with span('train_forecaster.restore'):
+                    restore_checkpoint(model, optimizer, checkpoint_dir, X[:1])
+                if not new.any():
+                    logger.info(f"No new data since {state['last_date']}, nothing to fine-tune")
+                    return model
+            
+                # Drift guard
+                new_loss = model.evaluate(X[new], y[new], verbose=0)[0]
+                drift_ratio = new_loss / max(state['val_loss'], 1e-12)
+                if drift_ratio > params['drift_threshold']:
+                    logger.warning(
+                        f"Loss on new data is {drift_ratio:.1f}x the last validation loss, "
+                        f"falling back to a full retrain"
+                    )
+                elif new.all():
+                    logger.info("No older windows to replay or validate on, retraining from scratch")
+                else:
+                    fine_tune = True
+            
+            if fine_tune:
+                # New windows plus a replay sample of older ones, validated on
+                # a separate sample of older windows
+                logger.info(f"Fine-tuning on {int(new.sum())} new windows...")
+                rng = np.random.default_rng(params.get('random_state', 42))
+                older = rng.permutation(np.flatnonzero(~new))
+                validation = older[:params['validation_windows']]
+                replay = older[len(validation):len(validation) + params['replay_windows']]
+                train = np.concatenate([np.flatnonzero(new), replay])
+                X_train, y_train = X[train], y[train]
+                X_test, y_test = X[validation], y[validation]
+                epochs = params['fine_tune_epochs']
+                callbacks = [
+                    tf.keras.callbacks.EarlyStopping(
+                        monitor='val_loss',
+                        patience=params['fine_tune_patience'],
+                        restore_best_weights=True
+                    )
+                ]
+            else:
+                # Split data
+                train_size = int(len(X) * params['train_size'])
+                X_train, X_test = X[:train_size], X[train_size:]
+                y_train, y_test = y[:train_size], y[train_size:]
+                epochs = params['epochs']
+            
+                # Initialize model
+                logger.info("Initializing model...")
+                model, optimizer = build()
+            
+                # Create callbacks
+                callbacks = [
+                    tf.keras.callbacks.EarlyStopping(
+                        monitor='val_loss',
+                        patience=10,
+                        restore_best_weights=True
+                    ),
+                    tf.keras.callbacks.ReduceLROnPlateau(
+                        monitor='val_loss',
+                        factor=0.5,
+                        patience=5
+                    )
+                ]
             
             # Train model
             logger.info("Training model...")
-            history = model.fit(
-                X_train, y_train,
-                validation_data=(X_test, y_test),
-                epochs=params['epochs'],
-                batch_size=params['batch_size'],
-                callbacks=callbacks,
-                verbose=1
-            )
+            with span('train_forecaster.fit', rows=len(X_train)), budget.stage('fit'):
+                history = model.fit(
+                    X_train, y_train,
+                    validation_data=(X_test, y_test),
+                    epochs=epochs,
+                    batch_size=params['batch_size'],
+                    callbacks=callbacks,
+                    verbose=1
+                )
             
             # Evaluate model
             logger.info("Evaluating model...")
-            evaluation = model.evaluate(X_test, y_test, verbose=0)
+            with span('train_forecaster.evaluate', rows=len(X_test)), budget.stage('evaluate'):
+                evaluation = model.evaluate(X_test, y_test, verbose=0)
             metrics = {
                 'test_loss': evaluation[0],
-                'test_mae': evaluation[1]
+                'test_mae': evaluation[1],
+                'fine_tuned': float(fine_tune)
             }
+            if drift_ratio is not None:
+                metrics['drift_ratio'] = drift_ratio
             
             # Log metrics
-            mlflow.log_metrics(metrics)
+            tracker.log_metrics(metrics)
+            
+            with span('train_forecaster.save'):
+                # Save training history
+                history_df = pd.DataFrame(history.history)
+                history_df.to_csv(f"{model_save_path}_history.csv")
             
-            # Save training history
-            history_df = pd.DataFrame(history.history)
-            history_df.to_csv(f"{model_save_path}_history.csv")
+                # Save model
+                os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+                model.save(model_save_path)
             
-            # Save model
-            os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
-            model.save(model_save_path)
+                # Save the checkpoint the next fine-tune starts from
+                save_checkpoint(model, optimizer, checkpoint_dir, {
+                    'last_date': str(daily_expenses.index[-1].date()),
+                    'last_total': float(daily_expenses.iloc[-1]),
+                    'val_loss': float(evaluation[0]),
+                    'model_params': model_params
+                })
             
             # Log model with MLflow
-            mlflow.tensorflow.log_model(model, "forecaster")
+            with span('train_forecaster.log_model'):
+                tracker.log_model(mlflow.tensorflow, model, "forecaster")
+            log_spans_to_mlflow(spans, tracker=tracker)
+            budget.log_report()
+            budget.log_to_mlflow(tracker=tracker)
             
             logger.info("Model training completed successfully")
             return model
             
     except Exception as e:
         logger.error(f"Error during model training: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        budget.cleanup()
@@ -1,29 +1,39 @@
 import os
 import pandas as pd
 import numpy as np
+import joblib
 from sklearn.preprocessing import StandardScaler
 import mlflow
 import mlflow.sklearn
 import logging
-from ..models import PatternAnalyzer
+from typing import Optional, Tuple, Union
+from ..models import PatternAnalyzer, save_bundle
 from ..preprocessing import PreprocessingPipeline
+from ..data import TransactionSource, load_transactions
+from ..instrumentation import collect_spans, log_spans_to_mlflow, span
+from .tracking import AsyncRunLogger
+from .memory import MemoryBudget
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 def train_pattern_model(
-    data_path: str,
+    data_path: Union[str, TransactionSource],
     model_save_path: str,
-    params: dict = None
+    params: dict = None,
+    preprocessed: Optional[Tuple[PreprocessingPipeline, pd.DataFrame]] = None
 ) -> PatternAnalyzer:
     """
     Train a pattern analysis model for transaction patterns.
     
     Args:
-        data_path: Path to training data
+        data_path: Path to training data CSV, a TransactionSource, or the
+            loaded transactions
         model_save_path: Path to save trained model
         params: Training parameters
+        preprocessed: Pipeline already fitted on the data and its
+            features, as shared by the retrain orchestrator
     
     Returns:
         Trained PatternAnalyzer model
@@ -34,22 +44,35 @@ def train_pattern_model(
             'min_samples': 5,
             'algorithm': 'auto',
             'leaf_size': 30,
-            'n_jobs': -1
+            'n_jobs': -1,
+            'memory_budget_mb': None,
+            'spill_dir': None
         }
 
+    budget = MemoryBudget(params.get('memory_budget_mb'), params.get('spill_dir'))
     try:
-        with mlflow.start_run():
-            mlflow.log_params(params)
+        with mlflow.start_run() as run, AsyncRunLogger(run.info.run_id) as tracker, collect_spans() as spans:
+            tracker.log_params(params)
             
             # Load and preprocess data
             logger.info("Loading and preprocessing data...")
-            df = pd.read_csv(data_path)
-            pipeline = PreprocessingPipeline()
-            features = pipeline.fit_transform(df)
+            with span('train_patterns.load'), budget.stage('load'):
+                df = load_transactions(data_path)
+            with span('train_patterns.preprocess', rows=len(df)), budget.stage('preprocess'):
+                if preprocessed is not None:
+                    pipeline, features = preprocessed
+                else:
+                    pipeline = PreprocessingPipeline()
+                    features = pipeline.fit_transform(df)
+                # The raw frame is not needed past preprocessing
+                del df
+                features = budget.spill('features', features)
             
-            # Scale features
-            scaler = StandardScaler()
-            scaled_features = scaler.fit_transform(features)
+                # Scale features
+                scaler = StandardScaler()
+                scaled_features = scaler.fit_transform(features)
+                n_rows = len(features)
+                del features
             
             # Initialize and train model
             logger.info("Training pattern analyzer...")
@@ -62,37 +85,51 @@ def train_pattern_model(
             )
             
             # Find patterns
-            patterns = analyzer.find_patterns(scaled_features)
+            with span('train_patterns.fit', rows=n_rows), budget.stage('fit'):
+                patterns = analyzer.find_patterns(scaled_features)
             
             # Calculate metrics
             metrics = {
                 'n_patterns': len(patterns),
                 'avg_pattern_size': np.mean([p['size'] for p in patterns]),
                 'max_pattern_size': np.max([p['size'] for p in patterns]),
-                'pattern_coverage': sum(p['size'] for p in patterns) / len(features)
+                'pattern_coverage': sum(p['size'] for p in patterns) / n_rows
             }
             
             # Log metrics
-            mlflow.log_metrics(metrics)
+            tracker.log_metrics(metrics)
             
-            # Save pattern analysis
-            pattern_df = pd.DataFrame(patterns)
-            pattern_df.to_csv(f"{model_save_path}_patterns.csv")
+            with span('train_patterns.save'):
+                # Save pattern analysis
+                pattern_df = pd.DataFrame(patterns)
+                pattern_df.to_csv(f"{model_save_path}_patterns.csv")
             
-            # Save model and preprocessing components
-            os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
-            analyzer.save(model_save_path)
-            pipeline.save_feature_stats(f"{model_save_path}_pipeline.pkl")
+                # Save model and preprocessing components
+                os.makedirs(os.path.dirname(model_save_path), exist_ok=True)
+                analyzer.save(model_save_path)
+                pipeline.save_feature_stats(f"{model_save_path}_pipeline.pkl")
             
-            # Save scaler
-            joblib.dump(scaler, f"{model_save_path}_scaler.pkl")
+                # Save scaler
+                joblib.dump(scaler, f"{model_save_path}_scaler.pkl")
+            
+                # Save everything needed to serve as a single bundle
+                save_bundle(
+                    f"{model_save_path}.bundle", analyzer, pipeline, scaler,
+                    patterns=patterns, metadata={'params': params}
+                )
             
             # Log model with MLflow
-            mlflow.sklearn.log_model(analyzer, "pattern_analyzer")
+            with span('train_patterns.log_model'):
+                tracker.log_model(mlflow.sklearn, analyzer, "pattern_analyzer")
+            log_spans_to_mlflow(spans, tracker=tracker)
+            budget.log_report()
+            budget.log_to_mlflow(tracker=tracker)
             
             logger.info("Model training completed successfully")
             return analyzer
             
     except Exception as e:
         logger.error(f"Error during model training: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+    finally:
+        budget.cleanup()
\ No newline at end of file
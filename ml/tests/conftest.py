@@ -0,0 +1,23 @@
+import re
+import pytest
+
+
+class StubTextProcessor:
+    """TextProcessor without the NLTK corpora downloads."""
+
+    def preprocess(self, text):
+        return ' '.join(re.sub(r'[^a-zA-Z\s]', '', text.lower()).split())
+
+
+@pytest.fixture
+def stub_text_processor(monkeypatch):
+    # Pipelines built while the fixture is active use the stub
+    monkeypatch.setattr('src.preprocessing.TextProcessor', StubTextProcessor)
+    return StubTextProcessor
+
+
+@pytest.fixture
+def transactions():
+    from src.data import SyntheticTransactionGenerator
+
+    return SyntheticTransactionGenerator(n_users=50, n_merchants=50, seed=1).generate(400)
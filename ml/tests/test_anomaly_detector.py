@@ -0,0 +1,91 @@
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest
+from src.models import AnomalyDetector
+
+
+@pytest.fixture
+def windows():
+    rng = np.random.default_rng(0)
+    columns = [f"f{i}" for i in range(4)]
+    return [pd.DataFrame(rng.normal(size=(n, 4)), columns=columns) for n in (300, 150, 200)]
+
+
+@pytest.fixture
+def detector(windows):
+    detector = AnomalyDetector(n_estimators=20, max_samples=64, trees_per_window=5)
+    detector.fit(windows[0], start='2024-01', end='2024-02')
+    return detector
+
+
+def test_update_adds_trees_and_retires_the_oldest(detector, windows):
+    first_trees = detector.model.estimators_[5:]
+    detector.update(windows[1], start='2024-02', end='2024-03')
+    detector.update(windows[2], start='2024-03', end='2024-04')
+
+    model = detector.model
+    assert len(model.estimators_) == 20
+    assert model.estimators_[:10] == first_trees[5:]
+    assert detector.tree_windows == [0] * 10 + [1] * 5 + [2] * 5
+    assert [window['id'] for window in detector.windows] == [0, 1, 2]
+    assert detector.windows[2]['rows'] == 200
+    # Every tree keeps the samples it was fitted with
+    assert model.max_samples_ == 64
+
+    for attribute in ('estimators_features_', '_average_path_length_per_tree',
+                      '_decision_path_lengths', '_seeds'):
+        assert len(getattr(model, attribute)) == 20, attribute
+    samples = model.estimators_samples_
+    assert len(samples) == 20
+    assert all(len(indices) == 64 and indices.max() < 200 for indices in samples[-5:])
+
+
+def test_retiring_a_whole_window_forgets_it(windows):
+    detector = AnomalyDetector(n_estimators=10, max_samples=64, trees_per_window=10)
+    detector.fit(windows[0])
+    detector.update(windows[1])
+
+    assert detector.tree_windows == [1] * 10
+    assert [window['id'] for window in detector.windows] == [1]
+    assert len(detector.model._seeds) == 10
+
+
+def test_update_rejects_small_windows(detector, windows):
+    with pytest.raises(ValueError):
+        detector.update(windows[1].iloc[:10])
+
+
+def test_update_aligns_columns(detector, windows):
+    X = windows[1].drop(columns='f3').assign(extra=1.0)
+    detector.update(X)
+
+    assert detector.score_samples(X).shape == (len(X),)
+
+
+def test_save_and_load(detector, windows, tmp_path):
+    detector.update(windows[1], start='2024-02')
+    path = tmp_path / 'detector.joblib'
+    detector.save(path)
+
+    loaded = AnomalyDetector.load(path)
+    np.testing.assert_array_equal(loaded.score_samples(windows[2]), detector.score_samples(windows[2]))
+    assert loaded.tree_windows == detector.tree_windows
+    assert loaded.windows == detector.windows
+    assert loaded.max_estimators == 20
+    assert loaded.trees_per_window == 5
+
+    # A loaded detector keeps updating
+    loaded.update(windows[2])
+    assert len(loaded.model.estimators_) == len(loaded.model._seeds) == 20
+
+
+def test_load_bare_forest(windows, tmp_path):
+    forest = IsolationForest(n_estimators=10, random_state=0).fit(windows[0])
+    path = tmp_path / 'forest.joblib'
+    joblib.dump(forest, path)
+
+    loaded = AnomalyDetector.load(path)
+    assert loaded.max_estimators == 10
+    assert loaded.tree_windows == [None] * 10
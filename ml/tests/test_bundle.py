@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.preprocessing import StandardScaler
+from src.models import AnomalyDetector
+from src.models.bundle import BundleError, load_bundle, save_bundle
+from src.preprocessing import PreprocessingPipeline
+
+
+@pytest.fixture
+def features():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.normal(size=(600, 6)), columns=[f"f{i}" for i in range(6)])
+
+
+def round_trip(detector, tmp_path, **kwargs):
+    path = tmp_path / 'model.bundle'
+    save_bundle(str(path), detector, **kwargs)
+    return path, load_bundle(str(path))
+
+
+def assert_same_scores(detector, loaded, X):
+    np.testing.assert_allclose(loaded.score_samples(X), detector.score_samples(X), rtol=1e-12)
+    np.testing.assert_array_equal(loaded.predict(X), detector.predict(X))
+
+
+@pytest.mark.parametrize('max_features', [1.0, 0.5])
+def test_scores_match_after_update(features, tmp_path, max_features):
+    detector = AnomalyDetector(n_estimators=20, max_samples=64, trees_per_window=5)
+    detector.model.set_params(max_features=max_features)
+    detector.fit(features.iloc[:300], start='w0')
+    # Two updates retire the oldest trees past max_estimators
+    detector.update(features.iloc[300:450], start='w1')
+    detector.update(features.iloc[450:], start='w2')
+    assert len(detector.model.estimators_) == 20
+
+    _, bundle = round_trip(detector, tmp_path)
+
+    assert_same_scores(detector, bundle.model, features)
+    assert bundle.model.tree_windows == detector.tree_windows
+    assert bundle.model.windows == detector.windows
+    assert bundle.model.feature_names == detector.feature_names
+
+
+def test_scores_match_with_missing_values(features, tmp_path):
+    X = features.copy()
+    X.iloc[::7, 1] = np.nan
+    X.iloc[::11, 4] = np.nan
+    detector = AnomalyDetector(n_estimators=20, max_samples=64).fit(X)
+
+    _, bundle = round_trip(detector, tmp_path)
+
+    assert_same_scores(detector, bundle.model, X)
+
+
+def test_pipeline_and_scaler_round_trip(stub_text_processor, features, tmp_path):
+    from src.data import SyntheticTransactionGenerator
+
+    transactions = SyntheticTransactionGenerator(n_users=50, n_merchants=50, seed=1).generate(300)
+    pipeline = PreprocessingPipeline().fit(transactions)
+    scaler = StandardScaler().fit(features)
+    detector = AnomalyDetector(n_estimators=10, max_samples=64).fit(features)
+
+    _, bundle = round_trip(detector, tmp_path, pipeline=pipeline, scaler=scaler)
+
+    assert bundle.pipeline.feature_stats == pipeline.feature_stats
+    for col, table in pipeline.stats.categorical.items():
+        assert bundle.pipeline.stats.categorical[col].overflow == table.overflow
+    np.testing.assert_array_equal(bundle.scaler.transform(features), scaler.transform(features))
+
+
+def test_truncated_bundle_is_rejected(features, tmp_path):
+    path, _ = round_trip(AnomalyDetector(n_estimators=5).fit(features), tmp_path)
+    data = path.read_bytes()
+    path.write_bytes(data[:len(data) - 100])
+
+    with pytest.raises(BundleError, match='truncated'):
+        load_bundle(str(path))
+
+
+def test_corrupted_bundle_is_rejected(features, tmp_path):
+    path, _ = round_trip(AnomalyDetector(n_estimators=5).fit(features), tmp_path)
+    data = bytearray(path.read_bytes())
+    data[-1] ^= 0xFF
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(BundleError, match='corrupted'):
+        load_bundle(str(path))
+    # Skipping verification still opens it
+    load_bundle(str(path), verify=False)
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'model.bundle'
+    path.write_bytes(b'not a bundle at all, just some bytes')
+
+    with pytest.raises(BundleError):
+        load_bundle(str(path))
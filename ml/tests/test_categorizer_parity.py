@@ -0,0 +1,80 @@
+import copy
+import numpy as np
+import pandas as pd
+import pytest
+
+torch = pytest.importorskip('torch')
+pytest.importorskip('transformers')
+
+from transformers import DistilBertConfig, DistilBertModel, DistilBertTokenizerFast
+from src.models.transaction_categorizer import OnnxTransactionCategorizer, TransactionCategorizer
+from src.training.evaluate import evaluate_categorizer, evaluate_categorizer_parity
+
+WORDS = ['netflix', 'uber', 'shell', 'grocery', 'store', 'ride', 'gas', 'movie']
+CATEGORIES = ['Entertainment', 'Gas', 'Groceries', 'Transport']
+
+
+@pytest.fixture
+def categorizer(tmp_path):
+    vocab = tmp_path / 'vocab.txt'
+    vocab.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + WORDS))
+    tokenizer = DistilBertTokenizerFast(vocab_file=str(vocab))
+    torch.manual_seed(0)
+    bert = DistilBertModel(DistilBertConfig(
+        vocab_size=len(WORDS) + 5, dim=32, n_layers=1, n_heads=2,
+        hidden_dim=64, max_position_embeddings=32
+    ))
+    model = TransactionCategorizer(len(CATEGORIES), max_length=16, tokenizer=tokenizer, bert=bert)
+    model.categories = CATEGORIES
+    model.bert.eval()
+    return model
+
+
+@pytest.fixture
+def test_data():
+    return pd.DataFrame({
+        'description': ['netflix movie', 'uber ride', 'shell gas', 'grocery store'] * 5,
+        'category': ['Entertainment', 'Transport', 'Gas', 'Groceries'] * 5
+    })
+
+
+def test_predictions_are_scored_as_category_names(categorizer, test_data):
+    report = evaluate_categorizer(categorizer, test_data)['classification_report']
+
+    assert set(report) - {'accuracy', 'macro avg', 'weighted avg'} <= set(CATEGORIES)
+
+
+def test_int8_parity(categorizer, test_data):
+    quantized = copy.deepcopy(categorizer).quantize()
+
+    result = evaluate_categorizer_parity(categorizer, quantized, test_data, max_accuracy_drop=1.0)
+
+    assert 0.0 <= result['candidate_accuracy'] <= 1.0
+    assert 0.0 <= result['prediction_agreement'] <= 1.0
+    assert result['passed']
+
+
+def test_onnx_parity(categorizer, test_data, tmp_path):
+    pytest.importorskip('onnx')
+    pytest.importorskip('onnxruntime')
+    categorizer.export_onnx(str(tmp_path / 'onnx'), quantize=False)
+    candidate = OnnxTransactionCategorizer(str(tmp_path / 'onnx'), max_length=16)
+
+    assert candidate.categories == CATEGORIES
+    result = evaluate_categorizer_parity(categorizer, candidate, test_data)
+
+    # The unquantized graph computes the same logits
+    assert result['prediction_agreement'] == 1.0
+    assert result['candidate_accuracy'] == result['reference_accuracy']
+    assert result['passed']
+
+
+def test_sub_batches_match_one_pass(categorizer, test_data):
+    texts = list(test_data['description'])
+
+    one_pass = categorizer.predict_proba(texts, batch_size=len(texts))
+    batched = categorizer.predict_proba(texts, batch_size=3)
+
+    np.testing.assert_allclose(batched, one_pass, atol=1e-5)
+    np.testing.assert_array_equal(categorizer.predict(texts, batch_size=3), one_pass.argmax(axis=1))
+    assert categorizer.predict_proba([]).shape == (0, len(CATEGORIES))
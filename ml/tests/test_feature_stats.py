@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.preprocessing import CountTable, FeatureStats, PreprocessingPipeline, RunningMoments
+
+
+@pytest.fixture
+def frame():
+    # Amounts in a narrow band with no duplicates or gaps, so cleaning
+    # drops nothing and per-chunk cleaning equals cleaning the whole frame
+    rng = np.random.default_rng(0)
+    n = 300
+    return pd.DataFrame({
+        'user_id': rng.integers(0, 20, n).astype(str),
+        'amount': rng.uniform(10, 20, n).round(2),
+        'description': [f"merchant {i}" for i in rng.integers(0, 30, n)],
+        'category': rng.choice(['Food', 'Travel', 'Bills', 'Fun'], n),
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h')
+    })
+
+
+def assert_stats_equal(actual, expected):
+    assert actual['categorical'] == expected['categorical']
+    for col, summary in expected['numerical'].items():
+        assert actual['numerical'][col] == pytest.approx(summary)
+
+
+def test_partial_fit_over_chunks_equals_fit(stub_text_processor, frame):
+    expected = PreprocessingPipeline().fit(frame).feature_stats
+
+    pipeline = PreprocessingPipeline()
+    for start in range(0, len(frame), 70):
+        pipeline.partial_fit(frame.iloc[start:start + 70])
+
+    assert pipeline.is_fitted
+    assert_stats_equal(pipeline.feature_stats, expected)
+
+
+def test_merge_over_shards_equals_fit(stub_text_processor, frame):
+    expected = PreprocessingPipeline().fit(frame).feature_stats
+
+    shards = [frame.iloc[i::3] for i in range(3)]
+    merged = PreprocessingPipeline()
+    for shard in shards:
+        merged.merge(PreprocessingPipeline().fit(shard))
+
+    assert_stats_equal(merged.feature_stats, expected)
+
+
+def test_running_moments_match_pandas():
+    values = pd.Series([3.0, np.nan, 1.5, 8.0, 2.25, np.nan, 4.0])
+    moments = RunningMoments().update(values[:3]).merge(RunningMoments().update(values[3:]))
+
+    assert moments.count == 5
+    assert moments.to_dict() == pytest.approx({
+        'mean': values.mean(), 'std': values.std(), 'min': values.min(), 'max': values.max()
+    })
+
+
+def test_count_table_overflow():
+    table = CountTable(max_entries=2).update(pd.Series(list('aaaabbbccd')))
+
+    # The rarest values are folded into the overflow and nothing is lost
+    assert table.to_dict() == {'a': 4, 'b': 3}
+    assert table.overflow == 3
+
+    other = CountTable(max_entries=2).update(pd.Series(list('ccccce')))
+    table.merge(other)
+    assert table.to_dict() == {'c': 5, 'a': 4}
+    assert table.overflow == 3 + 1 + 3
+    assert sum(table.counts.values()) + table.overflow == 16
+
+
+def test_count_table_is_exact_within_bound():
+    values = pd.Series(list('abcabca'))
+    table = CountTable(max_entries=3).update(values[:4]).update(values[4:])
+
+    assert table.to_dict() == values.value_counts().to_dict()
+    assert table.overflow == 0
+
+
+def test_save_and_load_round_trip(stub_text_processor, frame, tmp_path):
+    pipeline = PreprocessingPipeline().fit(frame.iloc[:200])
+    path = tmp_path / 'stats.pkl'
+    pipeline.save_feature_stats(path)
+
+    loaded = PreprocessingPipeline()
+    loaded.load_feature_stats(path)
+    assert loaded.is_fitted
+    assert isinstance(loaded.stats, FeatureStats)
+    assert loaded.feature_stats == pipeline.feature_stats
+
+    # Loaded accumulators can still be updated
+    loaded.partial_fit(frame.iloc[200:])
+    assert_stats_equal(loaded.feature_stats, PreprocessingPipeline().fit(frame).feature_stats)
+
+
+def test_load_legacy_stats(stub_text_processor, frame, tmp_path):
+    stats = PreprocessingPipeline().fit(frame).feature_stats
+    path = tmp_path / 'legacy.pkl'
+    # Files were written as a DataFrame of the nested dict
+    pd.DataFrame(stats).to_pickle(path)
+
+    loaded = PreprocessingPipeline()
+    loaded.load_feature_stats(path)
+    assert loaded.is_fitted
+    assert loaded.stats is None
+    assert_stats_equal(loaded.feature_stats, stats)
+
+    with pytest.raises(ValueError):
+        loaded.partial_fit(frame)
+    with pytest.raises(ValueError):
+        loaded.save_feature_stats(tmp_path / 'resaved.pkl')
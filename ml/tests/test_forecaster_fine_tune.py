@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+pytest.importorskip('tensorflow')
+from src.data import daily_expense_totals
+from src.training.train_forecaster import create_sequences, new_window_mask
+
+SEQUENCE_LENGTH = 3
+
+
+def windows(transactions):
+    daily = daily_expense_totals(transactions)
+    _, y = create_sequences(daily.values, SEQUENCE_LENGTH)
+    return daily, daily.index[SEQUENCE_LENGTH:], y
+
+
+@pytest.fixture
+def transactions():
+    return pd.DataFrame({
+        'date': pd.date_range('2024-01-01', periods=10, freq='D').repeat(2),
+        'amount': np.arange(20, dtype=np.float64) + 1
+    })
+
+
+def test_partial_last_day_is_trained_on_again(transactions):
+    # The checkpoint was saved with only the first expense of the last day
+    saved, _, _ = windows(transactions.iloc[:-1])
+    daily, target_dates, y = windows(transactions)
+
+    new = new_window_mask(target_dates, y, str(saved.index[-1].date()), float(saved.iloc[-1]))
+
+    assert saved.index[-1] == daily.index[-1]
+    assert list(target_dates[new]) == [daily.index[-1]]
+
+
+def test_later_days_are_new(transactions):
+    saved, _, _ = windows(transactions.iloc[:12])
+    _, target_dates, y = windows(transactions)
+
+    new = new_window_mask(target_dates, y, str(saved.index[-1].date()), float(saved.iloc[-1]))
+
+    # Day 6 was complete when saved, days 7 to 10 are new
+    assert list(target_dates[new]) == list(pd.date_range('2024-01-07', '2024-01-10'))
+
+
+def test_unchanged_data_has_nothing_new(transactions):
+    daily, target_dates, y = windows(transactions)
+
+    new = new_window_mask(target_dates, y, str(daily.index[-1].date()), float(daily.iloc[-1]))
+    assert not new.any()
+
+    # Checkpoints saved without the last day's total retrain on that day
+    new = new_window_mask(target_dates, y, str(daily.index[-1].date()))
+    assert list(target_dates[new]) == [daily.index[-1]]
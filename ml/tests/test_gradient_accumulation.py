@@ -0,0 +1,36 @@
+import pytest
+torch = pytest.importorskip('torch')
+pytest.importorskip('mlflow')
+from src.training.train_categorizer import accumulation_group_size
+
+
+@pytest.mark.parametrize('n_steps, accumulation_steps, expected', [
+    (8, 4, [4] * 8),
+    (10, 4, [4] * 8 + [2] * 2),
+    (3, 4, [3] * 3),
+    (5, 1, [1] * 5),
+])
+def test_group_sizes(n_steps, accumulation_steps, expected):
+    sizes = [accumulation_group_size(step, n_steps, accumulation_steps) for step in range(n_steps)]
+    assert sizes == expected
+
+
+def test_partial_group_applies_its_mean_gradient():
+    # 5 micro-batches, 2 per step: the last step has a single micro-batch
+    torch.manual_seed(0)
+    batches = [(torch.randn(4, 3), torch.randn(4, 1)) for _ in range(5)]
+    weight = torch.zeros(3, 1, requires_grad=True)
+
+    gradients = []
+    for step, (X, y) in enumerate(batches):
+        loss = ((X @ weight - y) ** 2).mean() / accumulation_group_size(step, 5, 2)
+        loss.backward()
+        if (step + 1) % 2 == 0 or step + 1 == 5:
+            gradients.append(weight.grad.clone())
+            weight.grad = None
+
+    for group, gradient in zip([batches[0:2], batches[2:4], batches[4:]], gradients):
+        X = torch.cat([X for X, _ in group])
+        y = torch.cat([y for _, y in group])
+        expected, = torch.autograd.grad(((X @ weight - y) ** 2).mean(), weight)
+        torch.testing.assert_close(gradient, expected)
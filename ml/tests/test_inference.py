@@ -0,0 +1,28 @@
+import numpy as np
+from src.serving.inference import categorize_batch, rule_match_result, transactions_to_frame
+
+
+def test_category_names_are_preferred_over_ids():
+    df = transactions_to_frame([
+        {'amount': 5.0, 'category_id': 'c1', 'category': 'Food',
+         'description': 'Coffee', 'date': '2024-01-01'},
+        {'amount': 9.0, 'category_id': 'c2', 'category': None,
+         'description': 'Misc', 'date': '2024-01-02'},
+    ])
+
+    assert list(df.columns) == ['amount', 'category', 'description', 'timestamp']
+    # The id is only a fallback for payloads without a name
+    assert list(df['category']) == ['Food', 'c2']
+
+
+def test_results_name_categories():
+    class Model:
+        categories = ['Food', 'Travel', 'Bills']
+
+        def predict_proba(self, texts):
+            return np.array([[0.2, 0.7, 0.1]] * len(texts))
+
+    [result] = categorize_batch(Model(), ['Flight'], top_k=2)
+    assert result['category'] == 'Travel'
+    assert result['alternatives'] == [{'category': 'Food', 'confidence': 0.2}]
+    assert rule_match_result('Food')['category'] == 'Food'
@@ -0,0 +1,54 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.preprocessing import ParallelPreprocessor, PreprocessingPipeline
+
+
+@pytest.fixture
+def frame():
+    # No duplicates or gaps, and shards large enough that uniform amounts
+    # are never outliers, so cleaning each shard keeps every row as
+    # cleaning the whole frame does
+    rng = np.random.default_rng(0)
+    n = 1200
+    return pd.DataFrame({
+        'user_id': rng.integers(0, 25, n).astype(str),
+        'amount': rng.uniform(10, 20, n).round(2),
+        'description': [f"merchant {i}" for i in rng.integers(0, 15, n)],
+        'category': rng.choice(['Food', 'Travel', 'Bills'], n),
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='h')
+    })
+
+
+def shared_memory_blocks():
+    return set(os.listdir('/dev/shm')) if os.path.isdir('/dev/shm') else set()
+
+
+@pytest.mark.parametrize('n_workers', [1, 2])
+@pytest.mark.parametrize('shard_by', ['user_id', 'rows'])
+def test_matches_transform_with_fitted_scaling(stub_text_processor, frame, n_workers, shard_by):
+    pipeline = PreprocessingPipeline().fit(frame)
+    _, expected = pipeline._prepare(frame, feature_engineer=pipeline._fitted_feature_engineer())
+
+    before = shared_memory_blocks()
+    with ParallelPreprocessor(pipeline, n_workers=n_workers, shard_by=shard_by) as preprocessor:
+        features = preprocessor.transform(frame)
+
+    pd.testing.assert_frame_equal(features, expected)
+    assert shared_memory_blocks() <= before
+
+
+def test_matches_transform_rows_on_unseen_values(stub_text_processor, frame):
+    pipeline = PreprocessingPipeline().fit(frame.iloc[:800])
+    rows = frame.iloc[800:].copy()
+    # Values the pipeline was not fitted on get no one-hot column
+    rows.loc[rows.index[0], 'category'] = 'Unseen'
+
+    before = shared_memory_blocks()
+    with ParallelPreprocessor(pipeline, n_workers=2, shard_by='rows') as preprocessor:
+        features = preprocessor.transform(rows)
+
+    expected = pipeline.transform_rows(rows).reindex(columns=preprocessor.columns, fill_value=False)
+    pd.testing.assert_frame_equal(features, expected, check_dtype=False)
+    assert shared_memory_blocks() <= before
@@ -0,0 +1,14 @@
+import pandas as pd
+from src.preprocessing import PreprocessingPipeline
+
+
+def test_fit_transform_matches_two_passes(stub_text_processor, transactions):
+    pipeline = PreprocessingPipeline()
+    features = pipeline.fit_transform(transactions)
+
+    baseline = PreprocessingPipeline()
+    expected = baseline.fit(transactions).transform(transactions)
+
+    pd.testing.assert_frame_equal(features, expected)
+    assert pipeline.feature_stats == baseline.feature_stats
+    assert pipeline.is_fitted
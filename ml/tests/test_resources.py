@@ -0,0 +1,35 @@
+import pytest
+from src.serving.executors import DEFAULT_POOL_CONFIG
+from src.serving.resources import CpuPartition
+
+SHARES = {name: config['cpu_share'] for name, config in DEFAULT_POOL_CONFIG.items()}
+
+
+@pytest.mark.parametrize('n_cpus', [4, 5, 6, 7, 8, 10, 12, 16, 24, 64])
+def test_slices_are_disjoint_and_cover_every_core(n_cpus):
+    partition = CpuPartition(SHARES, cpus=range(n_cpus))
+
+    assigned = [cpu for cores in partition.to_dict().values() for cpu in cores]
+    assert sorted(assigned) == list(range(n_cpus))
+    assert all(partition.threads(name) >= 1 for name in SHARES)
+
+
+@pytest.mark.parametrize('n_cpus', [8, 16, 64])
+def test_slices_follow_shares(n_cpus):
+    partition = CpuPartition(SHARES, cpus=range(n_cpus))
+
+    for name, share in SHARES.items():
+        assert abs(partition.threads(name) - n_cpus * share) < 1
+
+
+def test_one_core_minimum_is_taken_from_the_largest_share():
+    partition = CpuPartition({'a': 100, 'b': 1, 'c': 1, 'd': 1}, cpus=range(4))
+
+    assert partition.to_dict() == {'a': [0], 'b': [1], 'c': [2], 'd': [3]}
+
+
+def test_fewer_cores_than_families_reuse_cores():
+    partition = CpuPartition(SHARES, cpus=[0, 1])
+
+    assert all(partition.threads(name) == 1 for name in SHARES)
+    assert {cpu for cores in partition.to_dict().values() for cpu in cores} == {0, 1}
@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+from sklearn.metrics import classification_report, confusion_matrix, mean_absolute_error, mean_squared_error
+from src.training.streaming_metrics import (
+    ConfusionMatrix,
+    ErrorSums,
+    ScoreSketch,
+    SequenceWindows,
+    sequence_windows
+)
+
+CHUNK_SIZES = [1, 7, 50, 1000]
+
+
+def chunks(*arrays, size):
+    for start in range(0, len(arrays[0]), size):
+        yield tuple(array[start:start + size] for array in arrays)
+
+
+@pytest.fixture
+def labels():
+    rng = np.random.default_rng(0)
+    names = np.array(['Food', 'Travel', 'Bills', 'Fun', 'Rent'])
+    y_true = names[rng.integers(0, 5, 600)]
+    # Mostly right, and 'Rent' is never predicted
+    y_pred = np.where(rng.random(600) < 0.7, y_true, names[rng.integers(0, 4, 600)])
+    return y_true, y_pred
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_confusion_matrix_matches_sklearn(labels, size):
+    y_true, y_pred = labels
+    matrix = ConfusionMatrix()
+    for true_chunk, pred_chunk in chunks(y_true, y_pred, size=size):
+        matrix.update(true_chunk, pred_chunk)
+
+    names, counts = matrix.matrix()
+    assert names == sorted(set(y_true) | set(y_pred))
+    np.testing.assert_array_equal(counts, confusion_matrix(y_true, y_pred, labels=names))
+
+    expected = classification_report(y_true, y_pred, output_dict=True, zero_division=0)
+    report = matrix.classification_report()
+    assert report.keys() == expected.keys()
+    for key, value in expected.items():
+        assert report[key] == pytest.approx(value)
+
+
+def test_confusion_matrix_merge(labels):
+    y_true, y_pred = labels
+    merged = ConfusionMatrix().update(y_true[:100], y_pred[:100])
+    # The other shard sees its labels in another order
+    merged.merge(ConfusionMatrix().update(y_true[100:][::-1], y_pred[100:][::-1]))
+
+    names, counts = merged.matrix()
+    np.testing.assert_array_equal(counts, confusion_matrix(y_true, y_pred, labels=names))
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_error_sums_match_sklearn(size):
+    rng = np.random.default_rng(1)
+    y_true = rng.uniform(10, 100, 500)
+    y_pred = y_true + rng.normal(0, 5, 500)
+    sums = ErrorSums()
+    for true_chunk, pred_chunk in chunks(y_true, y_pred, size=size):
+        sums.update(true_chunk, pred_chunk)
+
+    mse = mean_squared_error(y_true, y_pred)
+    assert sums.to_dict() == pytest.approx({
+        'mse': mse,
+        'mae': mean_absolute_error(y_true, y_pred),
+        'rmse': np.sqrt(mse),
+        'mape': np.mean(np.abs((y_true - y_pred) / y_true)) * 100
+    })
+
+
+@pytest.mark.parametrize('size', CHUNK_SIZES)
+def test_score_sketch(size):
+    rng = np.random.default_rng(2)
+    scores = -rng.beta(2, 5, 2000)
+    sketch = ScoreSketch(bins=1000)
+    for (chunk,) in chunks(scores, size=size):
+        sketch.update(chunk)
+
+    assert sketch.count == len(scores)
+    assert sketch.to_dict() == pytest.approx({
+        'mean': scores.mean(), 'std': np.std(scores), 'min': scores.min(), 'max': scores.max()
+    })
+    bin_width = 1 / 1000
+    for q in [0.01, 0.1, 0.5, 0.9, 0.99]:
+        assert abs(sketch.quantile(q) - np.quantile(scores, q)) <= bin_width
+
+
+def test_score_sketch_merge_needs_equal_bins():
+    with pytest.raises(ValueError):
+        ScoreSketch(bins=10).merge(ScoreSketch(bins=20))
+
+
+@pytest.mark.parametrize('size', [1, 3, 5, 6, 40])
+def test_sequence_windows_match_whole_series(size):
+    series = np.arange(40, dtype=np.float64) ** 1.5
+    windows = SequenceWindows(5)
+    results = [windows.update(chunk) for (chunk,) in chunks(series, size=size)]
+
+    X = np.concatenate([X for X, _ in results])
+    y = np.concatenate([y for _, y in results])
+    expected_X, expected_y = sequence_windows(series, 5)
+    np.testing.assert_array_equal(X, expected_X)
+    np.testing.assert_array_equal(y, expected_y)
+    assert len(y) == len(series) - 5
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+from src.data import SyntheticTransactionGenerator
+from src.data.synthetic import RNG_BLOCK_ROWS
+
+
+def generator(**kwargs):
+    return SyntheticTransactionGenerator(n_users=100, n_merchants=50, seed=7, **kwargs)
+
+
+@pytest.mark.parametrize('chunk_size', [1, 999, RNG_BLOCK_ROWS, 12_345])
+def test_rows_do_not_depend_on_chunk_size(chunk_size):
+    n_rows = RNG_BLOCK_ROWS + 2_500
+    expected = generator(chunk_size=n_rows).generate(n_rows)
+    if chunk_size == 1:
+        # One row per chunk is slow, so compare a stretch across a block boundary
+        start = RNG_BLOCK_ROWS - 20
+        chunks = generator(chunk_size=1)._chunk(start, 40)
+        pd.testing.assert_frame_equal(
+            chunks, expected.iloc[start:start + 40].reset_index(drop=True)
+        )
+        return
+
+    df = generator(chunk_size=chunk_size).generate(n_rows)
+    pd.testing.assert_frame_equal(df, expected)
+
+
+def test_rows_do_not_depend_on_row_count():
+    longer = generator().generate(RNG_BLOCK_ROWS + 100)
+    shorter = generator().generate(250)
+
+    pd.testing.assert_frame_equal(shorter, longer.iloc[:250])
+
+
+def test_unique_references_are_stable():
+    kwargs = {'unique_reference_rate': 0.5, 'chunk_size': 300}
+    df = generator(**kwargs).generate(1000)
+
+    pd.testing.assert_frame_equal(df, generator(unique_reference_rate=0.5).generate(1000))
+    assert df['description'].str.contains(' REF').mean() == pytest.approx(0.5, abs=0.1)
+
+
+def test_seeds_differ():
+    other = SyntheticTransactionGenerator(n_users=100, n_merchants=50, seed=8).generate(100)
+
+    assert not other.equals(generator().generate(100))
+
+
+def test_write_matches_generate(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'transactions.parquet'
+    written = generator(chunk_size=700).write(str(path), 2000)
+
+    df = pd.read_parquet(path)
+    assert written == 2000
+    expected = generator().generate(2000)
+    for column in ['user_id', 'description', 'category', 'type']:
+        assert list(df[column].astype(str)) == list(expected[column])
+    assert list(df['amount']) == list(expected['amount'])
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+mlflow = pytest.importorskip('mlflow')
+mlflow_sklearn = pytest.importorskip('mlflow.sklearn')
+
+from mlflow.tracking import MlflowClient
+from src.training.tracking import MAX_PARAMS_PER_BATCH, AsyncRunLogger
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # MLflow 3 only opens file stores when allowed to
+    monkeypatch.setenv('MLFLOW_ALLOW_FILE_STORE', 'true')
+    monkeypatch.setenv('MLFLOW_TRACKING_URI', (tmp_path / 'mlruns').as_uri())
+    mlflow.set_tracking_uri((tmp_path / 'mlruns').as_uri())
+    yield MlflowClient()
+    if mlflow.active_run() is not None:
+        mlflow.end_run()
+
+
+def count_batches(client, monkeypatch):
+    batches = []
+    log_batch = client.log_batch
+
+    def counting_log_batch(run_id, metrics=(), params=(), **kwargs):
+        batches.append((len(metrics), len(params)))
+        return log_batch(run_id, metrics=metrics, params=params, **kwargs)
+
+    monkeypatch.setattr(client, 'log_batch', counting_log_batch)
+    return batches
+
+
+def test_params_and_metrics_are_batched(client, monkeypatch):
+    batches = count_batches(client, monkeypatch)
+    params = {f"param_{i}": i for i in range(MAX_PARAMS_PER_BATCH + 20)}
+
+    with mlflow.start_run() as run:
+        with AsyncRunLogger(run.info.run_id, client=client, flush_interval=60) as tracker:
+            tracker.log_params(params)
+            for step in range(50):
+                tracker.log_metrics({'loss': 1.0 / (step + 1), 'mae': step}, step=step)
+        assert tracker.errors == 0
+
+    data = client.get_run(run.info.run_id).data
+    assert data.params == {key: str(value) for key, value in params.items()}
+    assert data.metrics['loss'] == pytest.approx(1.0 / 50)
+    history = client.get_metric_history(run.info.run_id, 'loss')
+    assert [metric.step for metric in history] == list(range(50))
+    assert 'logging/seconds' in data.metrics
+    assert 'logging/enqueue_seconds' in data.metrics
+
+    # 120 params and 100 metrics go out in two requests, then the timings
+    assert sum(p for _, p in batches) == len(params)
+    assert all(p <= MAX_PARAMS_PER_BATCH for _, p in batches)
+    assert len(batches) == 3
+
+
+def test_model_is_uploaded_and_loads(client):
+    model = LinearRegression().fit(np.arange(10.0).reshape(-1, 1), np.arange(10.0) * 2)
+
+    with mlflow.start_run() as run:
+        with AsyncRunLogger(run.info.run_id, client=client) as tracker:
+            tracker.log_model(
+                mlflow_sklearn, model, 'model',
+                serialization_format=mlflow_sklearn.SERIALIZATION_FORMAT_CLOUDPICKLE
+            )
+        assert tracker.errors == 0
+
+    artifacts = [a.path for a in client.list_artifacts(run.info.run_id, 'model')]
+    assert 'model/MLmodel' in artifacts
+    loaded = mlflow_sklearn.load_model(f"runs:/{run.info.run_id}/model")
+    assert loaded.predict([[3.0]]) == pytest.approx([6.0])
+
+
+def test_queue_is_flushed_on_exception(client):
+    with pytest.raises(RuntimeError):
+        with mlflow.start_run() as run:
+            with AsyncRunLogger(run.info.run_id, client=client, flush_interval=60) as tracker:
+                tracker.log_params({'lr': 0.1})
+                tracker.log_metric('loss', 0.5)
+                raise RuntimeError('training failed')
+
+    data = client.get_run(run.info.run_id).data
+    assert data.params == {'lr': '0.1'}
+    assert data.metrics['loss'] == 0.5
@@ -0,0 +1,101 @@
+import sqlite3
+import pandas as pd
+import pytest
+from src.data.transaction_source import COLUMN_DTYPES, TransactionSource
+
+ROWS = [
+    ('u1', 'c1', 'expense', 12.5, 'Coffee', '2024-01-01'),
+    ('u1', 'c2', 'income', 1000.0, 'Salary', '2024-01-02'),
+    ('u1', None, 'expense', 40.0, 'Books', '2024-01-03'),
+    ('u2', 'c1', 'expense', 7.25, 'Tea', '2024-01-02'),
+    ('u1', 'c1', 'expense', 3.0, 'Coffee', '2024-01-05'),
+]
+
+
+@pytest.fixture
+def connection():
+    # Stand-in for Postgres with the columns the source query reads
+    connection = sqlite3.connect(':memory:')
+    connection.executescript("""
+        CREATE TABLE categories (id TEXT PRIMARY KEY, name TEXT);
+        CREATE TABLE transactions (
+            user_id TEXT, category_id TEXT, type TEXT,
+            amount NUMERIC, description TEXT, date TEXT
+        );
+        INSERT INTO categories VALUES ('c1', 'Food'), ('c2', 'Income');
+    """)
+    connection.executemany('INSERT INTO transactions VALUES (?, ?, ?, ?, ?, ?)', ROWS)
+    yield connection
+    connection.close()
+
+
+def test_chunks_are_typed_and_ordered(connection):
+    source = TransactionSource(connection=connection, chunk_size=2)
+    chunks = list(source.iter_chunks())
+
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    for chunk in chunks:
+        assert list(chunk.columns) == list(COLUMN_DTYPES)
+        assert chunk['amount'].dtype == 'float64'
+        assert chunk['timestamp'].dtype == 'datetime64[ns]'
+        assert chunk['user_id'].dtype == object
+
+    df = pd.concat(chunks, ignore_index=True)
+    assert list(df['user_id']) == ['u1', 'u1', 'u1', 'u1', 'u2']
+    assert list(df.loc[df['user_id'] == 'u1', 'timestamp']) == list(
+        pd.to_datetime(['2024-01-01', '2024-01-02', '2024-01-03', '2024-01-05'])
+    )
+    assert df.loc[2, 'category'] is None
+    assert list(df['type']) == ['expense', 'income', 'expense', 'expense', 'expense']
+
+
+def test_filters(connection):
+    source = TransactionSource(connection=connection, user_id='u1')
+
+    df = source.read(start_date='2024-01-02', end_date='2024-01-03')
+    assert list(df['description']) == ['Salary', 'Books']
+
+    # Filters given to the call override the source's
+    df = source.read(user_id='u2')
+    assert list(df['amount']) == [7.25]
+
+
+def test_empty_result(connection):
+    source = TransactionSource(connection=connection, chunk_size=2)
+
+    assert list(source.iter_chunks(user_id='missing')) == []
+    df = source.read(user_id='missing')
+    assert len(df) == 0
+    assert list(df.columns) == list(COLUMN_DTYPES)
+    assert df['amount'].dtype == 'float64'
+    assert df['timestamp'].dtype == 'datetime64[ns]'
+
+
+def test_named_cursors_are_unique():
+    class Connection:
+        def __init__(self):
+            self.names = []
+
+        def cursor(self, name=None):
+            self.names.append(name)
+            return type('Cursor', (), {})()
+
+    connection = Connection()
+    source = TransactionSource(connection=connection)
+    source._cursor(connection)
+    TransactionSource(connection=connection)._cursor(connection)
+
+    assert len(set(connection.names)) == 2
+
+
+def test_daily_expense_totals_are_aggregated_per_chunk(connection):
+    from src.data import daily_expense_totals
+
+    source = TransactionSource(connection=connection, chunk_size=2)
+    daily = daily_expense_totals(source)
+
+    expected = daily_expense_totals(source.read())
+    pd.testing.assert_series_equal(daily, expected, check_names=False)
+    # Income is left out and days without expenses are 0
+    assert list(daily.index) == list(pd.date_range('2024-01-01', '2024-01-05'))
+    assert list(daily) == [12.5, 7.25, 40.0, 0.0, 3.0]
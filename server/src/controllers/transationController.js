@@ -2,6 +2,7 @@
 const db = require('../config/database');
 const plaid = require('../config/plaid');
 const logger = require('../utils/logger');
+const mlService = require('../services/mlService');
 const { ApiError } = require('../utils/errors');
 
 class TransactionController {
@@ -188,6 +189,8 @@ class TransactionController {
         [type === 'income' ? amount : -amount, accountId]
       );
 
+      await mlService.invalidatePatternCache(userId, [result.rows[0].date]);
+
       return res.status(201).json({
         success: true,
         data: result.rows[0]
@@ -222,6 +225,8 @@ class TransactionController {
         throw new ApiError('Transaction not found', 404);
       }
 
+      await mlService.invalidatePatternCache(userId, [result.rows[0].date]);
+
       return res.json({
         success: true,
         data: result.rows[0]
@@ -238,6 +243,7 @@ class TransactionController {
       const { id } = req.params;
       const userId = req.user.id;
 
+      let deletedDate;
       await db.transaction(async (client) => {
         // Get transaction details
         const transaction = await client.query(
@@ -265,8 +271,12 @@ class TransactionController {
           'DELETE FROM transactions WHERE id = $1',
           [id]
         );
+
+        deletedDate = transaction.rows[0].date;
       });
 
+      await mlService.invalidatePatternCache(userId, [deletedDate]);
+
       return res.json({
         success: true,
         message: 'Transaction deleted successfully'
@@ -290,6 +300,7 @@ class TransactionController {
 
       let newTransactions = 0;
       let updatedTransactions = 0;
+      const changedDates = new Set();
 
       for (const cred of credentials.rows) {
         // Get transactions from Plaid
@@ -327,6 +338,8 @@ class TransactionController {
             ]
           );
 
+          changedDates.add(transaction.date);
+
           if (result.rows[0].created_at === result.rows[0].updated_at) {
             newTransactions++;
           } else {
@@ -335,6 +348,10 @@ class TransactionController {
         }
       }
 
+      if (changedDates.size > 0) {
+        await mlService.invalidatePatternCache(userId, [...changedDates]);
+      }
+
       return res.json({
         success: true,
         data: {
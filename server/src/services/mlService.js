@@ -1,7 +1,36 @@
 const axios = require('axios');
+const readline = require('readline');
+const { Readable } = require('stream');
+const db = require('../config/database');
 const logger = require('../utils/logger');
 const { ApiError } = require('../utils/errors');
 
+// Anomaly requests larger than this use the streaming endpoint
+const STREAMING_THRESHOLD = 1000;
+
+// pg returns DATE columns as local midnight, so format with the local
+// getters; toISOString would shift them a day back east of UTC. Strings
+// such as Plaid's 'YYYY-MM-DD' dates are already calendar dates.
+const toDateString = (date) => {
+  if (typeof date === 'string') {
+    return date.slice(0, 10);
+  }
+  const d = new Date(date);
+  const month = String(d.getMonth() + 1).padStart(2, '0');
+  const day = String(d.getDate()).padStart(2, '0');
+  return `${d.getFullYear()}-${month}-${day}`;
+};
+
+// The ML models are trained on category names, so anomaly payloads carry
+// the name alongside the id rather than the bare category UUID.
+const toAnomalyPayload = (t, categoryNames) => ({
+  amount: t.amount,
+  category_id: t.categoryId,
+  category: categoryNames.get(t.categoryId) ?? null,
+  description: t.description,
+  date: t.date
+});
+
 class MLService {
   constructor() {
     this.baseURL = process.env.ML_SERVICE_URL || 'http://localhost:8000';
@@ -12,7 +41,8 @@ class MLService {
   }
 
   /**
-   * Predict transaction category
+   * Predict transaction category. The ML service answers with category
+   * names, which are resolved to category ids here.
    */
   async predictCategory(transaction) {
     try {
@@ -22,8 +52,14 @@ class MLService {
         date: transaction.date
       });
 
+      const result = await db.query(
+        'SELECT id FROM categories WHERE name = $1 LIMIT 1',
+        [response.data.category]
+      );
+
       return {
-        categoryId: response.data.category_id,
+        categoryId: result.rows[0] ? result.rows[0].id : null,
+        category: response.data.category,
         confidence: response.data.confidence,
         alternatives: response.data.alternatives
       };
@@ -36,18 +72,33 @@ class MLService {
     }
   }
 
+  /**
+   * Look up the names of the categories referenced by transactions
+   */
+  async categoryNames(transactions) {
+    const ids = [...new Set(transactions.map(t => t.categoryId).filter(Boolean))];
+    if (ids.length === 0) {
+      return new Map();
+    }
+    const result = await db.query(
+      'SELECT id, name FROM categories WHERE id = ANY($1)',
+      [ids]
+    );
+    return new Map(result.rows.map(row => [row.id, row.name]));
+  }
+
   /**
    * Detect anomalous transactions
    */
   async detectAnomalies(transactions) {
+    if (transactions.length > STREAMING_THRESHOLD) {
+      return this.detectAnomaliesStream(transactions);
+    }
+
     try {
+      const categoryNames = await this.categoryNames(transactions);
       const response = await this.client.post('/predict/anomaly', {
-        transactions: transactions.map(t => ({
-          amount: t.amount,
-          category_id: t.categoryId,
-          description: t.description,
-          date: t.date
-        }))
+        transactions: transactions.map(t => toAnomalyPayload(t, categoryNames))
       });
 
       return response.data.anomalies.map(anomaly => ({
@@ -64,6 +115,50 @@ class MLService {
     }
   }
 
+  /**
+   * Detect anomalous transactions over the streaming NDJSON endpoint.
+   * Transactions are sent and anomalies read back line by line, so large
+   * accounts are never buffered as a single request or response body.
+   */
+  async detectAnomaliesStream(transactions) {
+    try {
+      const categoryNames = await this.categoryNames(transactions);
+      const body = Readable.from((function* () {
+        for (const t of transactions) {
+          yield JSON.stringify(toAnomalyPayload(t, categoryNames)) + '\n';
+        }
+      })());
+
+      const response = await this.client.post('/predict/anomaly/stream', body, {
+        headers: { 'Content-Type': 'application/x-ndjson' },
+        responseType: 'stream',
+        timeout: 0
+      });
+
+      const anomalies = [];
+      const lines = readline.createInterface({ input: response.data, crlfDelay: Infinity });
+      for await (const line of lines) {
+        if (!line.trim()) continue;
+        const anomaly = JSON.parse(line);
+        if (anomaly.error) {
+          throw new ApiError(anomaly.error, 500);
+        }
+        anomalies.push({
+          transactionId: transactions[anomaly.index].id,
+          score: anomaly.score,
+          reason: anomaly.reason
+        });
+      }
+      return anomalies;
+    } catch (error) {
+      logger.error('Error streaming anomaly detection:', error);
+      if (error.response) {
+        throw new ApiError(error.response.statusText, error.response.status);
+      }
+      throw error;
+    }
+  }
+
   /**
    * Analyze spending patterns
    */
@@ -89,6 +184,22 @@ class MLService {
     }
   }
 
+  /**
+   * Invalidate cached pattern analyses covering changed transactions.
+   * Failures are logged rather than thrown so they never fail the write
+   * that triggered them; cached entries still expire on their TTL.
+   */
+  async invalidatePatternCache(userId, dates) {
+    try {
+      await this.client.post('/cache/patterns/invalidate', {
+        user_id: userId,
+        dates: dates.map(toDateString)
+      });
+    } catch (error) {
+      logger.warn('Error invalidating pattern cache:', error);
+    }
+  }
+
   /**
    * Forecast expenses
    */